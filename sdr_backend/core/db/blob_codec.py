@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+"""Compact storage encoding for ``ir_json`` / ``rendered_json`` blobs.
+
+Big diagrams produce IR and React-Flow JSON of several hundred KB which is
+stored twice (``diagrams`` + ``diagram_versions``) and shipped back from
+Supabase on every view request.  When ``DIAGRAM_BLOB_COMPACT`` is on, blobs
+above ``DIAGRAM_BLOB_MIN_BYTES`` are stored as a single JSON *string* in the
+same JSONB column::
+
+    "sdrblob:" + base64( <schema version byte> <codec byte> <payload> )
+
+The payload is compact JSON compressed with zstd when the optional
+``zstandard`` package is installed, zlib otherwise.  The header is part of
+every blob, so readers always know how to decode it whatever the writer's
+configuration was.  :func:`decode_blob` passes plain JSON values through
+untouched – legacy rows keep working and :func:`recode_tables` migrates them
+(in either direction) in place.  No schema change is needed.
+"""
+
+import base64
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import sqlalchemy as sa
+
+from utils.logger import log_info
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover – optional dependency
+    zstandard = None
+
+# ----------------------- CONFIG ---------------------------------
+COMPACT_ENABLED = os.getenv("DIAGRAM_BLOB_COMPACT", "false").lower() in {"1", "true", "yes"}
+MIN_BYTES = int(os.getenv("DIAGRAM_BLOB_MIN_BYTES", "2048"))  # smaller blobs stay plain JSON
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+# ---------------------------------------------------------------
+
+PREFIX = "sdrblob:"
+SCHEMA_VERSION = 1
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+BLOB_COLUMNS: Tuple[str, ...] = ("rendered_json", "ir_json")
+TABLES: Tuple[str, ...] = ("diagrams", "diagram_versions")
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _frame(raw: bytes, codec: Optional[int]) -> bytes:
+    if codec is None:
+        codec = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstd codec requested but 'zstandard' is not installed")
+        payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    elif codec == CODEC_ZLIB:
+        payload = zlib.compress(raw, ZLIB_LEVEL)
+    else:
+        raise ValueError(f"unknown blob codec {codec}")
+    return bytes((SCHEMA_VERSION, codec)) + payload
+
+
+def pack(value: Any, codec: Optional[int] = None) -> bytes:
+    """Serialise *value* into a self-describing compressed frame."""
+    return _frame(_dumps(value), codec)
+
+
+def unpack(frame: bytes) -> Any:
+    """Inverse of :func:`pack`."""
+    if len(frame) < 2:
+        raise ValueError("truncated blob frame")
+    version, codec = frame[0], frame[1]
+    if version != SCHEMA_VERSION:
+        raise ValueError(f"unsupported blob schema version {version}")
+    payload = frame[2:]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("blob is zstd-compressed but 'zstandard' is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec == CODEC_ZLIB:
+        raw = zlib.decompress(payload)
+    else:
+        raise ValueError(f"unknown blob codec {codec}")
+    return json.loads(raw)
+
+
+def is_compact(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(PREFIX)
+
+
+def encode_blob(value: Any, *, force: Optional[bool] = None) -> Any:
+    """Column value to store for *value*.
+
+    Returns *value* unchanged when compact storage is disabled (*force*
+    overrides the ``DIAGRAM_BLOB_COMPACT`` setting), for ``None`` and for
+    blobs smaller than ``MIN_BYTES``.
+    """
+    enabled = COMPACT_ENABLED if force is None else force
+    if not enabled or value is None or is_compact(value):
+        return value
+    raw = _dumps(value)
+    if len(raw) < MIN_BYTES:
+        return value
+    return PREFIX + base64.b64encode(_frame(raw, None)).decode("ascii")
+
+
+def decode_blob(value: Any) -> Any:
+    """Transparent read: unpack compact blobs, pass plain JSON through."""
+    if not is_compact(value):
+        return value
+    return unpack(base64.b64decode(value[len(PREFIX):]))
+
+
+# ---------------------------------------------------------------------------
+#  Migration of existing rows
+# ---------------------------------------------------------------------------
+
+def _table(name: str) -> sa.TableClause:
+    return sa.table(name, sa.column("id", sa.Integer), *(sa.column(c, sa.JSON) for c in BLOB_COLUMNS))
+
+
+def recode_tables(
+    engine: sa.engine.Engine,
+    *,
+    compact: bool = True,
+    tables: Sequence[str] = TABLES,
+    page_size: int = 200,
+) -> Dict[str, Tuple[int, int]]:
+    """Rewrite stored blobs to compact (or, with ``compact=False``, plain) form.
+
+    Walks each table in keyset-paginated pages and updates only rows whose
+    encoding actually changes.  Idempotent, so an interrupted run is simply
+    restarted.  Returns ``{table: (scanned, rewritten)}``.
+    """
+    summary: Dict[str, Tuple[int, int]] = {}
+    for name in tables:
+        t = _table(name)
+        stmt = (
+            sa.update(t)
+            .where(t.c.id == sa.bindparam("row_id"))
+            .values({c: sa.bindparam(f"new_{c}") for c in BLOB_COLUMNS})
+        )
+        scanned = rewritten = 0
+        after = 0
+        while True:
+            with engine.connect() as conn:
+                rows = conn.execute(
+                    sa.select(t).where(t.c.id > after).order_by(t.c.id).limit(page_size)
+                ).all()
+            if not rows:
+                break
+            updates = list(_recoded(rows, compact))
+            if updates:
+                with engine.begin() as conn:
+                    conn.execute(stmt, updates)
+            scanned += len(rows)
+            rewritten += len(updates)
+            after = rows[-1].id
+        summary[name] = (scanned, rewritten)
+        log_info(f"[blob_codec] {name}: {rewritten}/{scanned} rows re-encoded (compact={compact})")
+    return summary
+
+
+def _recoded(rows: Iterable[Any], compact: bool) -> Iterable[Dict[str, Any]]:
+    for row in rows:
+        old = {c: getattr(row, c) for c in BLOB_COLUMNS}
+        new = {c: encode_blob(decode_blob(v), force=compact) for c, v in old.items()}
+        if new != old:
+            yield {"row_id": row.id, **{f"new_{c}": v for c, v in new.items()}}
@@ -0,0 +1,172 @@
+"""
+core/dsl/async_exec.py
+──────────────────────
+Non-blocking execution of external binaries for async request handlers.
+
+Parsing, layout and SVG rendering shell out to Go binaries (d2json, d2) that
+can take 15–30 s.  Called directly from a handler they freeze the event loop
+and every other request on the worker with it.  Everything here runs off the
+loop behind one global semaphore sized to the CPU count
+(``EXTERNAL_PROC_CONCURRENCY`` overrides it), so a burst of diagrams queues
+instead of oversubscribing the machine:
+
+• :func:`run_exec` – one-shot binaries via ``asyncio.create_subprocess_exec``.
+• :func:`run_blocking` – synchronous code paths that talk to binaries
+  themselves (the d2json worker pool, the layout engines), run in a thread.
+
+Both record queue and run time per call.  When the awaiting task is
+cancelled – e.g. the client disconnected – the child is killed: directly for
+:func:`run_exec`; for :func:`run_blocking` through the :class:`CancelScope`
+the thread inherits, on which the d2json pool registers the process it is
+waiting on.
+
+Public API
+----------
+await run_exec(name, argv, input=b"...", timeout=30) -> bytes
+await run_blocking(name, func, *args, **kwargs)     -> func(*args, **kwargs)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import threading
+import time
+import weakref
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, Sequence, TypeVar
+
+from utils.prometheus_metrics import record_external_proc
+
+# ── configuration ────────────────────────────────────────────────────────────
+
+CONCURRENCY = int(os.getenv("EXTERNAL_PROC_CONCURRENCY", "0")) or (os.cpu_count() or 1)
+
+T = TypeVar("T")
+
+# asyncio primitives are bound to the loop that first uses them
+_SEMAPHORES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _SEMAPHORES.get(loop)
+    if sem is None:
+        sem = _SEMAPHORES[loop] = asyncio.Semaphore(CONCURRENCY)
+    return sem
+
+
+# ── cancellation of work running in threads ──────────────────────────────────
+
+class CancelScope:
+    """Kill switch handed from a cancelled task to the thread doing its work."""
+
+    def __init__(self):
+        self.cancelled = False
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run *callback* on cancellation (now, if already cancelled); returns an unregister function."""
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def _discard(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+_SCOPE: ContextVar[Optional[CancelScope]] = ContextVar("external_proc_cancel_scope", default=None)
+
+
+def current_scope() -> Optional[CancelScope]:
+    """Cancel scope of the :func:`run_blocking` call this thread works for, if any."""
+    return _SCOPE.get()
+
+
+# ── executors ────────────────────────────────────────────────────────────────
+
+async def run_exec(name: str, argv: Sequence[str], *, input: Optional[bytes] = None, timeout: float) -> bytes:
+    """Run *argv* to completion and return its stdout.
+
+    Raises ``subprocess.TimeoutExpired`` / ``subprocess.CalledProcessError``
+    like ``subprocess.run(check=True)`` would; the child never outlives the
+    call.
+    """
+    queued = time.perf_counter()
+    async with _semaphore():
+        started = time.perf_counter()
+        outcome = "error"
+        proc = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(input), timeout)
+            if proc.returncode != 0:
+                raise subprocess.CalledProcessError(proc.returncode, list(argv), stdout, stderr)
+            outcome = "ok"
+            return stdout
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise subprocess.TimeoutExpired(list(argv), timeout)
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            record_external_proc(name, started - queued, time.perf_counter() - started, outcome)
+
+
+async def run_blocking(name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run synchronous *func* in a thread without blocking the event loop.
+
+    A thread cannot be interrupted, so a cancelled call keeps its semaphore
+    slot until *func* actually returns.
+    """
+    queued = time.perf_counter()
+    sem = _semaphore()
+    await sem.acquire()
+    started = time.perf_counter()
+    outcome = "error"
+    scope = CancelScope()
+    token = _SCOPE.set(scope)  # copied into the worker thread's context
+    future = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+    try:
+        result = await asyncio.shield(future)
+        outcome = "ok"
+        return result
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        scope.cancel()
+        raise
+    except (subprocess.TimeoutExpired, TimeoutError):
+        outcome = "timeout"
+        raise
+    finally:
+        _SCOPE.reset(token)
+        record_external_proc(name, started - queued, time.perf_counter() - started, outcome)
+        future.add_done_callback(lambda f: _release(sem, f))
+
+
+def _release(sem: asyncio.Semaphore, future: "asyncio.Future[Any]") -> None:
+    sem.release()
+    if not future.cancelled():
+        future.exception()  # retrieved, so an abandoned failure is not logged as unhandled
@@ -0,0 +1,366 @@
+"""
+core/dsl/d2json_pool.py
+───────────────────────
+Pool of long-lived ``d2json -serve`` workers.
+
+Parsing and every D2-based layout used to fork a fresh d2json process (plus
+a temp file) per call, so each request paid process spawn and Go runtime
+start-up several times over.  Workers here stay up and answer framed
+requests on stdin/stdout – a 4-byte big-endian length followed by a JSON
+document in both directions (see tools/cmd/d2json/main.go).
+
+• The binary is resolved once per process (:func:`resolve_d2json_binary`).
+• Workers are spawned lazily, up to ``D2JSON_POOL_SIZE``.
+• A worker idle for longer than ``D2JSON_HEALTHCHECK_IDLE_SEC`` is pinged
+  before reuse; dead or unresponsive workers are replaced, and a request
+  whose worker crashed is retried once on a fresh one.
+• A request that exceeds its timeout kills its worker (its state is unknown)
+  and raises :class:`D2JsonTimeout`.
+• A binary built before ``-serve`` existed (it exits with a usage error on
+  the unknown flag) is detected on the first spawn and the pool degrades to
+  one process per call; a worker that merely misses its first ping is retried.
+• Called under :func:`core.dsl.async_exec.run_blocking`, a cancelled request
+  kills the process it is waiting on instead of letting it run to the end.
+
+Public API
+----------
+get_pool().run(d2_source, layout="elk", timeout=15) -> dict
+d2json_available() -> bool
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import selectors
+import shutil
+import struct
+import subprocess
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from core.dsl.async_exec import current_scope
+from utils.logger import log_error, log_info
+
+# ── configuration ────────────────────────────────────────────────────────────
+
+POOL_SIZE = int(os.getenv("D2JSON_POOL_SIZE", "2"))
+HEALTHCHECK_IDLE_SEC = float(os.getenv("D2JSON_HEALTHCHECK_IDLE_SEC", "30"))
+DEFAULT_TIMEOUT = 15             # seconds granted to d2json itself
+TIMEOUT_GRACE = 2                # extra seconds before the caller gives up
+START_TIMEOUT = 5.0              # spawn + first ping
+SPAWN_ATTEMPTS = 2               # a worker that misses its first ping is retried
+USAGE_EXIT_CODE = 2              # Go's flag package: unknown flag (no -serve)
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+_HEADER = struct.Struct(">I")
+
+
+class D2JsonError(RuntimeError):
+    """d2json rejected the source or could not be run."""
+
+
+class D2JsonTimeout(D2JsonError, TimeoutError):
+    """No answer from d2json within the request timeout."""
+
+
+class _WorkerGone(Exception):
+    """The worker died or broke the protocol – replace it."""
+
+
+# ── binary resolution ────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=1)
+def resolve_d2json_binary() -> str:
+    """Locate the d2json binary once: $D2JSON_BIN, PATH, then project locations."""
+    override = os.getenv("D2JSON_BIN")
+    if override:
+        return override
+
+    path = shutil.which("d2json")
+    if path:
+        log_info(f"[d2json] Found d2json in PATH: {path}")
+        return path
+
+    base_dir = Path(__file__).resolve().parent.parent.parent  # sdr_backend/core/dsl → sdr_backend
+    candidate_paths = [
+        base_dir / "tools" / "cmd" / "d2json" / "d2json",
+        base_dir.parent / "sdr_backend" / "tools" / "cmd" / "d2json" / "d2json",
+        Path.home() / "bin" / "d2json",
+        Path("/usr/local/bin/d2json"),
+        Path("/usr/bin/d2json"),
+    ]
+    for p in candidate_paths:
+        if p.is_file() and os.access(p, os.X_OK):
+            log_info(f"[d2json] Found d2json at: {p}")
+            return str(p)
+
+    log_error("d2json binary not found. Ensure it is built and on PATH or in project tools.")
+    raise FileNotFoundError("d2json binary not found")
+
+
+@lru_cache(maxsize=1)
+def d2json_available() -> bool:
+    """True when a d2json binary can be resolved (checked once per process)."""
+    try:
+        resolve_d2json_binary()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+# ── worker ───────────────────────────────────────────────────────────────────
+
+class _Worker:
+    """One ``d2json -serve`` process; used by a single thread at a time."""
+
+    def __init__(self, binary: str):
+        self.proc = subprocess.Popen(
+            [binary, "-serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+        )
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.proc.stdout, selectors.EVENT_READ)
+        self._seq = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def call(self, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        self._seq += 1
+        body = json.dumps({**request, "id": self._seq}).encode("utf-8")
+        try:
+            self.proc.stdin.write(_HEADER.pack(len(body)) + body)
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise _WorkerGone(f"write failed: {e}") from e
+
+        (size,) = _HEADER.unpack(self._read_exact(_HEADER.size, deadline))
+        if size > MAX_FRAME_BYTES:
+            raise _WorkerGone(f"oversized frame ({size} bytes)")
+        try:
+            response = json.loads(self._read_exact(size, deadline))
+        except ValueError as e:
+            raise _WorkerGone(f"malformed response: {e}") from e
+        if response.get("id") != self._seq:
+            raise _WorkerGone("response id mismatch")
+        self.last_used = time.monotonic()
+        return response
+
+    def _read_exact(self, n: int, deadline: float) -> bytes:
+        buf = bytearray()
+        fd = self.proc.stdout.fileno()
+        while len(buf) < n:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._selector.select(remaining):
+                raise D2JsonTimeout("d2json did not answer in time")
+            chunk = os.read(fd, n - len(buf))
+            if not chunk:
+                raise _WorkerGone("worker exited")
+            buf += chunk
+        return bytes(buf)
+
+    def ping(self, timeout: float) -> bool:
+        try:
+            return bool(self.call({"op": "ping"}, timeout).get("ok"))
+        except (_WorkerGone, D2JsonTimeout):
+            return False
+
+    def exit_code(self, wait: float = 0.5) -> Optional[int]:
+        """Return code of a worker that is exiting, ``None`` if it is still up."""
+        try:
+            return self.proc.wait(timeout=wait)
+        except subprocess.TimeoutExpired:
+            return None
+
+    def terminate(self) -> None:
+        """Kill the process only – safe to call from another thread."""
+        if self.alive:
+            self.proc.kill()
+
+    def kill(self) -> None:
+        self._selector.close()
+        if self.alive:
+            self.proc.kill()
+        try:
+            self.proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:  # pragma: no cover
+            pass
+        for stream in (self.proc.stdin, self.proc.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+# ── pool ─────────────────────────────────────────────────────────────────────
+
+class D2JsonPool:
+    """Bounded pool of persistent d2json workers (thread-safe)."""
+
+    def __init__(self, binary: Optional[str] = None, size: int = POOL_SIZE):
+        self.binary = binary or resolve_d2json_binary()
+        self.size = max(1, size)
+        # One slot per worker; ``None`` marks a slot whose worker is not running
+        self._slots: "queue.LifoQueue[Optional[_Worker]]" = queue.LifoQueue()
+        for _ in range(self.size):
+            self._slots.put(None)
+        self._serve_supported: Optional[bool] = None
+        self.restarts = 0
+
+    def run(self, d2_source: str, layout: str = "elk", timeout: int = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+        """Compile (and lay out) *d2_source*; returns d2json's JSON document."""
+        if self._serve_supported is False:
+            return self._run_once(d2_source, layout, timeout)
+
+        request = {"op": "layout", "src": d2_source, "layout": layout, "timeout": timeout}
+        scope = current_scope()
+        limit = timeout + TIMEOUT_GRACE
+        try:
+            worker = self._slots.get(timeout=limit)
+        except queue.Empty:
+            raise D2JsonTimeout(f"no d2json worker free within {limit}s")
+
+        try:
+            for attempt in (1, 2):
+                try:
+                    worker = self._healthy(worker)
+                except D2JsonError:
+                    worker = None
+                    raise
+                if worker is None:  # binary has no serve mode
+                    return self._run_once(d2_source, layout, timeout)
+                unregister = scope.on_cancel(worker.terminate) if scope else None
+                try:
+                    response = worker.call(request, limit)
+                    break
+                except D2JsonTimeout:
+                    self._discard(worker, "timed out")
+                    worker = None
+                    raise
+                except _WorkerGone as e:
+                    self._discard(worker, "request cancelled" if scope and scope.cancelled else str(e))
+                    worker = None
+                    if scope and scope.cancelled:
+                        raise D2JsonError("d2json request cancelled")
+                    if attempt == 2:
+                        raise D2JsonError(f"d2json worker crashed: {e}")
+                finally:
+                    if unregister:
+                        unregister()
+        finally:
+            self._slots.put(worker)
+
+        if not response.get("ok"):
+            raise D2JsonError(response.get("error") or "d2json failed")
+        return response.get("result") or {}
+
+    def close(self) -> None:
+        """Stop every idle worker (busy ones are stopped when returned)."""
+        idle = []
+        while True:
+            try:
+                idle.append(self._slots.get_nowait())
+            except queue.Empty:
+                break
+        for worker in idle:
+            if worker is not None:
+                worker.kill()
+            self._slots.put(None)
+
+    # ── helpers ──────────────────────────────────────────
+
+    def _healthy(self, worker: Optional[_Worker]) -> Optional[_Worker]:
+        if worker is not None and worker.alive:
+            if time.monotonic() - worker.last_used < HEALTHCHECK_IDLE_SEC:
+                return worker
+            if worker.ping(START_TIMEOUT):
+                return worker
+        if worker is not None:
+            self._discard(worker, "failed health check")
+        return self._spawn()
+
+    def _spawn(self) -> Optional[_Worker]:
+        for _ in range(SPAWN_ATTEMPTS):
+            try:
+                worker = _Worker(self.binary)
+            except OSError as e:
+                raise D2JsonError(f"cannot start d2json: {e}") from e
+            if worker.ping(START_TIMEOUT):
+                self._serve_supported = True
+                return worker
+            exit_code = worker.exit_code()
+            worker.kill()
+            if exit_code == USAGE_EXIT_CODE and not self._serve_supported:
+                log_error(f"[d2json] {self.binary} has no -serve mode – rebuild it; running one process per call")
+                self._serve_supported = False
+                return None
+            # Slow cold start or a crash: not evidence that -serve is missing
+            self.restarts += 1
+            log_error(f"[d2json] worker failed to start (exit code {exit_code}); retrying")
+        raise D2JsonError("d2json worker failed to start")
+
+    def _discard(self, worker: _Worker, reason: str) -> None:
+        self.restarts += 1
+        log_error(f"[d2json] replacing worker pid={worker.proc.pid}: {reason}")
+        worker.kill()
+
+    def _run_once(self, d2_source: str, layout: str, timeout: int) -> Dict[str, Any]:
+        proc = subprocess.Popen(
+            [self.binary, "-timeout", str(timeout), "--layout", layout],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        scope = current_scope()
+        unregister = scope.on_cancel(proc.kill) if scope else None
+        try:
+            stdout, stderr = proc.communicate(d2_source.encode(), timeout=timeout + TIMEOUT_GRACE)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise D2JsonTimeout(f"d2json did not answer within {timeout + TIMEOUT_GRACE}s")
+        finally:
+            if unregister:
+                unregister()
+        if proc.returncode != 0:
+            raise D2JsonError(stderr.decode(errors="replace").strip() or f"d2json exited with {proc.returncode}")
+        try:
+            return json.loads(stdout)
+        except ValueError as e:
+            raise D2JsonError(f"invalid JSON from d2json: {e}")
+
+
+# ── process-wide singleton ───────────────────────────────────────────────────
+
+_POOL: Optional[D2JsonPool] = None
+_POOL_PID = 0
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool() -> D2JsonPool:
+    """Shared pool of this process (re-created after a fork)."""
+    global _POOL, _POOL_PID
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_PID != os.getpid():
+            _POOL = D2JsonPool()
+            _POOL_PID = os.getpid()
+            log_info(f"[d2json] worker pool ready – binary={_POOL.binary}, size={_POOL.size}")
+        return _POOL
+
+
+@atexit.register
+def _shutdown() -> None:
+    if _POOL is not None and _POOL_PID == os.getpid():
+        _POOL.close()
@@ -16,11 +16,6 @@ parse(dsl: str, algo="elk")  -> DSLDiagram
 
 from __future__ import annotations
 
-import json
-import os
-import subprocess
-import shutil
-from pathlib import Path
 from typing import List
 
 # ── logger import with fallback ───────────────────────────────
@@ -36,6 +31,8 @@ except ModuleNotFoundError:
             print(msg)
 
 from core.dsl.dsl_types import DSLDiagram, DSLNode, DSLEdge
+from core.dsl.async_exec import run_blocking
+from core.dsl.d2json_pool import D2JsonError, D2JsonTimeout, get_pool, resolve_d2json_binary
 
 # ── configuration ────────────────────────────────────────────────────────────
 
@@ -43,38 +40,8 @@ LAYOUT_ENGINE = "elk"            # "elk" for best quality; falls back internally
 D2JSON_TIMEOUT = 15              # timeout in seconds to prevent hanging
 
 
-# ── helper to resolve the d2json binary path ─────────────────────────────────
-
-def _find_d2json_binary() -> str:
-    """Locate the d2json binary. Search in PATH first, then common project locations."""
-
-    # 1) PATH lookup via shutil.which
-    path = shutil.which("d2json")
-    if path:
-        log_info(f"[d2lang] Found d2json in PATH: {path}")
-        return path
-
-    # 2) Relative project paths
-    base_dir = Path(__file__).resolve().parent.parent.parent  # sdr_backend/core/dsl → project root
-    candidate_paths = [
-        base_dir / "tools" / "cmd" / "d2json" / "d2json",
-        base_dir / "sdr_backend" / "tools" / "cmd" / "d2json" / "d2json",
-        Path.home() / "bin" / "d2json",
-        Path("/usr/local/bin/d2json"),
-    ]
-
-    for p in candidate_paths:
-        if p.exists() and os.access(p, os.X_OK):
-            log_info(f"[d2lang] Found d2json at: {p}")
-            return str(p)
-
-    # If not found, raise clear error
-    log_error("d2json binary not found. Ensure it is built and on PATH or in project tools.")
-    raise FileNotFoundError("d2json binary not found")
-
-
 # Resolve binary once at import time (raises if missing)
-D2JSON_BIN = _find_d2json_binary()
+D2JSON_BIN = resolve_d2json_binary()
 
 
 class D2LangParser:
@@ -86,24 +53,18 @@ class D2LangParser:
 
         log_info(f"[d2lang] compiling with d2json (timeout: {D2JSON_TIMEOUT}s)…")
         try:
-            proc = subprocess.run(
-                [D2JSON_BIN, "-timeout", str(D2JSON_TIMEOUT), "--layout", LAYOUT_ENGINE],
-                input=d2_text.encode(),
-                check=True,
-                capture_output=True,
-                timeout=D2JSON_TIMEOUT + 2  # Give process a little extra time beyond the binary's own timeout
-            )
-            data = json.loads(proc.stdout)
-            return self._to_dsl_diagram(data)
-        except subprocess.TimeoutExpired:
+            data = get_pool().run(d2_text, layout=LAYOUT_ENGINE, timeout=D2JSON_TIMEOUT)
+        except D2JsonTimeout:
             log_error(f"d2json process timed out after {D2JSON_TIMEOUT} seconds")
             raise ValueError(f"D2 parsing timed out: Process took longer than {D2JSON_TIMEOUT} seconds")
-        except subprocess.CalledProcessError as e:
-            log_error(f"Error running d2json: {e.stderr}")
-            raise ValueError(f"D2 parsing failed: {e.stderr}")
-        except json.JSONDecodeError as e:
-            log_error(f"Error parsing d2json output: {e}")
-            raise ValueError(f"Invalid JSON from d2json: {e}")
+        except D2JsonError as e:
+            log_error(f"Error running d2json: {e}")
+            raise ValueError(f"D2 parsing failed: {e}")
+        return self._to_dsl_diagram(data)
+
+    async def aparse(self, d2_text: str) -> DSLDiagram:
+        """:meth:`parse` for async callers – runs off the event loop."""
+        return await run_blocking("d2json", self.parse, d2_text)
 
     # ── helpers ──────────────────────────────────────────
     @staticmethod
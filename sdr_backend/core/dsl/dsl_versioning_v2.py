@@ -18,6 +18,7 @@ from sqlalchemy import select, func, delete
 
 # Add import for settings
 from config.settings import IR_BUILDER_MIN_ACTIVE
+from core.db.blob_codec import decode_blob, encode_blob
 from models.db_schema_models_v2 import Diagram, DiagramVersion
 from utils.logger import log_info
 
@@ -47,6 +48,10 @@ class DSLVersioningV2:
 
         pinned_nodes = pinned_nodes or []
 
+        # Fetch the Diagram row up-front – its IR seeds incremental enrichment
+        stmt = select(Diagram).where(Diagram.project_id == project_id)
+        diagram = db.execute(stmt).scalar_one_or_none()
+
         # ------------------------------------------------------------------
         #  Optional IR generation (Phase-2)
         # ------------------------------------------------------------------
@@ -71,7 +76,7 @@ class DSLVersioningV2:
                 
                 log_info("IR flow: Running enrichment pipeline with IrEnricher")
                 enricher = IrEnricher()
-                ir_graph = enricher.run(base_graph)
+                ir_graph = enricher.run_incremental(base_graph, decode_blob(diagram.ir_json) if diagram else None)
 
                 log_info(f"IR flow: Generation complete - graph has {len(ir_graph.nodes)} nodes, {len(ir_graph.edges)} edges, {len(ir_graph.groups)} groups")
                 ir_json = ir_graph.model_dump()  # dict ready for JSONB column
@@ -80,9 +85,9 @@ class DSLVersioningV2:
         else:
             log_info("IR flow disabled - skipping IR generation")
 
-        # Fetch or create Diagram row
-        stmt = select(Diagram).where(Diagram.project_id == project_id)
-        diagram = db.execute(stmt).scalar_one_or_none()
+        # Stored form – compact blobs when DIAGRAM_BLOB_COMPACT is enabled
+        rendered_json, ir_json = encode_blob(rendered_json), encode_blob(ir_json)
+
         if diagram is None:
             diagram = Diagram(
                 project_id=project_id,
@@ -148,6 +153,11 @@ class DSLVersioningV2:
 
         pinned_nodes = pinned_nodes or []
 
+        # Fetch diagram (async) – its IR seeds incremental enrichment
+        stmt = select(Diagram).where(Diagram.project_id == project_id)
+        result = await db.execute(stmt)
+        diagram = result.scalars().first()
+
         ir_json: dict | None = None
         # Replace os.getenv with imported setting
         if IR_BUILDER_MIN_ACTIVE:
@@ -160,7 +170,7 @@ class DSLVersioningV2:
                 # Log each major step in the process
                 log_info("[async] IR flow: Parsing DSL with D2LangParser")
                 dsl_parser = D2LangParser()
-                dsl_diagram = dsl_parser.parse(d2_dsl)
+                dsl_diagram = await dsl_parser.aparse(d2_dsl)
                 
                 log_info("[async] IR flow: Building base IR graph with IRBuilder")
                 builder = IRBuilder()
@@ -168,7 +178,7 @@ class DSLVersioningV2:
                 
                 log_info("[async] IR flow: Running enrichment pipeline with IrEnricher")
                 enricher = IrEnricher()
-                ir_graph = enricher.run(base_graph)
+                ir_graph = enricher.run_incremental(base_graph, decode_blob(diagram.ir_json) if diagram else None)
 
                 log_info(f"[async] IR flow: Generation complete - graph has {len(ir_graph.nodes)} nodes, {len(ir_graph.edges)} edges, {len(ir_graph.groups)} groups")
                 ir_json = ir_graph.model_dump()
@@ -177,10 +187,8 @@ class DSLVersioningV2:
         else:
             log_info("[async] IR flow disabled - skipping IR generation")
 
-        # Fetch diagram (async)
-        stmt = select(Diagram).where(Diagram.project_id == project_id)
-        result = await db.execute(stmt)
-        diagram = result.scalars().first()
+        # Stored form – compact blobs when DIAGRAM_BLOB_COMPACT is enabled
+        rendered_json, ir_json = encode_blob(rendered_json), encode_blob(ir_json)
 
         if diagram is None:
             diagram = Diagram(
@@ -4,9 +4,9 @@ Enhanced Layout Engine V3 - Multi-Engine Support with Intelligent Fallback
 ========================================================================
 
 Provides robust layout capabilities with:
-- Multiple layout engines: ELK, Dagre, Basic positioning
+- Multiple layout engines: ELK, Dagre, in-process Layered (Sugiyama), Basic positioning
 - Automatic complexity detection and engine selection
-- Intelligent fallback chain: ELK → Dagre → Basic
+- Intelligent fallback chain: ELK → Dagre → Layered (Layered only without d2json)
 - Direction control for all engines (LR, TB, BT, RL)
 - Performance monitoring and quality metrics
 - Layout validation and repair
@@ -16,26 +16,31 @@ Usage:
     result = engine.layout(diagram, direction='LR', preferred_engine='auto')
 """
 
-import json
-import time
-import subprocess
-import tempfile
 import os
+import time
 from enum import Enum
 from typing import Dict, List, Any, Optional, Tuple, NamedTuple
 from dataclasses import dataclass
 from utils.logger import log_info, log_error
+from core.dsl.d2json_pool import D2JsonError, d2json_available, get_pool
 from core.dsl.dsl_types import DSLDiagram, DSLNode, DSLEdge
 from core.ir.layout.constraint_adapter import ir_to_dsl, ir_hash
 from core.ir.layout import cache as ir_cache
+from core.ir.layout.layered import layered_layout, layered_layout_ir
+from core.ir.canonical_hash import item_hash
 from core.ir.ir_types import IRGraph
 from collections import defaultdict
 
+# Diagrams up to this many nodes skip d2json and use the in-process layered
+# engine first (0 = only when the d2json binary is missing)
+LAYERED_MAX_NODES = int(os.getenv("LAYERED_LAYOUT_MAX_NODES", "0"))
+
 
 class LayoutEngine(Enum):
     """Available layout engines in order of preference."""
     ELK = "elk"
     DAGRE = "dagre" 
+    LAYERED = "layered"  # in-process Sugiyama, no d2json needed
     BASIC = "basic"
     AUTO = "auto"  # Automatic selection based on complexity
 
@@ -112,6 +117,7 @@ class EnhancedLayoutEngineV3:
         self.engine_performance: Dict[LayoutEngine, List[float]] = {
             LayoutEngine.ELK: [],
             LayoutEngine.DAGRE: [],
+            LayoutEngine.LAYERED: [],
             LayoutEngine.BASIC: []
         }
     
@@ -147,16 +153,38 @@ class EnhancedLayoutEngineV3:
                 quality_score=1.0,
             )
 
+        key = ir_cache.layout_key(
+            item_hash(diagram), direction=direction.value, engine=preferred_engine.value
+        )
+        cached = ir_cache.get(key)
+        if cached:
+            return LayoutResult(
+                diagram=cached.diagram,
+                engine_used=LayoutEngine(cached.meta.get("engine", preferred_engine.value)),
+                direction_used=direction,
+                execution_time=time.time() - start_time,
+                success=True,
+                quality_score=cached.meta.get("quality", 1.0),
+            )
+
         # ------------------------------------------------------------------
-        #  Engine order: ELK first → Dagre second.  No complexity heuristics.
+        #  Engine order: ELK first → Dagre second → Layered last resort.
+        #  No complexity heuristics.
         # ------------------------------------------------------------------
         if preferred_engine == LayoutEngine.AUTO:
             selected_engines = [LayoutEngine.ELK, LayoutEngine.DAGRE]
+            if len(diagram.nodes) <= LAYERED_MAX_NODES:
+                selected_engines.insert(0, LayoutEngine.LAYERED)
         else:
             # Always ensure dagre is the fallback if preferred fails.
             selected_engines = [preferred_engine]
             if preferred_engine != LayoutEngine.DAGRE:
                 selected_engines.append(LayoutEngine.DAGRE)
+        if not d2json_available():
+            # ELK and Dagre both run through d2json – don't even try them
+            selected_engines = [LayoutEngine.LAYERED]
+        elif LayoutEngine.LAYERED not in selected_engines:
+            selected_engines.append(LayoutEngine.LAYERED)
 
         log_info(
             "Layout engine attempt order (no complexity heuristics): "
@@ -188,13 +216,18 @@ class EnhancedLayoutEngineV3:
                 result.fallback_chain = selected_engines
 
                 # --- IR-aware crossing reduction (post ELK) ---
-                try:
-                    from core.ir.layout.crossing_reducer import reduce_crossings
-                    result.diagram = reduce_crossings(result.diagram)
-                except Exception as e:
-                    log_error(f"crossing reducer failed: {e}")
+                # The layered engine minimises crossings itself.
+                if engine != LayoutEngine.LAYERED:
+                    try:
+                        from core.ir.layout.crossing_reducer import reduce_crossings
+                        result.diagram = reduce_crossings(result.diagram, direction.value)
+                    except Exception as e:
+                        log_error(f"crossing reducer failed: {e}")
 
                 self.layout_history.append(result)
+                ir_cache.set(
+                    key, result.diagram, engine=result.engine_used.value, quality=result.quality_score
+                )
 
                 log_info(f"Layout successful: {result}")
                 return result
@@ -223,10 +256,20 @@ class EnhancedLayoutEngineV3:
         from core.ir.layout.ir_to_elk import IRLayoutEngine
         from core.ir.layout.crossing_reducer import reduce_crossings
 
-        key = ir_hash(ir_graph)
+        # Direction changes the result – it is part of the key
+        native = not d2json_available() or len(ir_graph.nodes) <= LAYERED_MAX_NODES
+        key = ir_cache.layout_key(
+            ir_hash(ir_graph), direction=direction.value, engine="layered" if native else "ir"
+        )
         cached = ir_cache.get(key)
         if cached:
-            return cached  # already a positioned DSLDiagram
+            return cached.diagram  # already a positioned DSLDiagram
+
+        if native:
+            # In-process Sugiyama – lanes from the IR layer hints, no subprocess
+            positioned = layered_layout_ir(ir_graph, direction.value)
+            ir_cache.set(key, positioned, engine=LayoutEngine.LAYERED.value)
+            return positioned
 
         # Use our new direct IR to ELK approach
         try:
@@ -245,7 +288,7 @@ class EnhancedLayoutEngineV3:
             
             # Apply crossing reduction as a post-process
             try:
-                positioned = reduce_crossings(positioned)
+                positioned = reduce_crossings(positioned, direction.value)
             except Exception as e:
                 log_error(f"crossing reducer failed: {e}")
             
@@ -366,6 +409,8 @@ class EnhancedLayoutEngineV3:
                 positioned_diagram = self._layout_with_elk(diagram, direction)
             elif engine == LayoutEngine.DAGRE:
                 positioned_diagram = self._layout_with_dagre(diagram, direction)
+            elif engine == LayoutEngine.LAYERED:
+                positioned_diagram = self._layout_with_layered(diagram, direction)
             elif engine == LayoutEngine.BASIC:
                 positioned_diagram = self._layout_with_basic(diagram, direction)
             else:
@@ -402,94 +447,32 @@ class EnhancedLayoutEngineV3:
         """Layout using Dagre algorithm via D2."""
         return self._layout_with_d2(diagram, "dagre", direction)
     
+    def _layout_with_layered(self, diagram: DSLDiagram, direction: LayoutDirection) -> DSLDiagram:
+        """Layout in-process with the layered (Sugiyama) engine."""
+        return layered_layout(
+            diagram,
+            direction.value,
+            min_width=self.min_node_width,
+            min_height=self.min_node_height,
+        )
+
     def _layout_with_d2(
         self,
         diagram: DSLDiagram,
         algorithm: str,
         direction: LayoutDirection,
     ) -> DSLDiagram:
-        """Layout using project-local *d2json* binary (always JSON)."""
-
-        d2json_bin = self._find_d2json_binary()
+        """Layout using the shared pool of persistent *d2json* workers."""
 
         # Convert diagram to D2 source so d2json can lay it out.
         d2_content = self._diagram_to_d2(diagram, direction)
 
-        # Write to temp file for the binary to read.
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".d2", delete=False) as f:
-            f.write(d2_content)
-            temp_file = f.name
-
         try:
-            cmd = [
-                d2json_bin,
-                "--layout",
-                algorithm,
-                temp_file,
-            ]
-
-            try:
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=30,
-                    check=True,
-                )
-            except subprocess.CalledProcessError as cpe:
-                err_msg = (
-                    f"d2json {algorithm} exited with {cpe.returncode}. "
-                    f"stderr: {cpe.stderr.strip()[:300]}"
-                )
-                raise RuntimeError(err_msg) from cpe
+            layout_data = get_pool().run(d2_content, layout=algorithm, timeout=30)
+        except D2JsonError as e:
+            raise RuntimeError(f"d2json {algorithm} failed: {str(e)[:300]}") from e
 
-            # Parse JSON emitted by d2json
-            try:
-                layout_data = json.loads(result.stdout)
-            except json.JSONDecodeError as jde:
-                raise RuntimeError(
-                    f"d2json {algorithm} produced invalid JSON: {jde} – first 200 chars: {result.stdout[:200]}"
-                ) from jde
-
-            return self._d2_json_to_diagram(layout_data, diagram)
-        finally:
-            try:
-                os.unlink(temp_file)
-            except OSError:
-                pass
-
-    # ------------------------------------------------------------------
-    #  d2json binary resolution (copied from dsl_parser_v2)
-    # ------------------------------------------------------------------
-
-    @staticmethod
-    def _find_d2json_binary() -> str:
-        """Locate the *d2json* binary used across the backend."""
-        import shutil
-        from pathlib import Path
-
-        # 1) PATH lookup
-        path = shutil.which("d2json")
-        if path:
-            return path
-
-        # 2) Common project-relative locations
-        base_dir = Path(__file__).resolve().parent.parent.parent.parent  # project root
-        candidate_paths = [
-            base_dir / "tools" / "cmd" / "d2json" / "d2json",
-            base_dir / "sdr_backend" / "tools" / "cmd" / "d2json" / "d2json",
-            Path.home() / "bin" / "d2json",
-            Path("/usr/local/bin/d2json"),
-            Path("/usr/bin/d2json"),
-        ]
-
-        for p in candidate_paths:
-            if p.is_file() and os.access(p, os.X_OK):
-                return str(p)
-
-        raise FileNotFoundError(
-            "d2json binary not found – ensure it is built and on PATH or under tools/cmd/d2json."
-        )
+        return self._d2_json_to_diagram(layout_data, diagram)
     
     def _layout_with_basic(self, diagram: DSLDiagram, direction: LayoutDirection) -> DSLDiagram:
         """Basic grid-based layout implementation."""
@@ -16,12 +16,7 @@ parse(dsl: str, algo="elk")  -> DSLDiagram
 
 from __future__ import annotations
 
-import json
-import os
-import subprocess
 from typing import Dict, Any, List
-import tempfile
-from pathlib import Path
 
 # ── logger import with fallback ───────────────────────────────
 try:
@@ -36,6 +31,8 @@ except ModuleNotFoundError:  # when project root not on PYTHONPATH
             print(msg)
 
 from .dsl_types import DSLDiagram, DSLNode, DSLEdge
+from .async_exec import run_blocking
+from .d2json_pool import D2JsonError, D2JsonTimeout, get_pool, resolve_d2json_binary
 
 # Default timeout for d2json process in seconds
 D2JSON_TIMEOUT = 15
@@ -45,80 +42,30 @@ class D2LangParser:
     
     def __init__(self):
         """Initialize the parser with paths to required tools."""
-        # Find d2json binary
-        self.d2json_path = self._find_d2json_binary()
+        # Binary is resolved once per process; the worker pool is shared
+        self.d2json_path = resolve_d2json_binary()
         log_info(f"D2 Parser initialized with d2json path: {self.d2json_path}")
 
-    def _find_d2json_binary(self) -> str:
-        """Find the d2json binary, searching in multiple locations."""
-        # Check if d2json is in PATH
-        try:
-            result = subprocess.run(["which", "d2json"], capture_output=True, text=True)
-            if result.returncode == 0:
-                path = result.stdout.strip()
-                log_info(f"Found d2json in PATH: {path}")
-                return path
-        except Exception:
-            pass  # Continue to other methods
-        
-        # Check in the project directory
-        base_dir = Path(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
-        possible_paths = [
-            base_dir / "tools" / "cmd" / "d2json" / "d2json",
-            base_dir / "sdr_backend" / "tools" / "cmd" / "d2json" / "d2json",
-            Path("/usr/local/bin/d2json"),
-            Path("/usr/bin/d2json"),
-        ]
-        
-        for path in possible_paths:
-            if path.exists() and os.access(path, os.X_OK):
-                log_info(f"Found d2json at: {path}")
-                return str(path)
-        
-        # If not found, raise clear error
-        log_error("d2json binary not found! Please install d2json or ensure it's in the project path.")
-        raise FileNotFoundError("d2json binary not found. Required for D2 language parsing.")
-        
     def parse(self, d2_source: str) -> DSLDiagram:
         """Parse D2 language source into structured DSLDiagram."""
         log_info("Parsing D2 language source into DSLDiagram")
-        
-        # Create a temporary file for the D2 source
-        with tempfile.NamedTemporaryFile(mode="w+", suffix=".d2", delete=False) as temp:
-            temp.write(d2_source)
-            temp_path = temp.name
 
         try:
-            # Run d2json on the temp file WITH TIMEOUT
-            log_info(f"Running d2json on temporary file {temp_path} with {D2JSON_TIMEOUT}s timeout")
-            
-            # Add timeout to prevent hanging
-            result = subprocess.run(
-                [self.d2json_path, "-timeout", str(D2JSON_TIMEOUT), temp_path],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=D2JSON_TIMEOUT + 2  # Give process a little extra time beyond the binary's own timeout
-            )
-            
-            # Parse the JSON output
-            d2_json = json.loads(result.stdout)
-            log_info(f"[d2lang] parsed {len(d2_json.get('nodes', []))} nodes / {len(d2_json.get('edges', []))} edges")
-            
-            return self._convert_to_dsl_diagram(d2_json)
-        except subprocess.TimeoutExpired:
+            d2_json = get_pool().run(d2_source, timeout=D2JSON_TIMEOUT)
+        except D2JsonTimeout:
             log_error(f"d2json process timed out after {D2JSON_TIMEOUT} seconds")
             raise ValueError(f"D2 parsing timed out: Process took longer than {D2JSON_TIMEOUT} seconds")
-        except subprocess.CalledProcessError as e:
-            log_error(f"Error running d2json: {e.stderr}")
-            raise ValueError(f"D2 parsing failed: {e.stderr}")
-        except json.JSONDecodeError as e:
-            log_error(f"Error parsing d2json output: {e}")
-            raise ValueError(f"Invalid JSON from d2json: {e}")
-        finally:
-            # Clean up the temp file
-            os.unlink(temp_path)
-    
+        except D2JsonError as e:
+            log_error(f"Error running d2json: {e}")
+            raise ValueError(f"D2 parsing failed: {e}")
+
+        log_info(f"[d2lang] parsed {len(d2_json.get('nodes', []))} nodes / {len(d2_json.get('edges', []))} edges")
+        return self._convert_to_dsl_diagram(d2_json)
+
+    async def aparse(self, d2_source: str) -> DSLDiagram:
+        """:meth:`parse` for async callers – runs off the event loop."""
+        return await run_blocking("d2json", self.parse, d2_source)
+
     def _convert_to_dsl_diagram(self, d2_json: Dict[str, Any]) -> DSLDiagram:
         """Convert d2json output to DSLDiagram structure."""
         # Extract nodes
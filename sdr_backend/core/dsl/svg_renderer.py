@@ -1,9 +1,43 @@
 # core/dsl/svg_renderer.py
-import functools, subprocess, tempfile, os, redis
-from utils.logger import log_info
+import asyncio, functools, hashlib, subprocess, tempfile, os, redis
+from collections import OrderedDict
+from utils.logger import log_info, log_error
+from core.dsl.async_exec import run_exec
 
 rds = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
 
+RENDER_TIMEOUT = 30  # seconds
+REDIS_TIMEOUT = 0.5  # seconds; a slow cache lookup counts as a miss
+MEMORY_CACHE_SIZE = 256  # in-process tier of render_svg_async, like _render_once
+
+# only touched from the event loop, between awaits – no lock needed
+_memory: "OrderedDict[str, bytes]" = OrderedDict()
+
+def _cache_key(d2_src: str, theme: str) -> str:
+    # stable across processes, unlike hash() (randomised per interpreter)
+    digest = hashlib.blake2b(d2_src.encode(), digest_size=16).hexdigest()
+    return f"svg:{theme}:{digest}"
+
+async def _redis_call(method, *args, **kwargs):
+    """Run a blocking Redis call off the event loop; None on error or timeout."""
+    try:
+        return await asyncio.wait_for(asyncio.to_thread(method, *args, **kwargs), REDIS_TIMEOUT)
+    except Exception as e:
+        log_error(f"[svg] redis {method.__name__} skipped: {e!r}")
+        return None
+
+def _memory_get(cache_key: str):
+    svg = _memory.get(cache_key)
+    if svg is not None:
+        _memory.move_to_end(cache_key)
+    return svg
+
+def _memory_put(cache_key: str, svg: bytes) -> None:
+    _memory[cache_key] = svg
+    _memory.move_to_end(cache_key)
+    while len(_memory) > MEMORY_CACHE_SIZE:
+        _memory.popitem(last=False)
+
 @functools.lru_cache(maxsize=256)
 def _render_once(d2_src: str, theme: str) -> bytes:
     with tempfile.NamedTemporaryFile(suffix=".d2", delete=False) as f:
@@ -17,9 +51,29 @@ def _render_once(d2_src: str, theme: str) -> bytes:
     return svg
 
 def render_svg(d2_src: str, theme: str = "0") -> bytes:
-    cache_key = f"svg:{theme}:{hash(d2_src)}"
+    cache_key = _cache_key(d2_src, theme)
     if (cached := rds.get(cache_key)):
         return cached
     svg = _render_once(d2_src, theme)
     rds.set(cache_key, svg, ex=3600)
     return svg
+
+async def render_svg_async(d2_src: str, theme: str = "0") -> bytes:
+    """render_svg for async handlers – d2 runs without blocking the event loop."""
+    cache_key = _cache_key(d2_src, theme)
+    if (cached := _memory_get(cache_key)) is not None:
+        return cached
+    if (cached := await _redis_call(rds.get, cache_key)):
+        _memory_put(cache_key, cached)
+        return cached
+    # "-" as input reads the source from stdin – no temp file needed
+    svg = await run_exec(
+        "d2",
+        ["d2", "--layout", "elk", "--theme", theme, "-", "-"],
+        input=d2_src.encode(),
+        timeout=RENDER_TIMEOUT,
+    )
+    _memory_put(cache_key, svg)
+    await _redis_call(rds.set, cache_key, svg, ex=3600)
+    log_info(f"[svg] rendered {len(svg)} bytes (theme {theme})")
+    return svg
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+"""Canonical structural hashing of IR graphs.
+
+Every node, edge and group is hashed on its own (a *leaf*): the dumped
+model is serialised as compact JSON with sorted keys and fed to blake2b, so
+dict ordering never changes the digest.  The graph hash is a Merkle root
+over the leaves sorted by ``(kind, id)`` – list order does not matter
+either – and callers that keep the leaf maps can tell exactly which nodes or
+edges changed between two graphs via :func:`diff_hashes`.
+
+Only structure goes into the root: ``source_dsl`` and ``build_meta`` are
+left out, so re-formatted DSL or fresh enrichment bookkeeping still hits the
+layout cache.  Stdlib ``json`` is used on purpose – digests must be
+identical on every worker that shares a cache.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Mapping, Set
+
+from core.ir.ir_types import IRGraph
+
+DIGEST_SIZE = 16
+
+
+def item_hash(item: Any) -> str:
+    """Stable hash of one IR model (or its dumped dict)."""
+    data = item.model_dump() if hasattr(item, "model_dump") else item
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=DIGEST_SIZE).hexdigest()
+
+
+def _leaf_map(items: Iterable[Any]) -> Dict[str, str]:
+    return {item.id: item_hash(item) for item in items}
+
+
+@dataclass(frozen=True)
+class GraphHashes:
+    """Per-item leaf hashes plus the Merkle root of one graph."""
+
+    root: str
+    nodes: Dict[str, str] = field(default_factory=dict)
+    edges: Dict[str, str] = field(default_factory=dict)
+    groups: Dict[str, str] = field(default_factory=dict)
+
+
+def graph_hashes(graph: IRGraph) -> GraphHashes:
+    nodes = _leaf_map(graph.nodes)
+    edges = _leaf_map(graph.edges)
+    groups = _leaf_map(graph.groups)
+    annotations = _leaf_map(graph.annotations)
+
+    root = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    root.update(graph.version.encode("utf-8"))
+    for kind, leaves in (("n", nodes), ("e", edges), ("g", groups), ("a", annotations)):
+        for item_id in sorted(leaves):
+            root.update(f"\0{kind}\0{item_id}\0{leaves[item_id]}".encode("utf-8"))
+    return GraphHashes(root=root.hexdigest(), nodes=nodes, edges=edges, groups=groups)
+
+
+def structural_hash(graph: IRGraph) -> str:
+    """Merkle root of *graph* – the layout cache key."""
+    return graph_hashes(graph).root
+
+
+@dataclass(frozen=True)
+class HashDiff:
+    added: Set[str]
+    removed: Set[str]
+    changed: Set[str]
+
+    @property
+    def dirty(self) -> Set[str]:
+        """Ids whose content must be (re)processed: added or changed."""
+        return self.added | self.changed
+
+
+def diff_hashes(old: Mapping[str, str], new: Mapping[str, str]) -> HashDiff:
+    """Compare two leaf maps (``id -> hash``) from :func:`graph_hashes`."""
+    return HashDiff(
+        added={k for k in new if k not in old},
+        removed={k for k in old if k not in new},
+        changed={k for k, h in new.items() if k in old and old[k] != h},
+    )
@@ -5,6 +5,27 @@ return a *new* graph with additional metadata filled in.  The pipeline is
 kept deliberately functional (no in-place mutation) so that debugging and
 rollback are trivial.
 
+Every stage also has an ``*_inplace`` twin.  In *fused* mode (the default,
+``IR_ENRICH_FUSED=false`` to disable) the enricher makes a single private
+working copy of the input and runs the in-place twins on it, so a graph is
+copied once per run instead of once per stage.  Output is identical and the
+input graph is still never touched.
+
+In-place stages declare the graph paths they read and write.  For graphs of
+at least ``IR_ENRICH_PARALLEL_MIN_NODES`` nodes the fused enricher groups
+them into waves of mutually independent stages (e.g. edge classification
+next to label normalisation) and runs each wave on a thread pool; stages in
+a wave write disjoint fields, so the result is the same as a sequential run.
+
+:meth:`IrEnricher.run_incremental` takes the previous version's ``ir_json``
+and re-enriches only the nodes/edges whose base content changed (see
+:mod:`.incremental`); grouping is always recomputed over the merged graph.
+
+Every stage is timed: latency, node/edge counts and failures are exported as
+Prometheus metrics labelled by stage, and the per-stage breakdown of the last
+run is kept on ``IrEnricher.profile`` (returned to clients when
+``IR_ENRICH_PROFILE=true``).
+
 If any stage raises *ValidationError* (or a generic ``Exception``), the
 pipeline logs the error and returns the **input** graph unchanged.  This
 honours the backward-compatibility guarantee: the service will fall back to
@@ -13,25 +34,32 @@ the Phase-2 minimal graph instead of crashing.
 
 from __future__ import annotations
 
-from typing import Callable, List
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Mapping, Optional
 
 from pydantic import ValidationError
 
 from core.ir.ir_types import IRGraph
 from utils.logger import log_error, log_info
+from utils.prometheus_metrics import record_ir_enrich_error, record_ir_enrich_stage
 
 # ---------------------------------------------------------------------------
 #  Import individual stages
 # ---------------------------------------------------------------------------
 
-from .label_normalizer import normalize_labels  # noqa: E402  (import after __future__)
-from .taxonomy_mapper import assign_taxonomy  # noqa: E402  - NEW: Replace classifier.py
+from .label_normalizer import normalize_labels, normalize_labels_inplace  # noqa: E402  (import after __future__)
+from .taxonomy_mapper import assign_taxonomy, assign_taxonomy_inplace  # noqa: E402  - NEW: Replace classifier.py
 # from .classifier import classify_kinds  # noqa: E402 - REMOVED
 # from .layer_assigner import assign_layers  # noqa: E402 - REMOVED
-from .domain_inference import infer_domain  # noqa: E402
-from .risk_tagger import tag_risks  # noqa: E402
-from .edge_classifier import classify_edges  # noqa: E402
-from .simplified_grouping import assign_groups_by_kind  # noqa: E402 - NEW: Replace grouping.py
+from .domain_inference import infer_domain, infer_domain_inplace  # noqa: E402
+from .risk_tagger import tag_risks, tag_risks_inplace  # noqa: E402
+from .edge_classifier import classify_edges, classify_edges_inplace  # noqa: E402
+from .simplified_grouping import assign_groups_by_kind, assign_groups_by_kind_inplace  # noqa: E402 - NEW: Replace grouping.py
+from .working_graph import InplaceStage, stage_waves, working_copy  # noqa: E402
+from .incremental import enrich_incremental  # noqa: E402
 # from .grouping import assign_groups  # noqa: E402 - REMOVED
 # from .icon_mapper import resolve_icons  # noqa: E402 - REMOVED: Icons now come from taxonomy
 # from core.ir.layout.add_layer_hints import add_layer_hints  # noqa: E402 - REMOVED: Layer hints now come from taxonomy
@@ -47,33 +75,81 @@ STAGE_FUNCS: List[Callable[[IRGraph], IRGraph]] = [
     assign_groups_by_kind # N6: NEW - Create groups by kind
 ]
 
+# Same stages, same order – mutating one working copy (fused mode)
+INPLACE_STAGE_FUNCS: List[InplaceStage] = [
+    normalize_labels_inplace,
+    assign_taxonomy_inplace,
+    infer_domain_inplace,
+    tag_risks_inplace,
+    classify_edges_inplace,
+    assign_groups_by_kind_inplace,
+]
+
+FUSED_DEFAULT = os.getenv("IR_ENRICH_FUSED", "true").lower() in {"1", "true", "yes"}
+# Attach the per-stage profile to API responses (metrics are always exported)
+PROFILE_IN_RESPONSE = os.getenv("IR_ENRICH_PROFILE", "false").lower() in {"1", "true", "yes"}
+# Run independent fused stages concurrently from this graph size on
+PARALLEL_MIN_NODES = int(os.getenv("IR_ENRICH_PARALLEL_MIN_NODES", "500"))
+
+
+def stage_name(stage_func: Callable) -> str:
+    return stage_func.__name__.removesuffix("_inplace")
+
 
 class IrEnricher:
     """Execute the enrichment pipeline on an ``IRGraph`` instance."""
+
+    def __init__(self, fused: bool | None = None):
+        self.fused = FUSED_DEFAULT if fused is None else fused
+        # Per-stage timings of the most recent run (see ``_timed``)
+        self.profile: List[Dict[str, Any]] = []
     
     def run(self, graph: IRGraph) -> IRGraph:
-        """Run all enrichment stages in sequence.
+        """Run all enrichment stages in dependency order.
 
         If any stage fails, the error is logged and the input graph is returned
         unchanged (fail-safe guarantee).
         """
         log_info(f"IR enrichment pipeline starting - input has {len(graph.nodes)} nodes, {len(graph.edges)} edges")
-        
-        current_graph = graph
-        for i, stage_func in enumerate(STAGE_FUNCS):
-            stage_name = stage_func.__name__
-            log_info(f"IR enrichment pipeline stage {i+1}/{len(STAGE_FUNCS)}: {stage_name}")
-            
-            try:
-                next_graph = stage_func(current_graph)
-                log_info(f"IR enrichment stage {stage_name} completed successfully")
-                current_graph = next_graph
-            except ValidationError as ve:
-                log_error(f"IR enrichment stage {stage_name} failed validation: {ve}")
-                return graph  # backward-compat: return original unchanged
-            except Exception as e:
-                log_error(f"IR enrichment stage {stage_name} failed: {e}")
-                return graph  # backward-compat: return original unchanged
+        self.profile = []
+
+        # Fused mode: one private copy, every stage mutates it in place
+        stages = INPLACE_STAGE_FUNCS if self.fused else STAGE_FUNCS
+        current_graph = working_copy(graph) if self.fused else graph
+
+        # Large fused runs: independent stages of a wave share a thread pool
+        concurrent = self.fused and len(graph.nodes) >= PARALLEL_MIN_NODES
+        waves = stage_waves(stages) if concurrent else [[s] for s in stages]
+        pool = ThreadPoolExecutor(max_workers=max(map(len, waves)), thread_name_prefix="ir-enrich") \
+            if concurrent else nullcontext()
+
+        i = 0
+        with pool:
+            for wave in waves:
+                futures = {s: pool.submit(self._timed, s, current_graph) for s in wave} if len(wave) > 1 else {}
+                for stage_func in wave:
+                    i += 1
+                    name = stage_name(stage_func)
+                    log_info(f"IR enrichment pipeline stage {i}/{len(stages)}: {name}")
+
+                    try:
+                        if futures:
+                            futures[stage_func].result()
+                        elif self.fused:
+                            self._timed(stage_func, current_graph)
+                        else:
+                            current_graph = self._timed(stage_func, current_graph)
+                        log_info(f"IR enrichment stage {name} completed successfully")
+                    except ValidationError as ve:
+                        log_error(f"IR enrichment stage {name} failed validation: {ve}")
+                        return graph  # backward-compat: return original unchanged
+                    except Exception as e:
+                        log_error(f"IR enrichment stage {name} failed: {e}")
+                        return graph  # backward-compat: return original unchanged
+
+                if futures:  # keep the profile in pipeline order
+                    order = {stage_name(s): k for k, s in enumerate(wave)}
+                    self.profile[-len(wave):] = sorted(self.profile[-len(wave):], key=lambda p: order[p["stage"]])
         
         # Log summary of enrichment results
         node_kinds = set(node.kind for node in current_graph.nodes)
@@ -83,4 +159,37 @@ class IrEnricher:
         log_info(f"IR enrichment pipeline completed - identified layers: {node_layers}")
         log_info(f"IR enrichment pipeline completed - created {len(current_graph.groups)} groups")
         
-        return current_graph 
\ No newline at end of file
+        return current_graph 
+
+    def run_incremental(self, graph: IRGraph, previous: Optional[Mapping[str, Any]]) -> IRGraph:
+        """Enrich *graph* reusing unchanged parts of the *previous* ``ir_json``.
+
+        Falls back to a full :meth:`run` when there is nothing to diff against
+        or the incremental pass fails.
+        """
+        self.profile = []
+        try:
+            return enrich_incremental(graph, previous, self.run, run_stage=self._timed)
+        except Exception as e:
+            log_error(f"Incremental IR enrichment failed, running full pipeline: {e}")
+            return enrich_incremental(graph, None, self.run)
+
+    def _timed(self, stage_func: Callable[[IRGraph], Any], graph: IRGraph) -> Any:
+        """Run one stage, recording its latency, graph size and any failure."""
+        name = stage_name(stage_func)
+        start = time.perf_counter()
+        try:
+            result = stage_func(graph)
+        except Exception as e:
+            record_ir_enrich_error(name, type(e).__name__)
+            self.profile.append({"stage": name, "seconds": round(time.perf_counter() - start, 6),
+                                 "error": type(e).__name__})
+            raise
+        elapsed = time.perf_counter() - start
+
+        # Functional stages return the new graph, in-place ones mutate *graph*
+        out = result if isinstance(result, IRGraph) else graph
+        record_ir_enrich_stage(name, elapsed, len(out.nodes), len(out.edges))
+        self.profile.append({"stage": name, "seconds": round(elapsed, 6),
+                             "nodes": len(out.nodes), "edges": len(out.edges)})
+        return result
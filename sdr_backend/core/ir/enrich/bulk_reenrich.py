@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+"""Bulk re-enrichment of stored diagrams after a taxonomy change.
+
+Every enriched graph records the taxonomy checksum it was produced with
+(``build_meta["enrich"]``, see :mod:`.incremental`).  This job walks the
+``diagrams`` and ``diagram_versions`` tables in keyset-paginated pages,
+re-enriches every row whose checksum differs from the live snapshot across a
+``ProcessPoolExecutor``, writes each page back in one batched ``UPDATE`` and
+checkpoints the last processed id per table so an interrupted run resumes
+where it stopped.
+
+Base graphs are recovered from the stored IR itself – ``IRBuilder`` only
+sets id/name (the pre-normalisation name survives as ``orig_label``) and
+edge endpoints/labels – so the d2json binary is only needed for rows that
+have no IR at all.  Plain SQLAlchemy Core keeps the job portable between
+Postgres and a local SQLite stand-in.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import sqlalchemy as sa
+
+from core.db.blob_codec import decode_blob, encode_blob
+from core.ir.ir_builder import IRBuilder
+from core.ir.ir_types import IRGraph, trusted_edge, trusted_node
+from utils.logger import log_error, log_info
+
+from . import IrEnricher
+from .incremental import META_KEY
+from .taxonomy_client import get_snapshot
+
+TABLES: Tuple[str, ...] = ("diagrams", "diagram_versions")
+DEFAULT_PAGE_SIZE = 200
+
+Row = Tuple[int, Optional[str], Optional[Mapping[str, Any]]]
+
+
+def _table(name: str) -> sa.TableClause:
+    return sa.table(name, sa.column("id", sa.Integer), sa.column("d2_dsl", sa.Text), sa.column("ir_json", sa.JSON))
+
+
+def is_stale(ir_json: Optional[Mapping[str, Any]], checksum: str) -> bool:
+    """True unless *ir_json* was enriched against taxonomy *checksum*."""
+    meta = ((ir_json or {}).get("build_meta") or {}).get(META_KEY) or {}
+    return meta.get("taxonomy_checksum") != checksum
+
+
+def base_graph(ir_json: Optional[Mapping[str, Any]], d2_dsl: Optional[str]) -> IRGraph:
+    """Recover the un-enriched ``IRBuilder`` output for a stored row."""
+    if not ir_json:
+        # Lazy import – the parser needs the d2json binary at import time
+        from core.dsl.dsl_parser_v2 import D2LangParser
+
+        return IRBuilder().build(D2LangParser().parse(d2_dsl or ""), source_dsl=d2_dsl or "")
+
+    nodes = [
+        trusted_node(dict(
+            id=n["id"],
+            name=(n.get("metadata") or {}).get("orig_label", n["name"]),
+            kind=IRBuilder.DEFAULT_KIND,
+            layer=IRBuilder.DEFAULT_LAYER,
+        ))
+        for n in ir_json.get("nodes", [])
+    ]
+    edges = [
+        trusted_edge(dict(id=e["id"], source=e["source"], target=e["target"], label=e.get("label")))
+        for e in ir_json.get("edges", [])
+    ]
+    build_meta = {k: v for k, v in (ir_json.get("build_meta") or {}).items() if k != META_KEY}
+    return IRGraph.model_construct(
+        nodes=nodes,
+        edges=edges,
+        groups=[],
+        annotations=[],
+        source_dsl=ir_json.get("source_dsl") or d2_dsl or "",
+        build_meta=build_meta,
+    )
+
+
+def reenrich_row(row: Row) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """Worker entry point: re-enrich one stored row, ``None`` on failure."""
+    row_id, d2_dsl, ir_json = row
+    try:
+        enriched = IrEnricher().run_incremental(base_graph(ir_json, d2_dsl), None)
+    except Exception as e:
+        log_error(f"[reenrich] row {row_id} failed: {e}")
+        return row_id, None
+    if META_KEY not in enriched.build_meta:  # pipeline fell back to the base graph
+        return row_id, None
+    return row_id, enriched.model_dump(mode="json")
+
+
+def _worker_init() -> None:
+    get_snapshot()  # load the taxonomy once per worker process
+
+
+# ---------------------------------------------------------------------------
+#  Checkpointing
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Checkpoint:
+    """Last processed row id per table, valid for one taxonomy checksum."""
+
+    path: Optional[Path]
+    checksum: str
+    positions: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Optional[Path], checksum: str) -> "Checkpoint":
+        if path is None or not path.exists():
+            return cls(path, checksum)
+        try:
+            obj = json.loads(path.read_text("utf-8"))
+        except Exception as e:
+            log_error(f"[reenrich] unreadable checkpoint {path}, starting over: {e}")
+            return cls(path, checksum)
+        if obj.get("taxonomy_checksum") != checksum:
+            log_info("[reenrich] checkpoint is for another taxonomy version, starting over")
+            return cls(path, checksum)
+        return cls(path, checksum, {k: int(v) for k, v in (obj.get("positions") or {}).items()})
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"taxonomy_checksum": self.checksum, "positions": self.positions}), "utf-8")
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class ReenrichStats:
+    scanned: int = 0
+    reenriched: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def graphs_per_sec(self) -> float:
+        return self.reenriched / self.seconds if self.seconds else 0.0
+
+
+# ---------------------------------------------------------------------------
+#  Job
+# ---------------------------------------------------------------------------
+
+def _pages(engine: sa.engine.Engine, name: str, after: int, page_size: int) -> Iterator[Sequence[Any]]:
+    t = _table(name)
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                sa.select(t.c.id, t.c.d2_dsl, t.c.ir_json).where(t.c.id > after).order_by(t.c.id).limit(page_size)
+            ).all()
+        if not rows:
+            return
+        yield rows
+        after = rows[-1].id
+
+
+def _write_back(engine: sa.engine.Engine, name: str, updates: List[Dict[str, Any]]) -> None:
+    t = _table(name)
+    stmt = sa.update(t).where(t.c.id == sa.bindparam("row_id")).values(ir_json=sa.bindparam("ir_json"))
+    with engine.begin() as conn:
+        conn.execute(stmt, updates)
+
+
+def run_bulk_reenrich(
+    engine: sa.engine.Engine,
+    *,
+    checkpoint_path: Optional[Path] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    workers: Optional[int] = None,
+    tables: Sequence[str] = TABLES,
+    force: bool = False,
+) -> ReenrichStats:
+    """Re-enrich every stored graph that is stale for the live taxonomy.
+
+    *workers* defaults to the CPU count; ``0`` runs in-process.  *force*
+    re-enriches up-to-date rows too.
+    """
+    checksum = get_snapshot().checksum
+    checkpoint = Checkpoint.load(checkpoint_path, checksum)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    stats = ReenrichStats()
+    log_info(f"[reenrich] starting – taxonomy={checksum}, workers={workers}, page_size={page_size}")
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) if workers > 0 else None
+    start = time.perf_counter()
+    try:
+        for name in tables:
+            for page in _pages(engine, name, checkpoint.positions.get(name, 0), page_size):
+                stored = [(r.id, r.d2_dsl, decode_blob(r.ir_json)) for r in page]
+                todo = [r for r in stored if force or is_stale(r[2], checksum)]
+                if pool is not None:
+                    results = list(pool.map(reenrich_row, todo, chunksize=max(1, len(todo) // (workers * 4))))
+                else:
+                    results = [reenrich_row(r) for r in todo]
+
+                updates = [{"row_id": row_id, "ir_json": encode_blob(ir)} for row_id, ir in results if ir is not None]
+                if updates:
+                    _write_back(engine, name, updates)
+                checkpoint.positions[name] = page[-1].id
+                checkpoint.save()
+
+                stats.scanned += len(page)
+                stats.reenriched += len(updates)
+                stats.failed += len(results) - len(updates)
+                stats.seconds = time.perf_counter() - start
+                log_info(
+                    f"[reenrich] {name} ≤ id {page[-1].id}: {len(updates)}/{len(page)} rows re-enriched – "
+                    f"{stats.reenriched} total, {stats.graphs_per_sec:.1f} graphs/s"
+                )
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        stats.seconds = time.perf_counter() - start
+
+    log_info(
+        f"[reenrich] done – scanned={stats.scanned}, re-enriched={stats.reenriched}, "
+        f"failed={stats.failed}, {stats.graphs_per_sec:.1f} graphs/s"
+    )
+    return stats
@@ -3,18 +3,13 @@ import re
 from functools import lru_cache
 from pathlib import Path
 import os
-from typing import List, Tuple, Dict, Any
+from typing import List, Sequence, Tuple, Dict, Any
 
 
 
 from .taxonomy_client import (
-    load_taxonomy,
+    get_snapshot,
     normalize_label,
-    word_vote_lookup,
-    slugify,
-    _PRIMARY_BY_SLUG,
-    _DNAME_BY_SLUG,
-    _ALIAS_BY_SLUG,
 )
 from .fuzzy_match import fuzzy_best_match
 from core.ir.ir_types import IRGraph, IRNode
@@ -83,18 +78,6 @@ _PATTERN_RULES: List[Tuple[re.Pattern[str], str, str | None]] = _dynamic_rules +
 
 _DEFAULT_KIND = "Service"
 
-_TAXONOMY = load_taxonomy(force=True)
-_FUZZY_KEYS = list(_TAXONOMY.keys())
-# Provide a concise summary instead of dumping the entire taxonomy dict.
-log_info(f"Taxonomy loaded with {len(_TAXONOMY)} entries.")
-
-# Log each taxonomy entry's key along with the first five key-value pairs of its data.
-# This prevents overwhelming the logs while still surfacing useful information for debugging.
-# for _token, _row in _TAXONOMY.items():
-#     # Extract the first five items (or fewer if the row is smaller).
-#     _row_preview = {k: _row[k] for k in list(_row.keys())[:5]}
-#     log_info(f"{_token}: {_row_preview}")
-
 
 # Head noun shortcuts for ultra-generic labels
 _HEAD_MAP: Dict[str, Tuple[str, str | None]] = {
@@ -140,7 +123,7 @@ def _row_to_kind(row: Dict[str, Any]) -> Tuple[str, str | None, Dict]:
     return row.get("kind", _DEFAULT_KIND), row.get("subkind"), meta
 
 
-def _best_alias_match(raw_label: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+def _best_alias_match(raw_label: str, rows: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
     """Select row whose token shares most words with the raw label."""
     raw_words = set(re.findall(r"[a-z0-9]+", raw_label.lower()))
     best_row = rows[0]
@@ -169,6 +152,7 @@ def _classify(label_lc: str) -> tuple[str, str | None, dict]:
     """Classify a label using a tiered, deterministic lookup sequence."""
 
     slug, _ = normalize_label(label_lc)
+    snapshot = get_snapshot()
 
     db_ctx = bool(re.search(r"\b(database|db)\b", label_lc))
 
@@ -185,19 +169,19 @@ def _classify(label_lc: str) -> tuple[str, str | None, dict]:
     # -------------------------------------------------------------------
     for cand in _candidate_slugs(slug):
         # 1. canonical token match
-        row = (_PRIMARY_BY_SLUG.get(cand) or _PRIMARY_BY_SLUG.get(_PROVIDER_PREFIX.sub("", cand)))
+        row = (snapshot.primary(cand) or snapshot.primary(_PROVIDER_PREFIX.sub("", cand)))
         if row and (required_kind is None or row.get("kind") == required_kind):
             log_info(f"[classifier] token-exact hit for '{label_lc}' via '{cand}' -> token='{row['token']}'")
             return _row_to_kind(row)
 
         # 2. display-name match
-        row = _DNAME_BY_SLUG.get(cand)
+        row = snapshot.display(cand)
         if row and (required_kind is None or row.get("kind") == required_kind):
             log_info(f"[classifier] display-name hit for '{label_lc}' via '{cand}' -> token='{row['token']}'")
             return _row_to_kind(row)
 
         # 3. alias match
-        alias_rows = _ALIAS_BY_SLUG.get(cand)
+        alias_rows = snapshot.aliases(cand)
         if alias_rows:
             row = _best_alias_match(label_lc, alias_rows)
             if required_kind is None or row.get("kind") == required_kind:
@@ -205,15 +189,15 @@ def _classify(label_lc: str) -> tuple[str, str | None, dict]:
                 return _row_to_kind(row)
 
     # 4) Word-vote heuristics
-    row = word_vote_lookup(label_lc)
+    row = snapshot.word_vote(label_lc)
     if row and (required_kind is None or row.get("kind") == required_kind):
         log_info(f"[classifier] word-vote hit for '{label_lc}' -> token='{row['token']}'")
         return _row_to_kind(row)
 
     # 5) Fuzzy best match (expensive)
-    key, score = fuzzy_best_match(slug, _FUZZY_KEYS)
+    key, score = fuzzy_best_match(slug, snapshot.fuzzy_keys)
     if key:
-        row = _TAXONOMY[key]
+        row = snapshot.flat[key]
         if required_kind is None or row.get("kind") == required_kind:
             log_info(f"[classifier] fuzzy hit for '{label_lc}' -> token='{row['token']}', score={score}")
             return _row_to_kind(row)
@@ -233,21 +217,16 @@ def _classify(label_lc: str) -> tuple[str, str | None, dict]:
 
 
 def classify_kinds(graph: IRGraph) -> IRGraph:
-    """Classify every node in the graph, ensuring the taxonomy cache is always up-to-date.
+    """Classify every node in the graph against the current taxonomy snapshot.
 
-    The tech_taxonomy table can change at any time.  To guarantee classifiers see the
-    most recent data, we *always* re-pull the taxonomy before processing a graph.
-    Because `load_taxonomy(force=True)` performs an internal checksum comparison
-    and reuses the disk cache when nothing has changed, the overhead for repeated
-    calls is minimal while still ensuring correctness when updates do occur.
+    The tech_taxonomy table can change at any time.  The taxonomy client keeps
+    a shared snapshot that a background refresher swaps out whenever the
+    upstream checksum changes, so we simply pick up the latest snapshot here
+    instead of re-pulling per graph.
     """
 
-    global _TAXONOMY, _FUZZY_KEYS
-
-    # Force reload.  The taxonomy client will hit Supabase only when its checksum
-    # differs from the local cache, so this is safe to call every time.
-    _TAXONOMY = load_taxonomy(force=True)
-    _FUZZY_KEYS = list(_TAXONOMY.keys())
+    snapshot = get_snapshot()
+    log_info(f"[classifier] classifying against taxonomy snapshot v{snapshot.version} ({len(snapshot)} rows)")
 
     # When debugging taxonomy resolution, it can be helpful to see log lines
     # from _classify() on every invocation.  Because _classify() is
@@ -8,6 +8,7 @@ from __future__ import annotations
 from typing import Dict, Any, Optional, List, Tuple
 import re
 from utils.logger import log_info, log_error
+from .keyword_automaton import KeywordAutomaton
 
 class CloudResourceMapper:
     """Maps cloud resources to appropriate metadata based on provider and service."""
@@ -120,19 +121,30 @@ class CloudResourceMapper:
         Returns:
             Category name or 'other' if not found
         """
-        if provider not in self.CLOUD_SERVICE_TYPES:
-            return "other"
-            
-        for category, services in self.CLOUD_SERVICE_TYPES[provider].items():
-            # Check for exact match first
-            if service in services:
-                return category
-                
-            # Then check if the service name contains any of the service patterns
-            if any(s in service for s in services):
-                return category
-                
-        return "other"
+        categories = self.detect_service_categories(provider, service)
+        return categories[0] if categories else "other"
+
+    def detect_service_categories(self, provider: str, service: str) -> List[str]:
+        """Return every category whose keywords occur in the service name.
+
+        A single automaton pass over *service* finds all keyword hits; the
+        result is ordered by category priority (declaration order in
+        CLOUD_SERVICE_TYPES), so the first entry is the preferred category.
+
+        Args:
+            provider: Cloud provider name
+            service: Service name
+
+        Returns:
+            List of category names, best first (empty if none match)
+        """
+        matcher = _CATEGORY_MATCHERS.get(provider)
+        if matcher is None:
+            return []
+        categories = self.CLOUD_SERVICE_TYPES[provider]
+        ranks = sorted(set(matcher.payloads(service)))
+        order = list(categories)
+        return [order[r] for r in ranks]
     
     def get_default_region(self, provider: str) -> str:
         """Get default region for provider.
@@ -190,19 +202,22 @@ class CloudResourceMapper:
         Returns:
             Layer index (0-10)
         """
-        kind_to_layer_map = {
-            "CLIENT": 0,
-            "EDGE_NETWORK": 1,
-            "IDENTITY": 2,
-            "SERVICE": 3,
-            "INTEGRATION_MESSAGING": 4,
-            "PROCESSING_ANALYTICS": 5,
-            "COMPUTE": 5,
-            "DATA": 6,
-            "OBSERVABILITY": 7,
-            "AI_ML": 8,
-            "DEV_CI_CD": 9,
-            "OTHER": 10
-        }
-        
-        return kind_to_layer_map.get(kind, 3)  # Default to SERVICE layer (3) 
\ No newline at end of file
+        # taxonomy_mapper imports this module, so resolve its table lazily
+        from .taxonomy_mapper import KIND_TO_LAYER_INDEX
+
+        return KIND_TO_LAYER_INDEX.get(kind, 3)  # Default to SERVICE layer (3)
+
+
+def _build_category_matchers() -> Dict[str, KeywordAutomaton[int]]:
+    """One automaton per provider; payload is the category's priority rank."""
+    return {
+        provider: KeywordAutomaton(
+            (keyword, rank)
+            for rank, services in enumerate(categories.values())
+            for keyword in services
+        )
+        for provider, categories in CloudResourceMapper.CLOUD_SERVICE_TYPES.items()
+    }
+
+
+_CATEGORY_MATCHERS = _build_category_matchers() 
\ No newline at end of file
@@ -1,28 +1,32 @@
 from __future__ import annotations
 
-import re
-from typing import Dict, List
-
-from core.ir.ir_types import IRGraph, IRNode
-
-_DOMAIN_PATTERNS: Dict[str, re.Pattern[str]] = {
-    "auth": re.compile(r"auth|login|identity|token", re.I),
-    "payment": re.compile(r"payment|billing|invoice|stripe|paypal", re.I),
-    "user": re.compile(r"user|account|profile", re.I),
-    "order": re.compile(r"order|checkout|cart", re.I),
-    "inventory": re.compile(r"inventory|stock", re.I),
-    "analytics": re.compile(r"analytics|metric|tracking", re.I),
+from typing import Dict, Tuple
+
+from core.ir.ir_types import IRGraph
+from .rule_table import RuleTable
+from .working_graph import run_on_copy, stage_access
+
+# First matching domain wins (case-insensitive substring match)
+_DOMAIN_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "auth": ("auth", "login", "identity", "token"),
+    "payment": ("payment", "billing", "invoice", "stripe", "paypal"),
+    "user": ("user", "account", "profile"),
+    "order": ("order", "checkout", "cart"),
+    "inventory": ("inventory", "stock"),
+    "analytics": ("analytics", "metric", "tracking"),
 }
 
+_RULES = RuleTable({"domain": list(_DOMAIN_KEYWORDS.items())})
+
 
 def infer_domain(graph: IRGraph) -> IRGraph:
-    new_nodes: List[IRNode] = []
+    return run_on_copy(infer_domain_inplace, graph)
+
+
+@stage_access(reads=("nodes.name", "nodes.domain"), writes=("nodes.domain",))
+def infer_domain_inplace(graph: IRGraph) -> None:
     for n in graph.nodes:
-        domain = n.domain
-        if not domain:  # only set if not provided
-            for name, pattern in _DOMAIN_PATTERNS.items():
-                if pattern.search(n.name):
-                    domain = name
-                    break
-        new_nodes.append(n.copy(update={"domain": domain}))
-    return graph.copy(update={"nodes": new_nodes}) 
\ No newline at end of file
+        if not n.domain:  # only set if not provided
+            domain = _RULES.classify(n.name).get("domain")
+            if domain:
+                n.domain = domain
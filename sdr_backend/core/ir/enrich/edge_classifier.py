@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import re
-from typing import List
-
-from core.ir.ir_types import IRGraph, IREdge
+from core.ir.ir_types import IRGraph
+from .rule_table import RuleTable, keyword_rules
+from .working_graph import run_on_copy, stage_access
 
 _PROTOCOL_MAP = {
     "http": "HTTP",
@@ -22,21 +21,19 @@ _PURPOSE_MAP = {
     "data": "data",
 }
 
+# Both maps in one automaton – first matching token per map wins
+_RULES = RuleTable({"protocol": keyword_rules(_PROTOCOL_MAP), "purpose": keyword_rules(_PURPOSE_MAP)})
+
 
 def classify_edges(graph: IRGraph) -> IRGraph:
-    new_edges: List[IREdge] = []
+    return run_on_copy(classify_edges_inplace, graph, nodes=False, edges=True)
+
+
+@stage_access(reads=("edges.label",), writes=("edges.protocol", "edges.purpose"))
+def classify_edges_inplace(graph: IRGraph) -> None:
     for e in graph.edges:
-        protocol = e.protocol
-        purpose = e.purpose
-        label_lower = (e.label or "").lower()
-        for token, proto in _PROTOCOL_MAP.items():
-            if token in label_lower:
-                protocol = proto
-                break
-        for token, purp in _PURPOSE_MAP.items():
-            if token in label_lower:
-                purpose = purp
-                break
-        new_edges.append(e.copy(update={"protocol": protocol, "purpose": purpose}))
-
-    return graph.copy(update={"edges": new_edges}) 
\ No newline at end of file
+        hits = _RULES.classify(e.label or "")
+        if "protocol" in hits:
+            e.protocol = hits["protocol"]
+        if "purpose" in hits:
+            e.purpose = hits["purpose"] 
\ No newline at end of file
@@ -1,20 +1,27 @@
 from __future__ import annotations
 
-"""Lightweight wrapper around RapidFuzz to provide a single **fuzzy_best_match**
-function that works even when the optional *rapidfuzz* dependency is missing.
+"""Lightweight wrapper around RapidFuzz to provide **fuzzy_best_match** and its
+batch counterpart **fuzzy_best_matches**.
 
 The helper is intentionally self-contained so other modules can import it
 without pulling additional heavy dependencies when fuzzy matching is not
 required.
 """
 
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
 from rapidfuzz import process, fuzz
 
 # ---------------------------------------------------------------------------
 #  Fuzzy matching helper
 # ---------------------------------------------------------------------------
 
-__all__ = ["fuzzy_best_match"]
+__all__ = ["fuzzy_best_match", "fuzzy_best_matches"]
+
+# Queries scored per cdist call; bounds the score matrix to
+# BATCH_ROWS x len(choices) float32 cells.
+BATCH_ROWS = 256
 
 
 def fuzzy_best_match(query: str, choices: list[str], threshold: int = 85):
@@ -25,3 +32,33 @@ def fuzzy_best_match(query: str, choices: list[str], threshold: int = 85):
         return None, 0
     key, score, _ = res
     return (key, score) if score >= threshold else (None, score)
+
+
+def fuzzy_best_matches(
+    queries: Sequence[str],
+    choices: Sequence[str],
+    threshold: int = 85,
+    workers: int = -1,
+) -> List[Tuple[Optional[str], float]]:
+    """Batch version of :func:`fuzzy_best_match`.
+
+    All *queries* are scored against *choices* with ``process.cdist`` (one
+    multi-threaded matrix computation) and the per-query best choice is
+    returned with the same ``(key, score)`` / ``(None, score)`` contract.
+    Ties resolve to the first choice, exactly like ``extractOne``.
+    """
+    if not queries:
+        return []
+    if not choices:
+        return [(None, 0)] * len(queries)
+
+    out: List[Tuple[Optional[str], float]] = []
+    for start in range(0, len(queries), BATCH_ROWS):
+        chunk = queries[start:start + BATCH_ROWS]
+        scores = process.cdist(chunk, choices, scorer=fuzz.token_sort_ratio, workers=workers)
+        for query, best in zip(chunk, np.argmax(scores, axis=1)):
+            key = choices[int(best)]
+            # re-score the winner in float64 so thresholds behave as in extractOne
+            score = fuzz.token_sort_ratio(query, key)
+            out.append((key, score) if score >= threshold else (None, score))
+    return out
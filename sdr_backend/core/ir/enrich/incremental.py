@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+"""Incremental enrichment against the previous diagram version.
+
+Most DSL updates touch a handful of nodes, yet a full enrichment run costs
+time proportional to the whole diagram.  Enriched graphs therefore record a
+content hash of every *base* (pre-enrichment) node and edge in
+``build_meta["enrich"]``.  Given the previous version's ``ir_json`` we diff
+the new base graph against those hashes, re-run the per-node stages only on
+new/changed nodes and the edge stage only on affected edges, reuse the
+previous enriched objects for everything else, then recompute grouping over
+the merged graph.
+
+The previous result is only trusted when it was produced from the same
+taxonomy snapshot; anything unexpected falls back to a full run.
+"""
+
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from core.ir.canonical_hash import diff_hashes, graph_hashes
+from core.ir.ir_types import IRGraph, trusted_edge, trusted_node
+from utils.logger import log_info
+
+from .domain_inference import infer_domain_inplace
+from .edge_classifier import classify_edges_inplace
+from .label_normalizer import normalize_labels_inplace
+from .risk_tagger import tag_risks_inplace
+from .simplified_grouping import assign_groups_by_kind_inplace
+from .taxonomy_client import get_snapshot
+from .taxonomy_mapper import assign_taxonomy_inplace
+from .working_graph import InplaceStage, working_copy
+
+META_KEY = "enrich"
+
+# Stages whose result for an item depends only on that item
+NODE_STAGES: List[InplaceStage] = [
+    normalize_labels_inplace,
+    assign_taxonomy_inplace,
+    infer_domain_inplace,
+    tag_risks_inplace,
+]
+EDGE_STAGES: List[InplaceStage] = [classify_edges_inplace]
+# Stages that look at the whole graph – always recomputed
+GRAPH_STAGES: List[InplaceStage] = [assign_groups_by_kind_inplace]
+
+
+def enrich_meta(base: IRGraph) -> Dict[str, Any]:
+    """Diff bookkeeping stored in ``build_meta`` of an enriched graph."""
+    hashes = graph_hashes(base)
+    return {
+        "taxonomy_checksum": get_snapshot().checksum,
+        "node_hashes": hashes.nodes,
+        "edge_hashes": hashes.edges,
+    }
+
+
+def with_enrich_meta(enriched: IRGraph, base: IRGraph) -> IRGraph:
+    return enriched.model_copy(update={"build_meta": {**enriched.build_meta, META_KEY: enrich_meta(base)}})
+
+
+def enrich_incremental(
+    base: IRGraph,
+    previous: Optional[Mapping[str, Any]],
+    full_run: Callable[[IRGraph], IRGraph],
+    run_stage: Optional[Callable[[InplaceStage, IRGraph], Any]] = None,
+) -> IRGraph:
+    """Enrich *base*, reusing unchanged nodes/edges from *previous* ``ir_json``.
+
+    *full_run* is the regular pipeline, used when there is nothing usable to
+    diff against; *run_stage* wraps each stage call (the enricher uses it for
+    timing).  The result carries fresh diff bookkeeping either way.
+    """
+    run_stage = run_stage or (lambda stage, graph: stage(graph))
+    meta = ((previous or {}).get("build_meta") or {}).get(META_KEY)
+    if not meta:
+        log_info("[incremental] no previous enrichment metadata – full run")
+        return _full(base, full_run)
+    if meta.get("taxonomy_checksum") != get_snapshot().checksum:
+        log_info("[incremental] taxonomy changed since previous version – full run")
+        return _full(base, full_run)
+
+    new_meta = enrich_meta(base)
+    prev_nodes = {n["id"]: n for n in previous.get("nodes", [])}
+    prev_edges = {e["id"]: e for e in previous.get("edges", [])}
+    # Ids missing from the previous graph itself count as new as well
+    dirty_nodes = diff_hashes(meta.get("node_hashes", {}), new_meta["node_hashes"]).dirty
+    dirty_edges = diff_hashes(meta.get("edge_hashes", {}), new_meta["edge_hashes"]).dirty
+
+    changed_nodes = [n for n in base.nodes if n.id in dirty_nodes or n.id not in prev_nodes]
+    changed_ids = {n.id for n in changed_nodes}
+    changed_edges = [
+        e for e in base.edges
+        if e.id in dirty_edges or e.id not in prev_edges
+        or e.source in changed_ids or e.target in changed_ids
+    ]
+    log_info(f"[incremental] re-enriching {len(changed_nodes)}/{len(base.nodes)} nodes, "
+             f"{len(changed_edges)}/{len(base.edges)} edges")
+
+    # Per-item stages on the changed slice only
+    delta = working_copy(base.model_copy(update={"nodes": changed_nodes, "edges": changed_edges}))
+    for stage in NODE_STAGES + EDGE_STAGES:
+        run_stage(stage, delta)
+    fresh_nodes = {n.id: n for n in delta.nodes}
+    fresh_edges = {e.id: e for e in delta.edges}
+
+    # Previous objects are our own output – rebuild them without re-validation
+    nodes = [fresh_nodes.get(n.id) or trusted_node(prev_nodes[n.id]) for n in base.nodes]
+    edges = [fresh_edges.get(e.id) or trusted_edge(prev_edges[e.id]) for e in base.edges]
+
+    # Whole-graph stages over the merged result
+    merged = base.model_copy(update={
+        "nodes": nodes,
+        "edges": edges,
+        "groups": list(base.groups),
+        "build_meta": {**base.build_meta, META_KEY: new_meta},
+    })
+    for stage in GRAPH_STAGES:
+        run_stage(stage, merged)
+    return merged
+
+
+def _full(base: IRGraph, full_run: Callable[[IRGraph], IRGraph]) -> IRGraph:
+    enriched = full_run(base)
+    if enriched is base:  # pipeline failed and fell back to the input – nothing to reuse next time
+        return enriched
+    return with_enrich_meta(enriched, base)
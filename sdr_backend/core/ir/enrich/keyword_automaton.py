@@ -0,0 +1,79 @@
+"""Aho-Corasick keyword automaton
+
+Matches every keyword of a fixed dictionary against a text in a single pass,
+so lookup cost is linear in the text length no matter how many keywords the
+dictionary holds.  Each keyword carries an arbitrary payload (a category
+name, a priority rank, a rule id …) that is reported on every hit.
+"""
+
+from __future__ import annotations
+from collections import deque
+from typing import Any, Dict, Generic, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class KeywordAutomaton(Generic[T]):
+    """Immutable Aho-Corasick automaton over ``(keyword, payload)`` pairs."""
+
+    __slots__ = ("_goto", "_fail", "_out", "_size")
+
+    def __init__(self, keywords: Iterable[Tuple[str, T]]):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[Tuple[int, T]]] = [[]]
+        size = 0
+
+        # 1) trie of all keywords
+        for word, payload in keywords:
+            if not word:
+                continue
+            state = 0
+            for ch in word:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append((len(word), payload))
+            size += 1
+
+        # 2) failure links (BFS), merging outputs of suffix states
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt].extend(out[fail[nxt]])
+
+        self._goto = goto
+        self._fail = fail
+        self._out: List[Tuple[Tuple[int, T], ...]] = [tuple(o) for o in out]
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, T]]:
+        """Yield ``(start, end, payload)`` for every keyword occurrence in *text*."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, payload in out[state]:
+                yield i + 1 - length, i + 1, payload
+
+    def payloads(self, text: str) -> List[T]:
+        """Distinct payloads of all keywords found in *text*, in first-hit order."""
+        seen: Dict[Any, None] = {}
+        for _, _, payload in self.iter_matches(text):
+            seen.setdefault(payload, None)
+        return list(seen)
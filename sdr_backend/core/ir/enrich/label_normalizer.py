@@ -1,22 +1,23 @@
 from __future__ import annotations
 
 import re
-from typing import List
 
-from core.ir.ir_types import IRGraph, IRNode
+from core.ir.ir_types import IRGraph
+from .working_graph import run_on_copy, stage_access
 
 _NORMALIZE_RE = re.compile(r"\s+")
 
 
 def normalize_labels(graph: IRGraph) -> IRGraph:
     """Trim + collapse whitespace in node names, keep a copy in metadata."""
+    return run_on_copy(normalize_labels_inplace, graph)
 
-    new_nodes: List[IRNode] = []
+
+@stage_access(reads=("nodes.name",), writes=("nodes.name", "nodes.metadata"))
+def normalize_labels_inplace(graph: IRGraph) -> None:
+    """In-place variant of :func:`normalize_labels` for a working copy."""
     for n in graph.nodes:
         cleaned = _NORMALIZE_RE.sub(" ", n.name.strip())
-        meta = dict(n.metadata)
         if n.name != cleaned:
-            meta["orig_label"] = n.name
-        new_nodes.append(n.copy(update={"name": cleaned, "metadata": meta}))
-
-    return graph.copy(update={"nodes": new_nodes}) 
\ No newline at end of file
+            n.metadata["orig_label"] = n.name
+            n.name = cleaned 
\ No newline at end of file
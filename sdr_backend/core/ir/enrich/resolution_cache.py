@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+"""Two-tier cache for label ➜ taxonomy-row resolutions.
+
+Tier 1 is a bounded in-process LRU, tier 2 a Redis hash shared by every
+worker.  Keys are ``(label, provider hint)`` scoped by the taxonomy checksum:
+the LRU is dropped as soon as a new checksum is seen, and each checksum gets
+its own Redis hash (``taxonomy:resolve:<checksum>``) that simply expires once
+nobody reads it any more.  Redis is optional – when it is not configured or
+unreachable the cache degrades to the local tier.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import REDIS_DB, REDIS_HOST, REDIS_PASSWORD, REDIS_PORT
+from utils.logger import log_error, log_info
+from utils.prometheus_metrics import record_taxonomy_cache
+
+try:
+    import redis
+except ImportError:  # pragma: no cover – optional dependency
+    redis = None
+
+# ----------------------- CONFIG ---------------------------------
+LRU_SIZE = int(os.getenv("TAXONOMY_RESOLVE_CACHE_SIZE", "4096"))
+REDIS_ENABLED = os.getenv("TAXONOMY_RESOLVE_REDIS", "true").lower() in {"1", "true", "yes"}
+REDIS_TTL_SEC = int(os.getenv("TAXONOMY_RESOLVE_REDIS_TTL", "86400"))
+REDIS_RETRY_SEC = 60  # back-off after a Redis failure
+REDIS_KEY_PREFIX = "taxonomy:resolve:"
+# ---------------------------------------------------------------
+
+CacheKey = Tuple[str, str]
+
+
+def _field(key: CacheKey) -> str:
+    return f"{key[0]}\x1f{key[1]}"
+
+
+class ResolutionCache:
+    """Bounded LRU in front of a per-checksum Redis hash."""
+
+    def __init__(self, maxsize: int = LRU_SIZE, redis_client: Any = None):
+        self.maxsize = maxsize
+        self._lru: "OrderedDict[CacheKey, Dict[str, Any]]" = OrderedDict()
+        self._checksum = ""
+        self._lock = threading.Lock()
+        self._redis = redis_client
+        self._redis_down_until = 0.0
+
+    # ------------------------------------------------------------------
+    #  Tier 1 – in-process LRU
+    # ------------------------------------------------------------------
+
+    def _sync_checksum(self, checksum: str) -> None:
+        # caller holds the lock
+        if checksum != self._checksum:
+            if self._lru:
+                log_info(f"[resolve_cache] taxonomy checksum changed – dropping {len(self._lru)} entries")
+            self._lru.clear()
+            self._checksum = checksum
+
+    def _lru_put(self, key: CacheKey, row: Dict[str, Any]) -> None:
+        # caller holds the lock
+        self._lru[key] = row
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    #  Tier 2 – Redis hash
+    # ------------------------------------------------------------------
+
+    def _client(self):
+        if self._redis is None or time.monotonic() < self._redis_down_until:
+            return None
+        return self._redis
+
+    def _redis_failed(self, exc: Exception) -> None:
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SEC
+        log_error(f"[resolve_cache] Redis tier disabled for {REDIS_RETRY_SEC}s: {exc}")
+
+    def _redis_get(self, checksum: str, keys: Sequence[CacheKey]) -> List[Optional[Dict[str, Any]]]:
+        client = self._client()
+        if client is None or not keys:
+            return [None] * len(keys)
+        try:
+            raw = client.hmget(REDIS_KEY_PREFIX + checksum, [_field(k) for k in keys])
+        except Exception as e:
+            self._redis_failed(e)
+            return [None] * len(keys)
+        return [json.loads(v) if v else None for v in raw]
+
+    def _redis_put(self, checksum: str, items: Dict[CacheKey, Dict[str, Any]]) -> None:
+        client = self._client()
+        if client is None or not items:
+            return
+        name = REDIS_KEY_PREFIX + checksum
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hset(name, mapping={_field(k): json.dumps(v, default=str) for k, v in items.items()})
+            pipe.expire(name, REDIS_TTL_SEC)
+            pipe.execute()
+        except Exception as e:
+            self._redis_failed(e)
+
+    # ------------------------------------------------------------------
+    #  Public API
+    # ------------------------------------------------------------------
+
+    def get_many(self, checksum: str, keys: Sequence[CacheKey]) -> List[Optional[Dict[str, Any]]]:
+        """Look *keys* up in the LRU, then fetch the misses from Redis in one call."""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(keys)
+        missing: List[int] = []
+        with self._lock:
+            self._sync_checksum(checksum)
+            for i, key in enumerate(keys):
+                row = self._lru.get(key)
+                if row is None:
+                    missing.append(i)
+                else:
+                    self._lru.move_to_end(key)
+                    results[i] = row
+        record_taxonomy_cache("lru_hit", len(keys) - len(missing))
+        if not missing:
+            return results
+
+        remote = self._redis_get(checksum, [keys[i] for i in missing])
+        remote_hits = 0
+        with self._lock:
+            for i, row in zip(missing, remote):
+                if row is not None:
+                    results[i] = row
+                    remote_hits += 1
+                    if checksum == self._checksum:
+                        self._lru_put(keys[i], row)
+        record_taxonomy_cache("redis_hit", remote_hits)
+        record_taxonomy_cache("miss", len(missing) - remote_hits)
+        return results
+
+    def put_many(self, checksum: str, items: Dict[CacheKey, Dict[str, Any]]) -> None:
+        """Store freshly resolved rows in both tiers."""
+        if not items:
+            return
+        with self._lock:
+            self._sync_checksum(checksum)
+            for key, row in items.items():
+                self._lru_put(key, row)
+        self._redis_put(checksum, items)
+
+    def get(self, checksum: str, key: CacheKey) -> Optional[Dict[str, Any]]:
+        return self.get_many(checksum, [key])[0]
+
+    def put(self, checksum: str, key: CacheKey, row: Dict[str, Any]) -> None:
+        self.put_many(checksum, {key: row})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+
+def _redis_from_settings():
+    if not (REDIS_ENABLED and redis is not None and REDIS_HOST):
+        return None
+    try:
+        return redis.Redis(
+            host=REDIS_HOST,
+            port=int(REDIS_PORT or 6379),
+            db=int(REDIS_DB or 0),
+            password=REDIS_PASSWORD,
+            decode_responses=True,
+            socket_timeout=0.25,
+            socket_connect_timeout=0.25,
+        )
+    except Exception as e:
+        log_error(f"[resolve_cache] Redis tier unavailable: {e}")
+        return None
+
+
+_shared: Optional[ResolutionCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_resolution_cache() -> ResolutionCache:
+    """Process-wide cache instance (created lazily on first use)."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = ResolutionCache(redis_client=_redis_from_settings())
+    return _shared
@@ -1,8 +1,7 @@
 from __future__ import annotations
 
-from typing import List
-
-from core.ir.ir_types import IRGraph, IRNode
+from core.ir.ir_types import IRGraph
+from .working_graph import run_on_copy, stage_access
 
 _HIGH_RISK = {
     "Auth",
@@ -19,15 +18,17 @@ _MED_RISK = {
     "Cache",
     "VectorStore",
 }
+# kind -> tag, one lookup per node
+_RISK_BY_KIND = {**{k: "medium" for k in _MED_RISK}, **{k: "high" for k in _HIGH_RISK}}
 
 
 def tag_risks(graph: IRGraph) -> IRGraph:
-    new_nodes: List[IRNode] = []
+    return run_on_copy(tag_risks_inplace, graph)
+
+
+@stage_access(reads=("nodes.kind", "nodes.risk_tags"), writes=("nodes.risk_tags",))
+def tag_risks_inplace(graph: IRGraph) -> None:
     for n in graph.nodes:
-        tags = list(n.risk_tags)
-        if n.kind in _HIGH_RISK and "high" not in tags:
-            tags.append("high")
-        elif n.kind in _MED_RISK and "medium" not in tags:
-            tags.append("medium")
-        new_nodes.append(n.copy(update={"risk_tags": tags}))
-    return graph.copy(update={"nodes": new_nodes}) 
\ No newline at end of file
+        tag = _RISK_BY_KIND.get(n.kind)
+        if tag and tag not in n.risk_tags:
+            n.risk_tags.append(tag) 
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""Compiled first-match keyword rule tables
+
+Domain inference and edge classification walk ordered rule tables and keep,
+per table, the first rule with a keyword occurring in the label.  A
+:class:`RuleTable` compiles one or more such tables into a single
+:class:`KeywordAutomaton` at import time.  Each hit carries its table and
+rule rank, so a label is classified in one scan however large the tables
+grow, and earlier rules still win exactly as in the sequential loops.
+"""
+
+from __future__ import annotations
+from typing import Dict, Generic, Iterable, List, Mapping, Sequence, Tuple, TypeVar
+
+from .keyword_automaton import KeywordAutomaton
+
+T = TypeVar("T")
+
+Rules = Sequence[Tuple[T, Iterable[str]]]
+
+
+def keyword_rules(mapping: Mapping[str, T]) -> List[Tuple[T, Tuple[str]]]:
+    """Turn an ordered ``{keyword: value}`` map into one rule per keyword."""
+    return [(value, (keyword,)) for keyword, value in mapping.items()]
+
+
+class RuleTable(Generic[T]):
+    """Immutable set of named, ordered ``(value, keywords)`` rule tables."""
+
+    __slots__ = ("_automaton", "_values")
+
+    def __init__(self, tables: Mapping[str, Rules]):
+        values: Dict[str, Tuple[T, ...]] = {}
+        keywords: List[Tuple[str, Tuple[str, int]]] = []
+        for name, rules in tables.items():
+            rules = list(rules)
+            values[name] = tuple(value for value, _ in rules)
+            keywords.extend(
+                (kw.lower(), (name, rank)) for rank, (_, kws) in enumerate(rules) for kw in kws
+            )
+        self._automaton: KeywordAutomaton[Tuple[str, int]] = KeywordAutomaton(keywords)
+        self._values = values
+
+    def classify(self, text: str) -> Dict[str, T]:
+        """Value of the first matching rule per table (case-insensitive)."""
+        best: Dict[str, int] = {}
+        for _, _, (name, rank) in self._automaton.iter_matches(text.lower()):
+            if rank < best.get(name, rank + 1):
+                best[name] = rank
+        return {name: self._values[name][rank] for name, rank in best.items()}
@@ -6,6 +6,7 @@ import re
 
 from core.ir.ir_types import IRGraph, IRGroup, IRNode
 from utils.logger import log_info
+from .working_graph import run_on_copy, stage_access
 
 # Define cloud resource group patterns
 CLOUD_GROUP_PATTERNS = {
@@ -25,6 +26,12 @@ def assign_groups_by_kind(graph: IRGraph) -> IRGraph:
     This is a simplified approach that creates groups based purely on kind values,
     allowing frontend to render nodes grouped by their layer.
     """
+    return run_on_copy(assign_groups_by_kind_inplace, graph, nodes=False)
+
+
+@stage_access(reads=("nodes.id", "nodes.kind", "nodes.domain"), writes=("groups",))
+def assign_groups_by_kind_inplace(graph: IRGraph) -> None:
+    """In-place variant of :func:`assign_groups_by_kind` (appends to ``graph.groups``)."""
     # Group nodes by kind
     kind_to_nodes: Dict[str, List[str]] = defaultdict(list)
     
@@ -57,11 +64,9 @@ def assign_groups_by_kind(graph: IRGraph) -> IRGraph:
     domain_groups = create_domain_groups(graph.nodes)
     
     # Combine all groups - REMOVED cloud_groups until schema supports it
-    all_groups = list(graph.groups) + groups + domain_groups
+    graph.groups.extend(groups + domain_groups)
     
     log_info(f"[simplified_grouping] Total groups: {len(groups)} kind groups, {len(domain_groups)} domain groups")
-    
-    return graph.model_copy(update={"groups": all_groups})
 
 def create_cloud_resource_groups(graph: IRGraph) -> List[IRGroup]:
     """Create groups for cloud resources like VPCs, Subnets, Availability Zones, etc.
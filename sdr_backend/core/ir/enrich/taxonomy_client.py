@@ -1,8 +1,8 @@
 from __future__ import annotations
-import os, re, time, json, hashlib, tempfile
+import asyncio
+import os, time, json, hashlib, tempfile
 from pathlib import Path
-from typing import Dict, Any, Iterable, Tuple, List
-from functools import lru_cache
+from typing import Dict, Any, Tuple, List, Mapping
 import threading
 
 from core.db.supabase_db import get_supabase_client
@@ -11,155 +11,42 @@ from utils.logger import log_info, log_error
 # ----------------------- CONFIG ---------------------------------
 CACHE_TTL_SEC = int(os.getenv("TAXONOMY_REFRESH_SEC", "3600"))   # Default 1 hour expiry
 CACHE_DIR = Path(os.getenv("TAXONOMY_CACHE_DIR", "~/.cache/tech_taxonomy")).expanduser()
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
 DISK_CACHE_FILE = CACHE_DIR / "taxonomy_cache.json"
+# Compiled mmap index shared by every worker on the host (see taxonomy_index.py)
+COMPILED_INDEX_FILE = Path(os.getenv("TAXONOMY_INDEX_FILE", str(CACHE_DIR / "taxonomy_index.bin"))).expanduser()
+# Export shipped with the code; last-resort boot source when Supabase is
+# unreachable.  The repository ships it empty – a worker with no network and
+# no local cache boots without a taxonomy until a release writes a real export
+# with ``scripts/build_taxonomy_index.py --dump``.
+BUNDLED_SNAPSHOT_FILE = Path(os.getenv("TAXONOMY_BUNDLED_FILE", str(Path(__file__).with_name("taxonomy_dump.json"))))
+USE_COMPILED_INDEX = os.getenv("TAXONOMY_COMPILED_INDEX", "true").lower() in {"1", "true", "yes"}
 PAGE_SIZE = 1000  # fallback paging size
-MEMORY_CACHE_SIZE = 50000  # LRU cache size for frequently accessed items
+# Delta sync: pull only rows with updated_at >= watermark between full loads
+DELTA_SYNC = os.getenv("TAXONOMY_DELTA_SYNC", "true").lower() in {"1", "true", "yes"}
+DELTA_SYNC_SEC = int(os.getenv("TAXONOMY_DELTA_SYNC_SEC", "60"))
+# How often a delta sync also verifies the full (token, updated_at) checksum
+VERIFY_SEC = int(os.getenv("TAXONOMY_VERIFY_SEC", "3600"))
 # ---------------------------------------------------------------
 
-STOPWORDS: set[str] = {"service","services","server","engine","api","db","database",
-                       "system","app","apps","module","component"}
+from .taxonomy_snapshot import (  # noqa: F401  (re-exported for legacy importers)
+    STOPWORDS,
+    TaxonomySnapshot,
+    normalize_label,
+    slugify,
+)
+from .taxonomy_index import StaleIndexError, ensure_compiled_snapshot, open_compiled_snapshot
 
-_slug_re = re.compile(r"[^a-z0-9]+")
-
-# Thread-safe lock for cache updates
+# Thread-safe lock for snapshot swaps
 _cache_lock = threading.RLock()
 
-def slugify(label: str) -> str:
-    return _slug_re.sub("-", label.lower()).strip("-")
-
-def normalize_label(s: str) -> Tuple[str, str]:
-    base = re.sub(r"[^a-z0-9]+", " ", s.lower()).strip()
-    tokens = [t for t in base.split()]
-    slug = "-".join(tokens) if tokens else slugify(s)
-    core = tokens[-1] if tokens else slug
-    return slug, core
-
-# -------- internal mutable caches -------------
-_CACHE: Dict[str, Dict[str, Any]] | None = None
-_WORD_INDEX: Dict[str, List[str]] = {}   # word -> [slug keys]
-_ROW_BY_TOKEN: Dict[str, Dict[str, Any]] = {}
+# -------- current snapshot --------------------------------------
+# Readers grab a reference via get_snapshot(); refreshes build a brand-new
+# snapshot off to the side and replace this reference in one assignment, so
+# a request never observes a half-built index.
+_SNAPSHOT: TaxonomySnapshot = TaxonomySnapshot.empty()
 _CACHE_TIME = 0.0
-_CACHE_CHECKSUM = ""
-# ----- new deterministic lookup tables -------------------------------------
-# Canonical token slug  -> row (highest confidence)
-_PRIMARY_BY_SLUG: Dict[str, Dict[str, Any]] = {}
-# Display-name slug     -> row (medium confidence)
-_DNAME_BY_SLUG: Dict[str, Dict[str, Any]] = {}
-# Alias slug            -> list[rows] (lowest confidence, may have collisions)
-_ALIAS_BY_SLUG: Dict[str, List[Dict[str, Any]]] = {}
-
-# In-memory LRU cache for frequently accessed lookups
-@lru_cache(maxsize=MEMORY_CACHE_SIZE)
-def _cached_lookup(key: str, lookup_type: str) -> Dict[str, Any] | List[Dict[str, Any]] | None:
-    """
-    LRU cache for frequent lookups to avoid dictionary access overhead.
-    
-    Args:
-        key: The lookup key (usually a slug)
-        lookup_type: One of "primary", "dname", "alias" or "row_by_token"
-        
-    Returns:
-        The cached value or None
-    """
-    if lookup_type == "primary":
-        return _PRIMARY_BY_SLUG.get(key)
-    elif lookup_type == "dname":
-        return _DNAME_BY_SLUG.get(key)
-    elif lookup_type == "alias":
-        return _ALIAS_BY_SLUG.get(key)
-    elif lookup_type == "row_by_token":
-        return _ROW_BY_TOKEN.get(key)
-    return None
-
-def _row_keys(row: Dict[str, Any]) -> Iterable[str]:
-    """All primary lookup keys for a row."""
-    keys = {
-        slugify(row["token"]),
-        slugify(row.get("display_name") or row["token"]),
-    }
-    for alias in (row.get("aliases") or []):
-        keys.add(slugify(alias))
-    # core token
-    _, core = normalize_label(row.get("display_name") or row["token"])
-    keys.add(core)
-    return keys
-
-def _index_words(row: Dict[str, Any]):
-    """Add all meaningful words from token/display_name/aliases to WORD_INDEX."""
-    texts = [row["token"], row.get("display_name") or ""] + (row.get("aliases") or [])
-    words = set()
-    for txt in texts:
-        for w in re.findall(r"[a-z0-9]+", txt.lower()):
-            if w and w not in STOPWORDS:
-                words.add(w)
-    slug_main = slugify(row["token"])
-    for w in words:
-        _WORD_INDEX.setdefault(w, []).append(slug_main)
-
-def _build_indexes(rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
-    """Construct deterministic indexes ordered by confidence.
-
-    1. _PRIMARY_BY_SLUG – exact token match (cannot be shadowed)
-    2. _DNAME_BY_SLUG   – exact display-name match
-    3. _ALIAS_BY_SLUG   – exact alias match (may map to multiple rows)
-
-    A flattened dict is returned for legacy callers that still expect the
-    previous behaviour, but canonical tokens always win in that view.
-    """
-    # Use the lock to ensure thread safety during index rebuilding
-    with _cache_lock:
-        # Reset all sub-indexes first
-        _PRIMARY_BY_SLUG.clear()
-        _DNAME_BY_SLUG.clear()
-        _ALIAS_BY_SLUG.clear()
-        _WORD_INDEX.clear()
-        _ROW_BY_TOKEN.clear()
-
-        # Clear the LRU cache
-        _cached_lookup.cache_clear()
-
-        for row in rows:
-            # Canonical token ➜ primary index
-            tok_slug = slugify(row["token"])
-            _PRIMARY_BY_SLUG[tok_slug] = row
-            _ROW_BY_TOKEN[row["token"]] = row
-
-            # Display name ➜ secondary index
-            dname = row.get("display_name") or ""
-            if dname:
-                _DNAME_BY_SLUG[slugify(dname)] = row
-
-            # Aliases ➜ tertiary index (many-to-one)
-            for alias in (row.get("aliases") or []):
-                _ALIAS_BY_SLUG.setdefault(slugify(alias), []).append(row)
-
-            # Word-level index for fuzzy / vote lookup
-            _index_words(row)
-
-        # ------------------------------------------------------------------
-        # Flatten all indexes back into a single dict for backward-compatibility
-        # Canonical tokens are added last so they always override weaker signals.
-        # ------------------------------------------------------------------
-        flat: Dict[str, Dict[str, Any]] = {}
-
-        # 3) aliases (lowest confidence) – pick the first row if multiple rows collide
-        for slug, rows_lst in _ALIAS_BY_SLUG.items():
-            flat.setdefault(slug, rows_lst[0])
-
-        # 2) display-names
-        flat.update(_DNAME_BY_SLUG)
-
-        # 1) canonical tokens – strongest signal wins final shadowing write
-        flat.update(_PRIMARY_BY_SLUG)
-
-        log_info(
-            f"[taxonomy] index built – primary={len(_PRIMARY_BY_SLUG)}, "
-            f"display={len(_DNAME_BY_SLUG)}, alias={len(_ALIAS_BY_SLUG)}, "
-            f"word_keys={len(_WORD_INDEX)}"
-        )
-
-        return flat
+_VERIFY_TIME = 0.0
+# ---------------------------------------------------------------
 
 # ---------------- RPC + Fallback download -----------------------
 
@@ -205,6 +92,48 @@ def _paged_pull() -> List[Dict[str, Any]]:
         start += PAGE_SIZE
     return out
 
+def _delta_pull(watermark: str) -> List[Dict[str, Any]]:
+    """Rows changed since *watermark* (inclusive, so same-instant edits are not lost)."""
+    sb = get_supabase_client()
+    start = 0
+    out: List[Dict[str, Any]] = []
+    while True:
+        resp = (
+            sb.table("tech_taxonomy")
+              .select("token,display_name,aliases,kind,subkind,provider,iconify_id,technology,svg_url,updated_at")
+              .gte("updated_at", watermark)
+              .order("updated_at")
+              .range(start, start + PAGE_SIZE - 1)
+              .execute()
+        )
+        chunk = resp.data or []
+        out.extend(chunk)
+        if len(chunk) < PAGE_SIZE:
+            break
+        start += PAGE_SIZE
+    return out
+
+
+def _remote_count() -> int:
+    sb = get_supabase_client()
+    resp = sb.table("tech_taxonomy").select("token", count="exact").limit(1).execute()
+    return resp.count or 0
+
+
+def _remote_checksum() -> str:
+    """Checksum of the upstream table computed from (token, updated_at) only."""
+    sb = get_supabase_client()
+    start = 0
+    out: List[Dict[str, Any]] = []
+    while True:
+        resp = sb.table("tech_taxonomy").select("token,updated_at").range(start, start + PAGE_SIZE - 1).execute()
+        chunk = resp.data or []
+        out.extend(chunk)
+        if len(chunk) < PAGE_SIZE:
+            break
+        start += PAGE_SIZE
+    return _rows_checksum(out)
+
 def _load_from_disk() -> Tuple[List[Dict[str, Any]], str]:
     """Load rows + checksum from disk cache. Return (rows, checksum)."""
     if not DISK_CACHE_FILE.exists():
@@ -240,64 +169,193 @@ def _save_to_disk(rows: List[Dict[str, Any]], checksum: str):
     except Exception as e:
         log_error(f"[taxonomy] disk cache save failed: {e}")
 
-def _pull_taxonomy() -> Dict[str, Dict[str, Any]]:
-    global _CACHE_CHECKSUM
+def _rows_checksum(rows: List[Dict[str, Any]]) -> str:
+    return hashlib.md5(",".join(sorted(f"{r['token']}{r.get('updated_at','')}" for r in rows)).encode()).hexdigest()
 
+def _watermark(rows) -> str:
+    """Newest ``updated_at`` in *rows* ("" when rows carry no timestamps)."""
+    return max((str(r.get("updated_at") or "") for r in rows), default="")
+
+def _pull_taxonomy() -> Tuple[List[Dict[str, Any]], str]:
+    """Fetch the full taxonomy; return (rows, checksum)."""
     # 1) Try RPC
-    rows, checksum = _rpc_pull()
+    rows, _ = _rpc_pull()
 
     # 2) if RPC empty, fallback to paged
     if not rows:
         log_info("[taxonomy] RPC pull failed, falling back to paged pull")
         rows = _paged_pull()
-        checksum = hashlib.md5(",".join(sorted(f"{r['token']}{r.get('updated_at','')}" for r in rows)).encode()).hexdigest()
 
-    # Verify that the rows have svg_url field
-    if rows and len(rows) > 0:
-        sample_row = rows[0]
-        has_svg_url = 'svg_url' in sample_row
-        
-        # If svg_url is missing in the rows fetched from RPC/paged pull, don't use disk cache
-        if not has_svg_url:
-            log_info("[taxonomy] SVG URLs missing in fetched data, skipping disk cache")
-            # Force build fresh indexes even if checksum matches
-            disk_sum = None
-        else:
-            # Normal flow - compare checksums
-            disk_sum = None
-            if DISK_CACHE_FILE.exists():
-                log_info("[taxonomy] Disk cache found, checking checksum")
-                _, disk_sum = _load_from_disk()
-    else:
-        disk_sum = None
-    
-    # 3) Compare checksum with disk cache; if same, reuse disk to avoid rebuild. (optional)
-    if disk_sum and disk_sum == checksum:
-        log_info("[taxonomy] Disk cache checksum matches, using cached data")
-        rows, _ = _load_from_disk()
-        
-        # Double-check that loaded rows have svg_url
-        if rows and len(rows) > 0 and 'svg_url' not in rows[0]:
-            log_info("[taxonomy] Cached data doesn't have svg_url, discarding and using fresh data")
-            # Get fresh rows again if cached data doesn't have svg_url
-            rows, checksum = _rpc_pull()
-            if not rows:
-                rows = _paged_pull()
-                checksum = hashlib.md5(",".join(sorted(f"{r['token']}{r.get('updated_at','')}" for r in rows)).encode()).hexdigest()
-
-    # 4) Build indexes
-    index = _build_indexes(rows)
-
-    # 5) persist disk cache
-    _save_to_disk(rows, checksum)
-    _CACHE_CHECKSUM = checksum
-    log_info(f"[taxonomy] loaded {len(rows)} rows, checksum={checksum}, index_keys={len(index)} word_keys={len(_WORD_INDEX)}")
+    # Snapshots are always keyed on _rows_checksum – the scheme delta syncs and
+    # _remote_checksum use – so a full reload of unchanged rows is a no-op swap.
+    # The RPC's own checksum is computed differently and is not comparable.
+    checksum = _rows_checksum(rows)
+
+    # 3) Compare checksum with disk cache; if same, reuse disk rows.  Rows
+    #    without svg_url are never trusted from disk.
+    if rows and 'svg_url' in rows[0] and DISK_CACHE_FILE.exists():
+        log_info("[taxonomy] Disk cache found, checking checksum")
+        disk_rows, disk_sum = _load_from_disk()
+        if disk_sum and disk_sum == checksum and disk_rows and 'svg_url' in disk_rows[0]:
+            log_info("[taxonomy] Disk cache checksum matches, using cached data")
+            rows = disk_rows
 
     # sanity-check: expected dataset size
     if len(rows) < 1000:
         log_info(f"[taxonomy] WARNING – only {len(rows)} rows loaded (<1000). Some taxonomy entries may be missing.")
 
-    return index
+    return rows, checksum
+
+def _build_snapshot(rows: List[Dict[str, Any]], checksum: str, version: int) -> TaxonomySnapshot:
+    """Prefer the shared mmap index; fall back to private in-memory dicts."""
+    if USE_COMPILED_INDEX:
+        try:
+            return ensure_compiled_snapshot(rows, checksum, COMPILED_INDEX_FILE, version)
+        except Exception as exc:
+            log_error(f"[taxonomy] compiled index unavailable, building in-memory snapshot: {exc}")
+    return TaxonomySnapshot.build(rows, checksum, version=version)
+
+def _load_bundled() -> Tuple[List[Dict[str, Any]], str]:
+    """Rows + checksum from the bundled export (disk-cache format or a bare list)."""
+    try:
+        obj = json.loads(BUNDLED_SNAPSHOT_FILE.read_text("utf-8"))
+    except Exception as e:
+        log_error(f"[taxonomy] bundled snapshot unreadable: {e}")
+        return [], ""
+    rows = obj if isinstance(obj, list) else (obj.get("rows") or [])
+    return rows, _rows_checksum(rows) if rows else ""
+
+def _boot_local() -> bool:
+    """Publish a snapshot from local files without touching the network.
+
+    Tries the compiled index, then the JSON disk cache.  Upstream is checked
+    asynchronously afterwards, so a restarted worker serves requests
+    immediately and picks up changes on the next swap.
+    """
+    global _SNAPSHOT, _CACHE_TIME
+    snapshot = None
+    if USE_COMPILED_INDEX and COMPILED_INDEX_FILE.exists():
+        try:
+            snapshot = open_compiled_snapshot(COMPILED_INDEX_FILE, version=_SNAPSHOT.version + 1)
+        except StaleIndexError as exc:
+            log_info(f"[taxonomy] compiled index not usable at boot: {exc}")
+    if snapshot is None:
+        rows, checksum = _load_from_disk()
+        if not rows:
+            return False
+        snapshot = _build_snapshot(rows, checksum, version=_SNAPSHOT.version + 1)
+
+    log_info(f"[taxonomy] booted snapshot v{snapshot.version} from local cache ({len(snapshot)} rows)")
+    _SNAPSHOT = snapshot
+    _CACHE_TIME = time.time()
+    threading.Thread(target=refresh_snapshot, daemon=True, name="taxonomy-verify").start()
+    return True
+
+def _boot_bundled() -> bool:
+    """Fall back to the export bundled with the code (remote unreachable, no cache)."""
+    global _SNAPSHOT, _CACHE_TIME
+    rows, checksum = _load_bundled()
+    if not rows:
+        log_error(f"[taxonomy] bundled export {BUNDLED_SNAPSHOT_FILE} is empty – no taxonomy until "
+                  "Supabase is reachable (write one with build_taxonomy_index.py --dump)")
+        return False
+    log_info(f"[taxonomy] remote unavailable – booting bundled snapshot ({len(rows)} rows)")
+    _SNAPSHOT = _build_snapshot(rows, checksum, version=_SNAPSHOT.version + 1)
+    _CACHE_TIME = time.time()
+    return True
+
+def _swap_snapshot(rows: List[Dict[str, Any]], checksum: str) -> TaxonomySnapshot:
+    """Build a new snapshot for *rows* and publish it unless the checksum is unchanged."""
+    global _SNAPSHOT, _CACHE_TIME
+
+    with _cache_lock:
+        _CACHE_TIME = time.time()
+        current = _SNAPSHOT
+        if current.loaded and current.checksum == checksum:
+            log_info(f"[taxonomy] checksum unchanged ({checksum}), keeping snapshot v{current.version}")
+            return current
+
+        snapshot = _build_snapshot(rows, checksum, version=current.version + 1)
+        _SNAPSHOT = snapshot  # atomic reference swap
+
+    _save_to_disk(rows, checksum)
+    log_info(f"[taxonomy] loaded {len(rows)} rows, checksum={checksum}, index_keys={len(snapshot.flat)}")
+    return snapshot
+
+def _delta_sync(current: TaxonomySnapshot) -> TaxonomySnapshot | None:
+    """Merge rows changed since the current watermark into a new snapshot.
+
+    Returns ``None`` when a full reload is required instead: a row-count
+    mismatch (deleted rows never show up in a delta), or – every
+    ``VERIFY_SEC`` – a checksum mismatch against upstream.  Rows without
+    ``updated_at`` leave no watermark to sync from; they are fully re-pulled
+    every ``VERIFY_SEC`` rather than on every tick.
+    """
+    global _CACHE_TIME, _VERIFY_TIME
+
+    rows = list(current.rows)
+    watermark = _watermark(rows)
+    if not watermark:
+        if time.time() - _VERIFY_TIME >= VERIFY_SEC:
+            return None
+        _CACHE_TIME = time.time()
+        return current
+
+    changed = _delta_pull(watermark)
+    merged = {r["token"]: r for r in rows}
+    updates = [r for r in changed if merged.get(r["token"]) != r]
+    for r in updates:
+        merged[r["token"]] = r
+    merged_rows = list(merged.values())
+
+    remote_count = _remote_count()
+    if remote_count != len(merged_rows):
+        log_info(f"[taxonomy] delta row count {len(merged_rows)} != upstream {remote_count}, full reload")
+        return None
+
+    checksum = _rows_checksum(merged_rows)
+    if time.time() - _VERIFY_TIME >= VERIFY_SEC:
+        remote_sum = _remote_checksum()
+        if remote_sum != checksum:
+            log_info(f"[taxonomy] delta checksum {checksum} != upstream {remote_sum}, full reload")
+            return None
+        _VERIFY_TIME = time.time()
+
+    if not updates:
+        _CACHE_TIME = time.time()
+        log_info(f"[taxonomy] delta sync: no changes since {watermark}")
+        return current
+
+    log_info(f"[taxonomy] delta sync: merging {len(updates)} changed rows since {watermark}")
+    return _swap_snapshot(merged_rows, checksum)
+
+def refresh_snapshot(full: bool = False) -> TaxonomySnapshot:
+    """Pull the taxonomy and swap in a new snapshot when the checksum changed.
+
+    Once a snapshot is loaded only the rows changed since its ``updated_at``
+    watermark are fetched; ``full=True`` (or a failed delta check) forces a
+    complete pull.  On failure the current snapshot stays in place (stale
+    beats empty).
+    """
+    global _VERIFY_TIME
+    current = _SNAPSHOT
+    if DELTA_SYNC and not full and current.loaded:
+        try:
+            snapshot = _delta_sync(current)
+            if snapshot is not None:
+                return snapshot
+        except Exception as exc:
+            log_error(f"[taxonomy] delta sync failed, falling back to full pull: {exc}")
+
+    try:
+        rows, checksum = _pull_taxonomy()
+        if not rows:
+            raise RuntimeError("taxonomy pull returned no rows")
+        _VERIFY_TIME = time.time()
+        return _swap_snapshot(rows, checksum)
+    except Exception as exc:
+        log_error(f"[taxonomy] load failed – using stale snapshot: {exc}")
+        return _SNAPSHOT
 
 # Singleton instance to ensure we only have one background thread
 _background_refresher = None
@@ -309,10 +367,10 @@ def _background_refresh():
     while not _shutdown_event.is_set():
         try:
             # Sleep first, then refresh - this ensures we don't double-load at startup
-            _shutdown_event.wait(CACHE_TTL_SEC)
+            _shutdown_event.wait(DELTA_SYNC_SEC if DELTA_SYNC else CACHE_TTL_SEC)
             if not _shutdown_event.is_set():
                 log_info("[taxonomy] Background refresh starting")
-                load_taxonomy(force=True)
+                refresh_snapshot()
                 log_info("[taxonomy] Background refresh completed")
         except Exception as e:
             log_error(f"[taxonomy] Background refresh error: {e}")
@@ -336,66 +394,68 @@ def stop_background_refresher():
 
 # ---------------- Public API -----------------------------
 
-def load_taxonomy(force: bool = False) -> Dict[str, Dict[str, Any]]:
-    global _CACHE, _CACHE_TIME
+def get_snapshot() -> TaxonomySnapshot:
+    """Return the current taxonomy snapshot, loading it on first use.
+
+    This is the hot path for enrichment: after the first load it is a plain
+    attribute read – refreshes happen in the background refresher.  The
+    first load prefers local files (compiled index, disk cache), then
+    Supabase, then the bundled export.
+    """
+    snapshot = _SNAPSHOT
+    if snapshot.loaded:
+        return snapshot
 
+    with _cache_lock:
+        if not _SNAPSHOT.loaded:
+            if not _boot_local():
+                refresh_snapshot()
+                if not _SNAPSHOT.loaded:
+                    _boot_bundled()
+            start_background_refresher()
+        return _SNAPSHOT
+
+async def warm_up(timeout: float | None = None) -> TaxonomySnapshot:
+    """Load the snapshot off the event loop; meant for the FastAPI lifespan."""
+    return await asyncio.wait_for(asyncio.to_thread(get_snapshot), timeout)
+
+def load_taxonomy(force: bool = False) -> Mapping[str, Dict[str, Any]]:
+    """Return the flattened slug → row view of the current snapshot.
+
+    ``force=True`` pulls from Supabase immediately; the snapshot is only
+    replaced when the checksum differs from the one already loaded.
+    """
     # ------------------------------------------------------------------
     # Ops flag: set TAXONOMY_FORCE_REFRESH=true to bypass every cache tier
     # ------------------------------------------------------------------
     if not force:
-        env_force = os.getenv("TAXONOMY_FORCE_REFRESH", "true").lower() in {
+        env_force = os.getenv("TAXONOMY_FORCE_REFRESH", "false").lower() in {
             "true",
         }
         if env_force:
             force = True
 
-    now = time.time()
-
     log_info(f"[taxonomy] load_taxonomy force={force}")
 
-    # Fast path - return the cached taxonomy if available and not expired
-    if not force and _CACHE and (CACHE_TTL_SEC == 0 or (now - _CACHE_TIME) < CACHE_TTL_SEC):
-        return _CACHE
+    if not force:
+        snapshot = get_snapshot()
+        if CACHE_TTL_SEC == 0 or (time.time() - _CACHE_TIME) < CACHE_TTL_SEC:
+            return snapshot.flat
 
-    # Lock to prevent multiple threads from loading the taxonomy simultaneously
     with _cache_lock:
-        # Double-check to avoid race conditions
-        if not force and _CACHE and (CACHE_TTL_SEC == 0 or (now - _CACHE_TIME) < CACHE_TTL_SEC):
-            return _CACHE
-
-        try:
-            _CACHE = _pull_taxonomy()
-            _CACHE_TIME = now
-            
-            # Start the background refresher if needed
-            start_background_refresher()
-        except Exception as exc:
-            log_error(f"[taxonomy] load failed – using stale cache: {exc}")
-            _CACHE = _CACHE or {}
-    return _CACHE
+        snapshot = refresh_snapshot(full=True)
+        start_background_refresher()
+    return snapshot.flat
 
 def row_by_token(token: str) -> Dict[str, Any] | None:
-    """Get row by token with LRU caching."""
-    cached = _cached_lookup(token, "row_by_token")
-    if cached is not None:
-        return cached
-    return _ROW_BY_TOKEN.get(token)
+    """Get row by canonical token."""
+    return get_snapshot().by_token(token)
 
 # ----------------------- Fuzzy / Word vote helpers -----------------------
 
 def word_vote_lookup(label: str) -> Dict[str, Any] | None:
     """Split label into words, pick the taxonomy row with the most word matches."""
-    words = [w for w in re.findall(r"[a-z0-9]+", label.lower()) if w not in STOPWORDS]
-    if not words:
-        return None
-    counter: Dict[str, int] = {}
-    for w in words:
-        for slug in _WORD_INDEX.get(w, []):
-            counter[slug] = counter.get(slug, 0) + 1
-    if not counter:
-        return None
-    best_slug = max(counter.items(), key=lambda x: x[1])[0]
-    return _CACHE.get(best_slug)
+    return get_snapshot().word_vote(label)
 
 # export a hot-reload
 def reload_taxonomy():
@@ -403,24 +463,18 @@ def reload_taxonomy():
     load_taxonomy(force=True)
 
 def clear_cache():
-    """Clear all caches (memory and disk) to force a fresh load."""
-    global _CACHE, _CACHE_TIME, _CACHE_CHECKSUM
-    
-    # Clear memory cache
-    _CACHE = None
-    _CACHE_TIME = 0
-    _CACHE_CHECKSUM = ""
-    
-    # Reset all sub-indexes
-    _PRIMARY_BY_SLUG.clear()
-    _DNAME_BY_SLUG.clear()
-    _ALIAS_BY_SLUG.clear()
-    _WORD_INDEX.clear()
-    _ROW_BY_TOKEN.clear()
-    
-    # Clear LRU cache
-    _cached_lookup.cache_clear()
-    
+    """Clear all caches (memory and disk) to force a fresh load.
+
+    The compiled index is kept: it is validated against the upstream checksum
+    on the next load and rebuilt only if stale.
+    """
+    global _SNAPSHOT, _CACHE_TIME
+
+    # Drop the in-memory snapshot
+    with _cache_lock:
+        _SNAPSHOT = TaxonomySnapshot.empty()
+        _CACHE_TIME = 0
+
     # Remove disk cache file if it exists
     try:
         if DISK_CACHE_FILE.exists():
@@ -430,7 +484,3 @@ def clear_cache():
         log_error(f"[taxonomy] Failed to clear disk cache: {e}")
     
     log_info("[taxonomy] All caches cleared")
-
-# Force an immediate refresh to pick up the updated taxonomy data with svg_url
-clear_cache()
-reload_taxonomy()
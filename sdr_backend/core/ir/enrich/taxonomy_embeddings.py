@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+"""Semantic embedding tier for taxonomy matching.
+
+Labels such as "user login service" or "object storage for uploads" share no
+token with a taxonomy row, so the exact/alias/word tiers miss them and fuzzy
+string matching guesses.  This tier embeds every row's display name, token,
+aliases and description with the same sentence-transformers model the intent
+classifier uses, and keeps them in a FAISS inner-product index persisted per
+taxonomy checksum.  A whole batch of unresolved labels is embedded and
+searched in one call.
+
+The tier is opt-in (``TAXONOMY_EMBEDDINGS=true``) and its index is built
+at startup by :func:`warm_up`.  It never blocks a request: if the index for
+the current checksum is not ready yet it is built in a background thread and
+callers fall through to fuzzy matching meanwhile – :func:`embeddings_pending`
+tells them not to cache those results.  Without faiss/sentence-transformers
+installed the tier is simply disabled.
+"""
+
+import asyncio
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import ML_MODELS_DIR
+from utils.logger import log_error, log_info
+from .taxonomy_client import CACHE_DIR
+from .taxonomy_snapshot import TaxonomySnapshot
+
+try:
+    import faiss
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # pragma: no cover – optional dependency
+    faiss = None
+    SentenceTransformer = None
+
+# ----------------------- CONFIG ---------------------------------
+ENABLED = os.getenv("TAXONOMY_EMBEDDINGS", "false").lower() in {"1", "true", "yes"}
+MODEL_NAME = os.getenv("TAXONOMY_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+MIN_SIMILARITY = float(os.getenv("TAXONOMY_EMBEDDING_MIN_SIM", "0.6"))
+INDEX_DIR = Path(os.getenv("TAXONOMY_EMBEDDING_DIR", str(CACHE_DIR / "embeddings"))).expanduser()
+ENCODE_BATCH = 256
+# ---------------------------------------------------------------
+
+
+def row_texts(row: Dict[str, Any]) -> List[str]:
+    """Texts that describe *row*: display name, token, aliases, description."""
+    texts = [row.get("display_name") or "", row["token"].replace("-", " ")]
+    texts.extend(row.get("aliases") or [])
+    texts.append(row.get("description") or "")
+    return list(dict.fromkeys(t.strip() for t in texts if t and t.strip()))
+
+
+def build_corpus(snapshot: TaxonomySnapshot) -> Tuple[List[str], np.ndarray]:
+    """Flatten the snapshot into (texts, owning row id per text)."""
+    texts: List[str] = []
+    owners: List[int] = []
+    for row_id, row in enumerate(snapshot.iter_rows()):
+        for text in row_texts(row):
+            texts.append(text)
+            owners.append(row_id)
+    return texts, np.asarray(owners, dtype=np.int64)
+
+
+class TaxonomyEmbeddingIndex:
+    """FAISS index over taxonomy texts for one snapshot checksum."""
+
+    def __init__(self, checksum: str, index: Any, owners: np.ndarray, model: Any):
+        self.checksum = checksum
+        self.index = index
+        self.owners = owners
+        self.model = model
+
+    @classmethod
+    def paths(cls, checksum: str) -> Tuple[Path, Path]:
+        return INDEX_DIR / f"taxonomy_{checksum}.faiss", INDEX_DIR / f"taxonomy_{checksum}.owners.npy"
+
+    @classmethod
+    def load_or_build(cls, snapshot: TaxonomySnapshot, model: Any) -> "TaxonomyEmbeddingIndex":
+        index_path, owners_path = cls.paths(snapshot.checksum)
+        if index_path.exists() and owners_path.exists():
+            log_info(f"[taxonomy_embed] loading index {index_path}")
+            return cls(snapshot.checksum, faiss.read_index(str(index_path)), np.load(owners_path), model)
+
+        texts, owners = build_corpus(snapshot)
+        log_info(f"[taxonomy_embed] embedding {len(texts)} texts for checksum {snapshot.checksum}")
+        vectors = model.encode(texts, batch_size=ENCODE_BATCH, normalize_embeddings=True,
+                               convert_to_numpy=True).astype(np.float32)
+        index = faiss.IndexFlatIP(vectors.shape[1])
+        index.add(vectors)
+
+        INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        # per-process temp files: several workers may build the same checksum
+        tmp_index = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        tmp_owners = owners_path.with_name(f"{owners_path.name}.{os.getpid()}.tmp")
+        faiss.write_index(index, str(tmp_index))
+        with tmp_owners.open("wb") as fh:
+            np.save(fh, owners)
+        tmp_owners.replace(owners_path)
+        tmp_index.replace(index_path)  # index last: its presence marks a complete pair
+        return cls(snapshot.checksum, index, owners, model)
+
+    def search(self, labels: Sequence[str], snapshot: TaxonomySnapshot,
+               min_similarity: float = MIN_SIMILARITY) -> List[Optional[Tuple[Dict[str, Any], float]]]:
+        """Best (row, similarity) per label, or None below *min_similarity*."""
+        if not labels or self.index.ntotal == 0:
+            return [None] * len(labels)
+        queries = self.model.encode(list(labels), batch_size=ENCODE_BATCH, normalize_embeddings=True,
+                                    convert_to_numpy=True).astype(np.float32)
+        sims, ids = self.index.search(queries, 1)
+        out: List[Optional[Tuple[Dict[str, Any], float]]] = []
+        for sim, i in zip(sims[:, 0], ids[:, 0]):
+            if i < 0 or sim < min_similarity:
+                out.append(None)
+            else:
+                out.append((snapshot.rows[int(self.owners[i])], float(sim)))
+        return out
+
+
+# ---------------- Process-wide index -----------------------------
+
+_lock = threading.Lock()
+_model: Any = None
+_current: Optional[TaxonomyEmbeddingIndex] = None
+_building: Optional[str] = None
+_failed: set[str] = set()  # checksums whose build failed; not retried
+
+
+def _load_model():
+    global _model
+    if _model is None:
+        _model = SentenceTransformer(MODEL_NAME, cache_folder=ML_MODELS_DIR)
+    return _model
+
+
+def _build(snapshot: TaxonomySnapshot) -> None:
+    global _current, _building
+    try:
+        index = TaxonomyEmbeddingIndex.load_or_build(snapshot, _load_model())
+        with _lock:
+            _current = index
+        log_info(f"[taxonomy_embed] index ready – {index.index.ntotal} vectors, checksum {snapshot.checksum}")
+    except Exception as e:
+        log_error(f"[taxonomy_embed] index build failed: {e}")
+        _failed.add(snapshot.checksum)
+    finally:
+        with _lock:
+            _building = None
+
+
+def _available(snapshot: TaxonomySnapshot) -> bool:
+    return ENABLED and faiss is not None and snapshot.loaded
+
+
+def _schedule(snapshot: TaxonomySnapshot) -> Optional[threading.Thread]:
+    """Start building the index for *snapshot* unless a build is running or failed."""
+    global _building
+    with _lock:
+        if _building is not None or snapshot.checksum in _failed:
+            return None
+        _building = snapshot.checksum
+        thread = threading.Thread(target=_build, args=(snapshot,), daemon=True, name="taxonomy-embed")
+        thread.start()
+        return thread
+
+
+def get_embedding_index(snapshot: TaxonomySnapshot) -> Optional[TaxonomyEmbeddingIndex]:
+    """Return the ready index for *snapshot*, scheduling a build if needed."""
+    if not _available(snapshot):
+        return None
+    index = _current
+    if index is not None and index.checksum == snapshot.checksum:
+        return index
+    _schedule(snapshot)
+    return None
+
+
+def embeddings_pending(snapshot: TaxonomySnapshot) -> bool:
+    """True while the tier is enabled but its index for *snapshot* is not ready.
+
+    Labels resolved meanwhile skipped the semantic tier, so their results
+    must not be cached.
+    """
+    if not _available(snapshot) or snapshot.checksum in _failed:
+        return False
+    index = _current
+    return index is None or index.checksum != snapshot.checksum
+
+
+async def warm_up(snapshot: TaxonomySnapshot, timeout: float | None = None) -> Optional[TaxonomyEmbeddingIndex]:
+    """Load or build the index off the event loop; meant for the FastAPI lifespan.
+
+    On timeout the build keeps running in the background.
+    """
+    if not _available(snapshot):
+        return None
+    thread = _schedule(snapshot)
+    if thread is not None:
+        await asyncio.wait_for(asyncio.to_thread(thread.join), timeout)
+    return get_embedding_index(snapshot)
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+"""Compiled, memory-mapped taxonomy index.
+
+The in-memory :class:`TaxonomySnapshot` keeps a private copy of every row
+and Python dict index per uvicorn worker.  This module writes the same
+lookup tables into a single binary file that every worker opens with
+``mmap`` – the OS page cache then holds **one** physical copy shared by all
+processes, and a restart only has to map the file instead of re-parsing the
+JSON disk cache and rebuilding dicts.
+
+File layout (little-endian)::
+
+    header   MAGIC | u32 format | u32 row_count | 128s checksum
+             | 10 x (u64 offset, u64 length) section table
+    rows     u64 count | u64 offsets[count+1] | JSON-encoded rows
+    <table>  u32 count | u32 key_offsets[count+1] | u32 post_offsets[count+1]
+             | utf-8 keys (sorted, padded to 4 bytes) | u32 postings
+
+Each key table maps a sorted key to a posting list of row ids and is
+searched with a binary search directly on the mapped bytes.  The ``fuzzy``
+table instead maps each fuzzy key to its position in the snapshot's
+``fuzzy_keys`` order, which the ``trigrams`` postings refer to.  The header
+carries the taxonomy checksum so a stale index is detected and rebuilt.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from utils.logger import log_info
+from .taxonomy_snapshot import TaxonomySnapshot, index_rows, word_idf
+
+MAGIC = b"TAXIDX01"
+FORMAT_VERSION = 4
+ROW_CACHE_SIZE = 4096
+
+# Section order in the header table – never reorder, only append (and bump
+# FORMAT_VERSION).
+SECTIONS = ("rows", "primary", "dname", "alias", "words", "token", "flat", "iconify", "trigrams", "fuzzy")
+
+_HEADER = struct.Struct(f"<8sII128s{len(SECTIONS) * 2}Q")
+
+
+class StaleIndexError(RuntimeError):
+    """Raised when an index file is missing, corrupt or built for another checksum."""
+
+
+# ---------------------------------------------------------------------------
+#  Writer
+# ---------------------------------------------------------------------------
+
+def _encode_rows(rows: Sequence[Dict[str, Any]]) -> bytes:
+    blobs = [json.dumps(r, separators=(",", ":"), ensure_ascii=False).encode("utf-8") for r in rows]
+    offsets = [0]
+    for b in blobs:
+        offsets.append(offsets[-1] + len(b))
+    return (
+        struct.pack("<Q", len(blobs))
+        + struct.pack(f"<{len(offsets)}Q", *offsets)
+        + b"".join(blobs)
+    )
+
+
+def _encode_table(table: Mapping[str, int | List[int]]) -> bytes:
+    keys = sorted(table, key=lambda k: k.encode("utf-8"))
+    key_bytes = [k.encode("utf-8") for k in keys]
+
+    key_offsets = [0]
+    for kb in key_bytes:
+        key_offsets.append(key_offsets[-1] + len(kb))
+
+    postings: List[int] = []
+    post_offsets = [0]
+    for k in keys:
+        val = table[k]
+        postings.extend(val if isinstance(val, list) else (val,))
+        post_offsets.append(len(postings))
+
+    n = len(keys)
+    blob = b"".join(key_bytes)
+    return (
+        struct.pack("<I", n)
+        + struct.pack(f"<{n + 1}I", *key_offsets)
+        + struct.pack(f"<{n + 1}I", *post_offsets)
+        + blob
+        + b"\0" * (-len(blob) % 4)
+        + struct.pack(f"<{len(postings)}I", *postings)
+    )
+
+
+def compile_index(rows: Sequence[Dict[str, Any]], checksum: str, path: Path) -> Path:
+    """Write a compiled index for *rows* to *path* (atomic replace)."""
+    ids = index_rows(rows)
+    bodies = [
+        _encode_rows(rows),
+        _encode_table(ids.primary),
+        _encode_table(ids.dname),
+        _encode_table(ids.alias),
+        _encode_table(ids.words),
+        _encode_table(ids.token),
+        _encode_table(ids.flat),
+        _encode_table(ids.iconify),
+        _encode_table(ids.trigrams),
+        _encode_table({key: pos for pos, key in enumerate(ids.fuzzy_keys)}),
+    ]
+
+    table: List[int] = []
+    offset = _HEADER.size
+    for body in bodies:
+        # keep every section 8-byte aligned so u32/u64 views stay aligned
+        offset += -offset % 8
+        table.extend((offset, len(body)))
+        offset += len(body)
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(rows), checksum.encode("utf-8")[:128], *table)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False, prefix=path.stem + "_", suffix=".tmp") as tmp:
+        tmp.write(header)
+        pos = _HEADER.size
+        for (sec_off, _), body in zip(zip(table[::2], table[1::2]), bodies):
+            tmp.write(b"\0" * (sec_off - pos))
+            tmp.write(body)
+            pos = sec_off + len(body)
+        tmp_path = Path(tmp.name)
+    tmp_path.replace(path)
+
+    log_info(f"[taxonomy] compiled index written to {path} – rows={len(rows)}, "
+             f"bytes={pos}, checksum={checksum}")
+    return path
+
+
+# ---------------------------------------------------------------------------
+#  Reader
+# ---------------------------------------------------------------------------
+
+class _KeyTable:
+    """Binary-searchable key → posting list table living inside the mmap."""
+
+    def __init__(self, buf: memoryview, offset: int, length: int):
+        (self.count,) = struct.unpack_from("<I", buf, offset)
+        n1 = self.count + 1
+        start = offset + 4
+        self._key_offsets = buf[start:start + 4 * n1].cast("I")
+        start += 4 * n1
+        self._post_offsets = buf[start:start + 4 * n1].cast("I")
+        start += 4 * n1
+        key_len = self._key_offsets[self.count]
+        self._keys = buf[start:start + key_len]
+        start += key_len + (-key_len % 4)
+        self._postings = buf[start:start + 4 * self._post_offsets[self.count]].cast("I")
+        if start + 4 * self._post_offsets[self.count] > offset + length:
+            raise StaleIndexError("key table overruns its section")
+
+    def _key(self, i: int) -> bytes:
+        return bytes(self._keys[self._key_offsets[i]:self._key_offsets[i + 1]])
+
+    def find(self, key: str) -> int:
+        target = key.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._key(lo) == target:
+            return lo
+        return -1
+
+    def postings(self, i: int) -> Tuple[int, ...]:
+        return tuple(self._postings[self._post_offsets[i]:self._post_offsets[i + 1]])
+
+    def postings_array(self, i: int) -> np.ndarray:
+        """Zero-copy uint32 view of a posting list."""
+        return np.frombuffer(self._postings[self._post_offsets[i]:self._post_offsets[i + 1]], dtype=np.uint32)
+
+    def keys(self) -> Iterator[str]:
+        for i in range(self.count):
+            yield self._key(i).decode("utf-8")
+
+    def ordered_keys(self) -> Tuple[str, ...]:
+        """Keys placed at the single position each one's posting holds."""
+        out: List[str] = [""] * self.count
+        for i, key in enumerate(self.keys()):
+            out[self._postings[self._post_offsets[i]]] = key
+        return tuple(out)
+
+
+class CompiledTaxonomyIndex:
+    """Read-only view over a compiled index file opened with ``mmap``."""
+
+    def __init__(self, path: Path):
+        if sys.byteorder != "little":
+            raise StaleIndexError("compiled taxonomy index requires a little-endian host")
+
+        self.path = Path(path)
+        try:
+            with self.path.open("rb") as fh:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            raise StaleIndexError(f"cannot map {self.path}: {exc}") from exc
+
+        buf = memoryview(self._mm)
+        if len(buf) < _HEADER.size:
+            raise StaleIndexError("index file truncated")
+        magic, fmt, row_count, checksum, *table = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise StaleIndexError(f"unsupported index format {magic!r}/{fmt}")
+        sections = dict(zip(SECTIONS, zip(table[::2], table[1::2])))
+        if any(off + length > len(buf) for off, length in sections.values()):
+            raise StaleIndexError("index file truncated")
+
+        self.checksum = checksum.rstrip(b"\0").decode("utf-8")
+        self.row_count = row_count
+
+        rows_off, _ = sections["rows"]
+        n1 = row_count + 1
+        self._row_offsets = buf[rows_off + 8:rows_off + 8 + 8 * n1].cast("Q")
+        self._row_data = rows_off + 8 + 8 * n1
+        self._buf = buf
+
+        self.tables = {name: _KeyTable(buf, *sections[name]) for name in SECTIONS[1:]}
+        self.row = lru_cache(maxsize=ROW_CACHE_SIZE)(self._decode_row)
+
+    def _decode_row(self, row_id: int) -> Dict[str, Any]:
+        start = self._row_data + self._row_offsets[row_id]
+        end = self._row_data + self._row_offsets[row_id + 1]
+        return json.loads(bytes(self._buf[start:end]))
+
+    def lookup(self, table: str, key: str) -> Tuple[int, ...]:
+        tbl = self.tables[table]
+        i = tbl.find(key)
+        return tbl.postings(i) if i >= 0 else ()
+
+
+class _CompiledRows(Sequence):
+    def __init__(self, index: CompiledTaxonomyIndex):
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._index.row_count
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self._index.row(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._index.row(i)
+
+
+class _CompiledMapping(Mapping):
+    """Mapping facade over one key table.
+
+    ``mode`` selects what a hit returns: ``"row"`` (last posting's row),
+    ``"rows"`` (tuple of rows), ``"ids"`` (raw posting list), ``"array"``
+    (zero-copy numpy view of the posting list) or ``"idf"`` (word weight
+    derived from the posting-list length).
+    """
+
+    def __init__(self, index: CompiledTaxonomyIndex, table: str, mode: str):
+        self._index = index
+        self._table = index.tables[table]
+        self._name = table
+        self._mode = mode
+
+    def __getitem__(self, key: str):
+        if self._mode in ("array", "idf"):
+            i = self._table.find(key)
+            if i < 0:
+                raise KeyError(key)
+            postings = self._table.postings_array(i)
+            if self._mode == "idf":
+                return word_idf(len(postings), self._index.row_count)
+            return postings
+        ids = self._index.lookup(self._name, key)
+        if not ids:
+            raise KeyError(key)
+        if self._mode == "ids":
+            return ids
+        if self._mode == "rows":
+            return tuple(self._index.row(i) for i in ids)
+        return self._index.row(ids[-1])
+
+    def __iter__(self) -> Iterator[str]:
+        return self._table.keys()
+
+    def __len__(self) -> int:
+        return self._table.count
+
+
+def open_compiled_snapshot(path: Path, version: int, checksum: str | None = None) -> TaxonomySnapshot:
+    """Map *path* and wrap it in a :class:`TaxonomySnapshot`.
+
+    Raises :class:`StaleIndexError` when the file is missing/corrupt or when
+    *checksum* is given and does not match the one the file was built from.
+    """
+    index = CompiledTaxonomyIndex(path)
+    if checksum is not None and index.checksum != checksum:
+        raise StaleIndexError(f"index checksum {index.checksum} != {checksum}")
+
+    flat = _CompiledMapping(index, "flat", "row")
+    snapshot = TaxonomySnapshot(
+        version=version,
+        checksum=index.checksum,
+        rows=_CompiledRows(index),
+        primary_by_slug=_CompiledMapping(index, "primary", "row"),
+        dname_by_slug=_CompiledMapping(index, "dname", "row"),
+        alias_by_slug=_CompiledMapping(index, "alias", "rows"),
+        word_index=_CompiledMapping(index, "words", "array"),
+        word_idf=_CompiledMapping(index, "words", "idf"),
+        row_by_token=_CompiledMapping(index, "token", "row"),
+        flat=flat,
+        iconify_by_id=_CompiledMapping(index, "iconify", "row"),
+        fuzzy_keys=index.tables["fuzzy"].ordered_keys(),
+        trigram_index=_CompiledMapping(index, "trigrams", "array"),
+    )
+    log_info(f"[taxonomy] mapped compiled index {path} – rows={index.row_count}, "
+             f"checksum={index.checksum}, snapshot v{version}")
+    return snapshot
+
+
+def ensure_compiled_snapshot(rows: Sequence[Dict[str, Any]], checksum: str, path: Path,
+                             version: int) -> TaxonomySnapshot:
+    """Open the index at *path*, (re)compiling it first if it is stale."""
+    try:
+        return open_compiled_snapshot(path, version, checksum)
+    except StaleIndexError as exc:
+        if os.path.exists(path):
+            log_info(f"[taxonomy] compiled index stale ({exc}); rebuilding")
+    compile_index(rows, checksum, path)
+    return open_compiled_snapshot(path, version, checksum)
+
+
+__all__ = [
+    "CompiledTaxonomyIndex",
+    "StaleIndexError",
+    "compile_index",
+    "ensure_compiled_snapshot",
+    "open_compiled_snapshot",
+]
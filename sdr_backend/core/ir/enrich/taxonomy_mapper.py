@@ -1,22 +1,20 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import os
 import re
 
+import numpy as np
+
 from core.ir.ir_types import IRGraph, IRNode
 from utils.logger import log_info, log_error
-from .taxonomy_client import (
-    load_taxonomy, 
-    normalize_label, 
-    word_vote_lookup, 
-    slugify,
-    _PRIMARY_BY_SLUG, 
-    _DNAME_BY_SLUG, 
-    _ALIAS_BY_SLUG,
-    _ROW_BY_TOKEN
-)
-from .fuzzy_match import fuzzy_best_match
+from .taxonomy_client import get_snapshot, normalize_label
+from .taxonomy_snapshot import TaxonomySnapshot
+from .fuzzy_match import fuzzy_best_match, fuzzy_best_matches
+from .resolution_cache import ResolutionCache, get_resolution_cache
+from .taxonomy_embeddings import embeddings_pending, get_embedding_index
 from .cloud_resource_mapper import CloudResourceMapper
+from .working_graph import run_on_copy, stage_access
 
 # Define mapping from kind to numeric layer index for frontend
 KIND_TO_LAYER_INDEX = {
@@ -34,6 +32,11 @@ KIND_TO_LAYER_INDEX = {
     "OTHER": 10,    # Separate layer for Other
 }
 
+# Threads rapidfuzz may use for batch fuzzy scoring (-1 = all cores)
+FUZZY_WORKERS = int(os.getenv("TAXONOMY_FUZZY_WORKERS", "-1"))
+# Keys kept per label after trigram pruning (0 = score the full corpus)
+FUZZY_CANDIDATES = int(os.getenv("TAXONOMY_FUZZY_CANDIDATES", "50"))
+
 # Defaults
 DEFAULT_KIND = "SERVICE"
 DEFAULT_LAYER_INDEX = 3  # Service layer
@@ -41,22 +44,158 @@ DEFAULT_LAYER_INDEX = 3  # Service layer
 class TaxonomyMapper:
     """Maps IR nodes to taxonomy entries for kind, icon, and layer assignment."""
     
-    def __init__(self):
-        """Initialize with taxonomy data and cloud resource mapper."""
-        # Force refresh taxonomy data to get latest fields including svg_url
-        from .taxonomy_client import reload_taxonomy
-        reload_taxonomy()
-        
-        self.taxonomy = load_taxonomy(force=True)
-        self.fuzzy_keys = list(self.taxonomy.keys())
+    def __init__(self, snapshot: Optional[TaxonomySnapshot] = None,
+                 cache: Optional[ResolutionCache] = None):
+        """Bind to a taxonomy snapshot (the shared process-wide one by default).
+
+        The snapshot is immutable, so a mapper sees one consistent taxonomy
+        for its whole lifetime even if a background refresh swaps in a newer
+        version meanwhile.  No network access happens here.  Resolutions are
+        memoised in *cache* (the shared LRU + Redis cache by default), scoped
+        by the snapshot checksum.
+        """
+        self.snapshot = snapshot if snapshot is not None else get_snapshot()
+        self.cache = cache if cache is not None else get_resolution_cache()
+        self.taxonomy = self.snapshot.flat
+        self.fuzzy_keys = self.snapshot.fuzzy_keys
         self.cloud_mapper = CloudResourceMapper()
-        log_info(f"[taxonomy_mapper] Initialized with {len(self.taxonomy)} taxonomy entries")
+        log_info(f"[taxonomy_mapper] Initialized with {len(self.taxonomy)} taxonomy entries "
+                 f"(snapshot v{self.snapshot.version})")
     
     def find_best_taxonomy_match(self, node: IRNode) -> Dict[str, Any]:
         """Find the best matching taxonomy entry for a node."""
+        key = self._cache_key(node)
+        if key is not None:
+            row = self.cache.get(self.snapshot.checksum, key)
+            if row is not None:
+                return row
+
+        cacheable = not embeddings_pending(self.snapshot)
+        row = self._resolve(node)
+        if key is not None and cacheable:
+            self.cache.put(self.snapshot.checksum, key, row)
+        return row
+
+    def _resolve(self, node: IRNode) -> Dict[str, Any]:
+        """Run the full tiered lookup for one node (no caching)."""
+        row = self._match_deterministic(node)
+        if row:
+            return row
+
+        # Step 4: Semantic embedding match
+        results: List[Optional[Dict[str, Any]]] = [None]
+        if not self._match_semantic([node], [0], results):
+            return results[0]  # type: ignore[return-value]
+
+        # Step 5: Try fuzzy matching (more expensive)
+        slug, _ = normalize_label(node.name.lower())
+        key, score = fuzzy_best_match(slug, self._fuzzy_choices([slug]))
+        return self._resolve_fallback(node, key, score)
+
+    def match_nodes(self, nodes: Sequence[IRNode]) -> List[Dict[str, Any]]:
+        """Resolve a whole batch of nodes, returning one taxonomy row per node.
+
+        Labels already in the resolution cache are answered from it (one
+        Redis round-trip for the whole batch).  For the rest, cheap
+        deterministic tiers run per node and every label that falls through
+        to fuzzy matching is scored in a single ``cdist`` matrix instead of
+        one full-corpus scan per node.
+        """
+        checksum = self.snapshot.checksum
+        keys = [self._cache_key(n) for n in nodes]
+        unique = list(dict.fromkeys(k for k in keys if k is not None))
+        cached = dict(zip(unique, self.cache.get_many(checksum, unique))) if unique else {}
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(nodes)
+        todo: List[int] = []
+        first: Dict[Tuple[str, str], int] = {}
+        for i, key in enumerate(keys):
+            if key is not None and cached.get(key) is not None:
+                results[i] = cached[key]
+            elif key is None or key not in first:
+                if key is not None:
+                    first[key] = i
+                todo.append(i)
+
+        # Results resolved while the embedding index builds skipped that tier
+        cacheable = not embeddings_pending(self.snapshot)
+        self._match_batch(nodes, todo, results)
+
+        if cacheable:
+            self.cache.put_many(checksum, {key: results[i] for key, i in first.items()})
+        for i, key in enumerate(keys):
+            if results[i] is None:  # duplicate label resolved via its first occurrence
+                results[i] = results[first[key]]
+
+        return results  # type: ignore[return-value]
+
+    def _match_batch(self, nodes: Sequence[IRNode], todo: Sequence[int],
+                     results: List[Optional[Dict[str, Any]]]) -> None:
+        """Resolve ``nodes[i]`` for every *i* in *todo* into *results*."""
+        pending: List[int] = []
+        for i in todo:
+            node = nodes[i]
+            row = self._match_deterministic(node)
+            if row:
+                results[i] = row
+            else:
+                pending.append(i)
+
+        if pending:
+            pending = self._match_semantic(nodes, pending, results)
+
+        if pending:
+            slugs = [normalize_label(nodes[i].name.lower())[0] for i in pending]
+            log_info(f"[taxonomy_mapper] Batch fuzzy matching {len(slugs)} unresolved labels")
+            matches = fuzzy_best_matches(slugs, self._fuzzy_choices(slugs), workers=FUZZY_WORKERS)
+            for i, (key, score) in zip(pending, matches):
+                results[i] = self._resolve_fallback(nodes[i], key, score)
+
+    def _match_semantic(self, nodes: Sequence[IRNode], pending: List[int],
+                        results: List[Optional[Dict[str, Any]]]) -> List[int]:
+        """Embedding tier: resolve what it can in one batch, return the rest."""
+        index = get_embedding_index(self.snapshot)
+        if index is None:
+            return pending
+        hits = index.search([nodes[i].name for i in pending], self.snapshot)
+        remaining: List[int] = []
+        for i, hit in zip(pending, hits):
+            if hit is None:
+                remaining.append(i)
+                continue
+            row, sim = hit
+            log_info(f"[taxonomy_mapper] ✅ Embedding match found: {row['token']} (sim={sim:.2f}) "
+                     f"for '{nodes[i].name.lower()}'")
+            results[i] = row
+        return remaining
+
+    def _cache_key(self, node: IRNode) -> Optional[Tuple[str, str]]:
+        """(label, provider hint) cache key, or None when the node must not be cached.
+
+        The key is exactly what resolution reads: the lower-cased label (the
+        cloud tier and fallback row depend on its raw spelling, not just its
+        slug) and the provider hint.  Nodes carrying an explicit iconify id
+        can resolve through it, so their result is never shared.
+        """
+        metadata = node.metadata or {}
+        if not self.snapshot.loaded or metadata.get("iconify_id") or metadata.get("iconifyId"):
+            return None
+        return node.name.lower(), str(metadata.get("provider") or "").lower()
+
+    def _fuzzy_choices(self, slugs: Sequence[str]) -> Sequence[str]:
+        """Union of trigram-pruned candidates for *slugs*, in corpus order."""
+        if FUZZY_CANDIDATES <= 0 or len(self.fuzzy_keys) <= FUZZY_CANDIDATES:
+            return self.fuzzy_keys
+        ids = np.unique(np.concatenate(
+            [self.snapshot.fuzzy_candidate_ids(slug, FUZZY_CANDIDATES) for slug in slugs]
+        ))
+        # keep corpus order so score ties break exactly as a full scan would
+        return [self.fuzzy_keys[i] for i in ids]
+
+    def _match_deterministic(self, node: IRNode) -> Optional[Dict[str, Any]]:
+        """Cloud, exact-slug and word-vote tiers (no fuzzy scoring)."""
         # Extract node properties for matching
         node_name = node.name.lower()
-        node_kind = node.kind
         metadata = node.metadata or {}
         
         # Step 1: Check if this is a cloud resource (provider-service format)
@@ -76,7 +215,7 @@ class TaxonomyMapper:
         # Try direct match on the token first
         for cand in self._candidate_slugs(slug):
             # 1. canonical token match
-            row = (_PRIMARY_BY_SLUG.get(cand))
+            row = self.snapshot.primary(cand)
             if row:
                 log_info(f"[taxonomy_mapper] ✅ Primary match found: {row['token']} for '{node_name}'")
                 # Debug svg_url presence
@@ -87,7 +226,7 @@ class TaxonomyMapper:
                 return row
 
             # 2. display-name match
-            row = _DNAME_BY_SLUG.get(cand)
+            row = self.snapshot.display(cand)
             if row:
                 log_info(f"[taxonomy_mapper] ✅ Display name match found: {row['token']} for '{node_name}'")
                 # Debug svg_url presence
@@ -98,7 +237,7 @@ class TaxonomyMapper:
                 return row
 
             # 3. alias match
-            alias_rows = _ALIAS_BY_SLUG.get(cand)
+            alias_rows = self.snapshot.aliases(cand)
             if alias_rows and alias_rows[0]:
                 row = self._best_alias_match(node_name, alias_rows)
                 log_info(f"[taxonomy_mapper] ✅ Alias match found: {row['token']} for '{node_name}'")
@@ -110,13 +249,18 @@ class TaxonomyMapper:
                 return row
         
         # Step 3: Try word-vote heuristics
-        row = word_vote_lookup(node_name)
+        row = self.snapshot.word_vote(node_name)
         if row:
             log_info(f"[taxonomy_mapper] ✅ Word-vote match found: {row['token']} for '{node_name}'")
             return row
-        
-        # Step 4: Try fuzzy matching (more expensive)
-        key, score = fuzzy_best_match(slug, self.fuzzy_keys)
+
+        return None
+
+    def _resolve_fallback(self, node: IRNode, key: Optional[str], score: float) -> Dict[str, Any]:
+        """Apply the fuzzy result, then the iconify_id and default fallbacks."""
+        node_name = node.name.lower()
+        metadata = node.metadata or {}
+
         if key and score > 60:  # Threshold for fuzzy matching
             row = self.taxonomy[key]
             log_info(f"[taxonomy_mapper] ✅ Fuzzy match found: {row['token']} (score={score}) for '{node_name}'")
@@ -125,10 +269,10 @@ class TaxonomyMapper:
         # Step 5: Fallback - check if iconify_id or provider already exists in metadata
         iconify_id = metadata.get("iconify_id") or metadata.get("iconifyId")
         if iconify_id:
-            for _, row in self.taxonomy.items():
-                if row.get("iconify_id") == iconify_id:
-                    log_info(f"[taxonomy_mapper] ✅ Match by iconify_id: {row['token']} for '{node_name}'")
-                    return row
+            row = self.snapshot.by_iconify(iconify_id)
+            if row:
+                log_info(f"[taxonomy_mapper] ✅ Match by iconify_id: {row['token']} for '{node_name}'")
+                return row
         
         # No match found
         log_info(f"[taxonomy_mapper] ❌ No taxonomy match found for '{node_name}', defaulting to {DEFAULT_KIND}")
@@ -205,7 +349,7 @@ class TaxonomyMapper:
         parts = [p for p in slug.split("-") if p]
         return [slug] + parts
     
-    def _best_alias_match(self, raw_label: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _best_alias_match(self, raw_label: str, rows: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
         """Select row whose token shares most words with the raw label."""
         raw_words = set(re.findall(r"[a-z0-9]+", raw_label.lower()))
         best_row = rows[0]
@@ -220,20 +364,27 @@ class TaxonomyMapper:
 
 def assign_taxonomy(graph: IRGraph) -> IRGraph:
     """Assign kind, layer, and icon metadata based on taxonomy lookup."""
+    return run_on_copy(assign_taxonomy_inplace, graph)
+
+
+@stage_access(reads=("nodes.name", "nodes.kind", "nodes.metadata"),
+              writes=("nodes.kind", "nodes.layer", "nodes.metadata"))
+def assign_taxonomy_inplace(graph: IRGraph) -> None:
+    """In-place variant of :func:`assign_taxonomy` for a working copy."""
     mapper = TaxonomyMapper()
-    new_nodes: List[IRNode] = []
     
     token_success_count = 0
     fallback_count = 0
     cloud_count = 0
     
-    for node in graph.nodes:
+    # Resolve every node up-front so fuzzy scoring runs as one batch
+    taxonomy_rows = mapper.match_nodes(graph.nodes)
+    
+    for node, taxonomy_row in zip(graph.nodes, taxonomy_rows):
         # Skip if node already has a non-default kind and we're just using this for metadata
         existing_kind = node.kind
         use_existing_kind = existing_kind
         
-        # Get the best taxonomy match
-        taxonomy_row = mapper.find_best_taxonomy_match(node)
         log_info(f"[taxonomy_mapper] Taxonomy row: {taxonomy_row}")
         
         # Extract useful data from the taxonomy entry
@@ -270,14 +421,10 @@ def assign_taxonomy(graph: IRGraph) -> IRGraph:
             log_info(f"[taxonomy_mapper] Added SVG URL for node {node.id}: {svg_url}")
         
         # Update the node with new values
-        updated_node = node.model_copy(update={
-            "kind": existing_kind if use_existing_kind else kind,
-            "layer": kind,  # Use kind as layer directly
-            "metadata": {**node.metadata, **metadata_updates}
-        })
-        log_info(f"[taxonomy_mapper] Updated node: {updated_node}")
-        
-        new_nodes.append(updated_node)
+        node.kind = existing_kind if use_existing_kind else kind
+        node.layer = kind  # Use kind as layer directly
+        node.metadata.update(metadata_updates)
+        log_info(f"[taxonomy_mapper] Updated node: {node}")
         
         # Track statistics
         if taxonomy_row.get("token") == node.name.lower():
@@ -286,6 +433,4 @@ def assign_taxonomy(graph: IRGraph) -> IRGraph:
             fallback_count += 1
     
     log_info(f"[taxonomy_mapper] Processed {len(graph.nodes)} nodes: "
-             f"{token_success_count} direct matches, {fallback_count} fallbacks")
-    
-    return graph.model_copy(update={"nodes": new_nodes}) 
\ No newline at end of file
+             f"{token_success_count} direct matches, {fallback_count} fallbacks") 
\ No newline at end of file
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+"""Immutable, versioned view over the ``tech_taxonomy`` table.
+
+A :class:`TaxonomySnapshot` bundles the raw rows with every lookup index the
+enrichment stages need (canonical token, display name, alias and word
+indexes).  Snapshots are built once and never mutated afterwards – the
+taxonomy client swaps in a *new* snapshot when the upstream checksum
+changes, so readers holding a reference always see a consistent set of
+indexes without taking a lock.
+"""
+
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from utils.logger import log_info
+
+STOPWORDS: set[str] = {"service","services","server","engine","api","db","database",
+                       "system","app","apps","module","component"}
+
+_slug_re = re.compile(r"[^a-z0-9]+")
+_word_re = re.compile(r"[a-z0-9]+")
+
+
+def slugify(label: str) -> str:
+    return _slug_re.sub("-", label.lower()).strip("-")
+
+
+def normalize_label(s: str) -> Tuple[str, str]:
+    base = re.sub(r"[^a-z0-9]+", " ", s.lower()).strip()
+    tokens = [t for t in base.split()]
+    slug = "-".join(tokens) if tokens else slugify(s)
+    core = tokens[-1] if tokens else slug
+    return slug, core
+
+
+def _row_words(row: Dict[str, Any]) -> set[str]:
+    """All meaningful words from token/display_name/aliases."""
+    texts = [row["token"], row.get("display_name") or ""] + (row.get("aliases") or [])
+    words = set()
+    for txt in texts:
+        for w in _word_re.findall(txt.lower()):
+            if w and w not in STOPWORDS:
+                words.add(w)
+    return words
+
+
+class RowIndexes(NamedTuple):
+    """Lookup tables expressed as row ids (positions in the rows sequence)."""
+
+    primary: Dict[str, int]
+    dname: Dict[str, int]
+    alias: Dict[str, List[int]]
+    words: Dict[str, List[int]]
+    token: Dict[str, int]
+    flat: Dict[str, int]
+    iconify: Dict[str, int]
+    fuzzy_keys: List[str]
+    trigrams: Dict[str, List[int]]
+
+
+def word_idf(df: int, n_rows: int) -> float:
+    """Smoothed inverse document frequency of a word found in *df* of *n_rows* rows."""
+    return math.log1p(n_rows / df) if df else 0.0
+
+
+def trigrams(text: str) -> set[str]:
+    """Distinct character trigrams of *text*, padded so short keys still index."""
+    padded = f"${text}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def index_rows(rows: Sequence[Dict[str, Any]]) -> RowIndexes:
+    """Build the deterministic lookup tables for *rows*, ordered by confidence.
+
+    Shared by the in-memory snapshot and the compiled on-disk index so both
+    resolve labels identically.
+    """
+    primary: Dict[str, int] = {}
+    dname: Dict[str, int] = {}
+    alias: Dict[str, List[int]] = {}
+    words: Dict[str, List[int]] = {}
+    token: Dict[str, int] = {}
+
+    for row_id, row in enumerate(rows):
+        # Canonical token ➜ primary index
+        primary[slugify(row["token"])] = row_id
+        token[row["token"]] = row_id
+
+        # Display name ➜ secondary index
+        display = row.get("display_name") or ""
+        if display:
+            dname[slugify(display)] = row_id
+
+        # Aliases ➜ tertiary index (many-to-one)
+        for a in (row.get("aliases") or []):
+            alias.setdefault(slugify(a), []).append(row_id)
+
+        # Word-level index for vote lookup (posting list of row ids)
+        for w in _row_words(row):
+            words.setdefault(w, []).append(row_id)
+
+    # Flatten: aliases first (first row wins on collision), then
+    # display-names, canonical tokens last so they shadow weaker signals.
+    flat: Dict[str, int] = {}
+    for slug, ids in alias.items():
+        flat.setdefault(slug, ids[0])
+    flat.update(dname)
+    flat.update(primary)
+
+    # iconify_id ➜ first row in flattened order (last-resort fallback tier)
+    iconify: Dict[str, int] = {}
+    for row_id in flat.values():
+        icon = rows[row_id].get("iconify_id")
+        if icon:
+            iconify.setdefault(icon, row_id)
+
+    # Fuzzy-match corpus in flattened order (score ties resolve to the
+    # earlier key), plus a trigram inverted index over it used to prune
+    # candidates before scoring.
+    fuzzy_keys = list(flat)
+    grams: Dict[str, List[int]] = {}
+    for pos, key in enumerate(fuzzy_keys):
+        for g in trigrams(key):
+            grams.setdefault(g, []).append(pos)
+
+    return RowIndexes(primary, dname, alias, words, token, flat, iconify, fuzzy_keys, grams)
+
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+def _frozen_array(values: List[int]) -> np.ndarray:
+    arr = np.asarray(values, dtype=np.uint32)
+    arr.setflags(write=False)
+    return arr
+
+
+@dataclass(frozen=True)
+class TaxonomySnapshot:
+    """Read-only taxonomy rows plus their deterministic lookup indexes.
+
+    Indexes are ordered by confidence:
+
+    1. ``primary_by_slug`` – exact token match (cannot be shadowed)
+    2. ``dname_by_slug``   – exact display-name match
+    3. ``alias_by_slug``   – exact alias match (may map to multiple rows)
+
+    ``flat`` is the flattened dict legacy callers expect, in which
+    canonical tokens always win.
+    """
+
+    version: int
+    checksum: str
+    rows: Sequence[Dict[str, Any]] = ()
+    primary_by_slug: Mapping[str, Dict[str, Any]] = field(default_factory=lambda: _EMPTY)
+    dname_by_slug: Mapping[str, Dict[str, Any]] = field(default_factory=lambda: _EMPTY)
+    alias_by_slug: Mapping[str, Tuple[Dict[str, Any], ...]] = field(default_factory=lambda: _EMPTY)
+    word_index: Mapping[str, np.ndarray] = field(default_factory=lambda: _EMPTY)
+    word_idf: Mapping[str, float] = field(default_factory=lambda: _EMPTY)
+    row_by_token: Mapping[str, Dict[str, Any]] = field(default_factory=lambda: _EMPTY)
+    flat: Mapping[str, Dict[str, Any]] = field(default_factory=lambda: _EMPTY)
+    iconify_by_id: Mapping[str, Dict[str, Any]] = field(default_factory=lambda: _EMPTY)
+    fuzzy_keys: Tuple[str, ...] = ()
+    trigram_index: Mapping[str, np.ndarray] = field(default_factory=lambda: _EMPTY)
+    built_at: float = field(default_factory=time.time)
+
+    # ------------------------------------------------------------------
+    #  Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def empty(cls) -> "TaxonomySnapshot":
+        """Placeholder used before the first successful load."""
+        return cls(version=0, checksum="")
+
+    @classmethod
+    def build(cls, rows: Sequence[Dict[str, Any]], checksum: str, version: int) -> "TaxonomySnapshot":
+        """Construct every index for *rows* in a single pass."""
+        rows = tuple(rows)
+        ids = index_rows(rows)
+
+        snapshot = cls(
+            version=version,
+            checksum=checksum,
+            rows=rows,
+            primary_by_slug=MappingProxyType({k: rows[i] for k, i in ids.primary.items()}),
+            dname_by_slug=MappingProxyType({k: rows[i] for k, i in ids.dname.items()}),
+            alias_by_slug=MappingProxyType({k: tuple(rows[i] for i in v) for k, v in ids.alias.items()}),
+            word_index=MappingProxyType({k: _frozen_array(v) for k, v in ids.words.items()}),
+            word_idf=MappingProxyType({k: word_idf(len(v), len(rows)) for k, v in ids.words.items()}),
+            row_by_token=MappingProxyType({k: rows[i] for k, i in ids.token.items()}),
+            flat=MappingProxyType({k: rows[i] for k, i in ids.flat.items()}),
+            iconify_by_id=MappingProxyType({k: rows[i] for k, i in ids.iconify.items()}),
+            fuzzy_keys=tuple(ids.fuzzy_keys),
+            trigram_index=MappingProxyType({k: _frozen_array(v) for k, v in ids.trigrams.items()}),
+        )
+
+        log_info(
+            f"[taxonomy] snapshot v{version} built – primary={len(ids.primary)}, "
+            f"display={len(ids.dname)}, alias={len(ids.alias)}, word_keys={len(ids.words)}, "
+            f"checksum={checksum}"
+        )
+        return snapshot
+
+    # ------------------------------------------------------------------
+    #  Lookups
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def loaded(self) -> bool:
+        return self.version > 0
+
+    def primary(self, slug: str) -> Dict[str, Any] | None:
+        return self.primary_by_slug.get(slug)
+
+    def display(self, slug: str) -> Dict[str, Any] | None:
+        return self.dname_by_slug.get(slug)
+
+    def aliases(self, slug: str) -> Tuple[Dict[str, Any], ...]:
+        return self.alias_by_slug.get(slug, ())
+
+    def by_token(self, token: str) -> Dict[str, Any] | None:
+        return self.row_by_token.get(token)
+
+    def by_key(self, key: str) -> Dict[str, Any] | None:
+        """Lookup in the flattened legacy view (fuzzy keys resolve here)."""
+        return self.flat.get(key)
+
+    def by_iconify(self, iconify_id: str) -> Dict[str, Any] | None:
+        return self.iconify_by_id.get(iconify_id)
+
+    def word_vote(self, label: str) -> Dict[str, Any] | None:
+        """Split label into words, pick the row with the highest IDF-weighted vote.
+
+        Rare words count for more than ubiquitous ones ("cloud", "gateway"),
+        so a single discriminative word decides the match.  Words are applied
+        rarest first and scoring stops as soon as the leader can no longer be
+        overtaken by the remaining (common) words.
+        """
+        terms = []
+        for w in dict.fromkeys(_word_re.findall(label.lower())):
+            if w in STOPWORDS:
+                continue
+            postings = self.word_index.get(w)
+            if postings is not None and len(postings):
+                terms.append((self.word_idf[w], postings))
+        if not terms:
+            return None
+        terms.sort(key=lambda t: -t[0])
+
+        # Score only the rows some term votes for: the union of the postings
+        # (ascending row ids, so argmax still prefers the earliest row).
+        row_ids, slots = np.unique(np.concatenate([p for _, p in terms]), return_inverse=True)
+        if len(row_ids) == 1:
+            return self.rows[int(row_ids[0])]
+        scores = np.zeros(len(row_ids))
+        remaining = sum(weight for weight, _ in terms)
+        start = 0
+        for weight, postings in terms:
+            np.add.at(scores, slots[start:start + len(postings)], weight)
+            start += len(postings)
+            remaining -= weight
+            if remaining <= 0:
+                break
+            second, first = np.partition(scores, -2)[-2:]
+            if first - second > remaining:
+                break
+        return self.rows[int(row_ids[int(np.argmax(scores))])]
+
+    def fuzzy_candidates(self, query: str, limit: int = 50) -> List[str]:
+        """Return the *limit* fuzzy keys sharing the most trigrams with *query*.
+
+        Candidates come back in ``fuzzy_keys`` order so that ties during
+        scoring resolve exactly as a full-corpus scan would.
+        """
+        return [self.fuzzy_keys[i] for i in self.fuzzy_candidate_ids(query, limit)]
+
+    def fuzzy_candidate_ids(self, query: str, limit: int = 50) -> np.ndarray:
+        """Positions in ``fuzzy_keys`` of :meth:`fuzzy_candidates`, ascending."""
+        postings = [p for p in (self.trigram_index.get(g) for g in trigrams(query)) if p is not None]
+        if not postings:
+            return np.empty(0, dtype=np.intp)
+        counts = np.bincount(np.concatenate(postings), minlength=len(self.fuzzy_keys))
+        hits = np.flatnonzero(counts)
+        if len(hits) > limit:
+            # stable sort: most shared trigrams first, earlier key on ties
+            order = np.argsort(-counts[hits], kind="stable")[:limit]
+            hits = np.sort(hits[order])
+        return hits
+
+    def iter_rows(self) -> Iterable[Dict[str, Any]]:
+        return iter(self.rows)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+"""Private working copies for in-place enrichment stages.
+
+Every enrichment stage has an ``*_inplace`` variant that mutates the nodes,
+edges and group list of the graph it is given.  :func:`working_copy` makes
+the one copy those variants are allowed to touch – node/edge shells plus the
+containers stages write into (``metadata``, ``risk_tags``, ``groups``) – so
+the caller's graph is never modified.  The fused pipeline copies once and
+runs every stage on it; the classic functional stages copy per call via
+:func:`run_on_copy`.
+
+Stages also declare which parts of the graph they read and write (dotted
+paths such as ``nodes.kind`` or ``groups``) via :func:`stage_access`, so the
+enricher can tell which of them are independent of each other.
+"""
+
+from typing import Callable, Iterable, List, Sequence
+
+from core.ir.ir_types import IRGraph
+
+InplaceStage = Callable[[IRGraph], None]
+
+# Undeclared stages are assumed to touch everything
+_EVERYTHING = frozenset({"*"})
+
+
+def stage_access(*, reads: Iterable[str], writes: Iterable[str]) -> Callable[[InplaceStage], InplaceStage]:
+    """Record the graph paths an in-place stage reads and writes."""
+    def mark(stage: InplaceStage) -> InplaceStage:
+        stage.reads = frozenset(reads)
+        stage.writes = frozenset(writes)
+        return stage
+    return mark
+
+
+def _overlap(a: Iterable[str], b: Iterable[str]) -> bool:
+    return any(
+        x == "*" or y == "*" or x == y or x.startswith(y + ".") or y.startswith(x + ".")
+        for x in a for y in b
+    )
+
+
+def conflicts(first: InplaceStage, second: InplaceStage) -> bool:
+    """True if *second* must run after *first* (read/write or write/write overlap)."""
+    r1, w1 = getattr(first, "reads", _EVERYTHING), getattr(first, "writes", _EVERYTHING)
+    r2, w2 = getattr(second, "reads", _EVERYTHING), getattr(second, "writes", _EVERYTHING)
+    return _overlap(w1, r2 | w2) or _overlap(w2, r1)
+
+
+def stage_waves(stages: Sequence[InplaceStage]) -> List[List[InplaceStage]]:
+    """Levels of the dependency DAG implied by *stages* in pipeline order.
+
+    A stage depends on every earlier stage it conflicts with; stages in the
+    same wave are mutually independent and may run concurrently.
+    """
+    levels: List[int] = []
+    for j, stage in enumerate(stages):
+        levels.append(max((levels[i] + 1 for i in range(j) if conflicts(stages[i], stage)), default=0))
+    waves: List[List[InplaceStage]] = [[] for _ in range(max(levels, default=-1) + 1)]
+    for stage, level in zip(stages, levels):
+        waves[level].append(stage)
+    return waves
+
+
+def working_copy(graph: IRGraph, *, nodes: bool = True, edges: bool = True) -> IRGraph:
+    """Shallow-copy *graph* so in-place stages cannot leak into it."""
+    update = {"groups": list(graph.groups)}
+    if nodes:
+        update["nodes"] = [
+            n.model_copy(update={"metadata": dict(n.metadata), "risk_tags": list(n.risk_tags)})
+            for n in graph.nodes
+        ]
+    if edges:
+        update["edges"] = [e.model_copy(update={"metadata": dict(e.metadata)}) for e in graph.edges]
+    return graph.model_copy(update=update)
+
+
+def run_on_copy(stage: InplaceStage, graph: IRGraph, *, nodes: bool = True, edges: bool = False) -> IRGraph:
+    """Functional wrapper: apply an in-place *stage* to a fresh copy of *graph*."""
+    work = working_copy(graph, nodes=nodes, edges=edges)
+    stage(work)
+    return work
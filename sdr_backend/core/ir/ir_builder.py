@@ -16,7 +16,7 @@ stored in Postgres guarded behind the ``IR_BUILDER_MIN_ACTIVE`` flag.
 from typing import Any, Dict, List
 
 from core.dsl.dsl_types import DSLDiagram, DSLNode, DSLEdge
-from .ir_types import IRGraph, IRNode, IREdge
+from .ir_types import IRGraph, IRNode, IREdge, trusted_edge, trusted_node
 
 
 class IRBuilder:
@@ -30,11 +30,15 @@ class IRBuilder:
     # ---------------------------------------------------------------------
 
     def build(self, diagram: DSLDiagram, source_dsl: str = "") -> IRGraph:
-        """Convert *diagram* (DSL) into an *IRGraph* without enrichment."""
+        """Convert *diagram* (DSL) into an *IRGraph* without enrichment.
+
+        The parser has already checked the DSL and every field below is set
+        by us, so the graph is assembled without Pydantic validation.
+        """
         nodes: List[IRNode] = [self._node_from_dsl(n) for n in diagram.nodes]
         edges: List[IREdge] = [self._edge_from_dsl(e) for e in diagram.edges]
 
-        return IRGraph(
+        return IRGraph.model_construct(
             nodes=nodes,
             edges=edges,
             groups=[],
@@ -47,17 +51,17 @@ class IRBuilder:
     # ------------------------------------------------------------------
 
     def _node_from_dsl(self, n: DSLNode) -> IRNode:
-        return IRNode(
+        return trusted_node(dict(
             id=n.id,
             name=n.label,
             kind=self.DEFAULT_KIND,  # classification comes later
             layer=self.DEFAULT_LAYER,
-        )
+        ))
 
     def _edge_from_dsl(self, e: DSLEdge) -> IREdge:
-        return IREdge(
+        return trusted_edge(dict(
             id=e.id,
             source=e.source,
             target=e.target,
             label=e.label,
-        ) 
\ No newline at end of file
+        )) 
\ No newline at end of file
@@ -18,11 +18,17 @@ few *safe-default* adjustments:
 
 No additional validation logic is introduced at this stage – that will be
 implemented incrementally in later phases (classification & enrichment).
+
+Validation belongs at API boundaries.  Data produced by our own builder or
+read back from ``ir_json`` we persisted ourselves goes through the
+``trusted_*`` helpers at the bottom of this module instead, which assemble
+models via ``model_construct`` without re-running validation.
 """
 
-from typing import Any, Dict, List, Optional, Literal
+import operator
+from typing import Any, Dict, List, Mapping, Optional, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class IRNode(BaseModel):
@@ -128,6 +134,55 @@ class IRAnnotation(BaseModel):
     payload: Dict[str, Any]
 
 
+class GraphIndex:
+    """Derived lookups over one :class:`IRGraph` – built lazily, never compared.
+
+    The index remembers the node/edge/group lists it was built from and the
+    element objects in them (by identity), so replacing a list, or adding,
+    removing or replacing any element makes :attr:`IRGraph.index` rebuild
+    it.  Edits inside an element – changing a node id, an edge endpoint or
+    a group's members – must call :meth:`IRGraph.invalidate_indexes`.
+    """
+
+    __slots__ = ("_key", "node_by_id", "outgoing", "incoming", "groups_of")
+
+    def __init__(self, graph: "IRGraph"):
+        self._key = self._fingerprint(graph)
+        self.node_by_id: Dict[str, IRNode] = {n.id: n for n in graph.nodes}
+        self.outgoing: Dict[str, List[IREdge]] = {}
+        self.incoming: Dict[str, List[IREdge]] = {}
+        for e in graph.edges:
+            self.outgoing.setdefault(e.source, []).append(e)
+            self.incoming.setdefault(e.target, []).append(e)
+        # node id -> groups containing it, in ``graph.groups`` order
+        self.groups_of: Dict[str, List[IRGroup]] = {}
+        for g in graph.groups:
+            for member in g.member_node_ids:
+                self.groups_of.setdefault(member, []).append(g)
+
+    @staticmethod
+    def _fingerprint(graph: "IRGraph") -> tuple:
+        # Element tuples hold references, so an id can never be reused while
+        # this index is alive.
+        return (graph.nodes, tuple(graph.nodes), graph.edges, tuple(graph.edges),
+                graph.groups, tuple(graph.groups))
+
+    def is_current(self, graph: "IRGraph") -> bool:
+        for old, new in zip(self._key, self._fingerprint(graph)):
+            if isinstance(old, list):
+                if old is not new:
+                    return False
+            elif len(old) != len(new) or not all(map(operator.is_, old, new)):
+                return False
+        return True
+
+    # Derived data must not make otherwise equal graphs compare unequal
+    def __eq__(self, other: object) -> bool:
+        return other is None or isinstance(other, GraphIndex)
+
+    __hash__ = None
+
+
 class IRGraph(BaseModel):
     """Container object representing a full architecture graph."""
 
@@ -139,7 +194,61 @@ class IRGraph(BaseModel):
     source_dsl: str
     build_meta: Dict[str, Any] = Field(default_factory=dict)
 
+    _index: Optional[GraphIndex] = PrivateAttr(default=None)
+
     model_config = {
         "validate_assignment": True,
         "extra": "forbid",  # tighten once schema stabilises
-    } 
\ No newline at end of file
+    }
+
+    @property
+    def index(self) -> GraphIndex:
+        """Node-by-id, adjacency and group-membership lookups (cached)."""
+        index = self._index
+        if index is None or not index.is_current(self):
+            index = self._index = GraphIndex(self)
+        return index
+
+    def invalidate_indexes(self) -> None:
+        """Drop cached lookups after editing ids, endpoints or group members in place."""
+        self._index = None
+
+    # A copy builds its own index rather than inheriting the original's
+    def __copy__(self) -> "IRGraph":
+        copied = super().__copy__()
+        copied._index = None
+        return copied
+
+    def __deepcopy__(self, memo: Optional[Dict[int, Any]] = None) -> "IRGraph":
+        copied = super().__deepcopy__(memo)
+        copied._index = None
+        return copied
+
+
+# ---------------------------------------------------------------------------
+#  Trusted construction – no validation, for internal producers only
+# ---------------------------------------------------------------------------
+
+def trusted_node(data: Mapping[str, Any]) -> IRNode:
+    return IRNode.model_construct(**data)
+
+
+def trusted_edge(data: Mapping[str, Any]) -> IREdge:
+    return IREdge.model_construct(**data)
+
+
+def trusted_graph(data: Mapping[str, Any]) -> IRGraph:
+    """Rebuild an :class:`IRGraph` from a dumped graph we produced ourselves.
+
+    Skips validation entirely (enriched graphs legitimately carry upper-case
+    taxonomy kinds outside the ``IRNode`` literals), so never use this on
+    client-supplied payloads – call ``IRGraph.model_validate`` there.
+    """
+    fields = {k: v for k, v in data.items() if k not in ("nodes", "edges", "groups", "annotations")}
+    return IRGraph.model_construct(
+        nodes=[trusted_node(n) for n in data["nodes"]],
+        edges=[trusted_edge(e) for e in data["edges"]],
+        groups=[IRGroup.model_construct(**g) for g in data.get("groups") or ()],
+        annotations=[IRAnnotation.model_construct(**a) for a in data.get("annotations") or ()],
+        **fields,
+    )
@@ -12,8 +12,8 @@ Time-complexity O(nodes+edges); ~4 ms for 500-node graphs in local profiling.
 """
 from __future__ import annotations
 
-from collections import defaultdict, deque
-from typing import Dict, List, Optional, Any
+from collections import deque
+from typing import Dict, Optional, Any
 
 from core.ir.ir_types import IRGraph
 
@@ -138,22 +138,15 @@ def get_refined_layer_index(node_kind: str, node_name: str, metadata: Dict[str,
 def add_layer_hints(ir: IRGraph) -> IRGraph:  # noqa: D401 – short imperative name
     """Mutate *ir* in-place; write integer ``layerIndex`` to every node.metadata."""
 
-    # Build adjacency list (successors) for BFS.
-    succ: Dict[str, List[str]] = defaultdict(list)
-    for e in ir.edges:
-        succ[e.source].append(e.target)
-
-    # In-degree map to detect roots (nodes with no incoming edges).
-    indeg: Dict[str, int] = defaultdict(int)
-    for e in ir.edges:
-        indeg[e.target] += 1
+    # Successors / in-degree straight from the graph's cached adjacency index
+    index = ir.index
 
     # Find root nodes - prefer clients and edge nodes as roots
     edge_roots = []
     other_roots = []
     
     for n in ir.nodes:
-        if indeg[n.id] == 0:
+        if not index.incoming.get(n.id):
             if n.kind == "Client" or "client" in n.name.lower() or "user" in n.name.lower():
                 edge_roots.append(n.id)
             else:
@@ -172,7 +165,8 @@ def add_layer_hints(ir: IRGraph) -> IRGraph:  # noqa: D401 – short imperative
     while q and len(depth) < MAX_FANOUT:
         node_id = q.popleft()
         base_depth = depth[node_id]
-        for nxt in succ[node_id]:
+        for e in index.outgoing.get(node_id, ()):
+            nxt = e.target
             if nxt not in depth:
                 depth[nxt] = base_depth + 1
                 q.append(nxt)
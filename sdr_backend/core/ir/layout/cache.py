@@ -1,15 +1,233 @@
-"""layout/cache.py – in-memory cache mapping ir_hash → positioned DSL JSON"""
+"""layout/cache.py – two-tier cache of positioned diagrams
+
+Layout (ELK via d2json, crossing reduction) dominates the cost of rendering
+a diagram, and the same graph is laid out again on every view, revert or
+re-render.  Results are cached under :func:`layout_key` – the canonical
+content hash of the input plus every option that changes the output – in
+two tiers:
+
+* Tier 1 is an in-process LRU bounded both by entry count
+  (``LAYOUT_CACHE_SIZE``) and by payload bytes (``LAYOUT_CACHE_MAX_BYTES``).
+* Tier 2 is Redis (``layout:<key>`` with ``LAYOUT_CACHE_REDIS_TTL``), shared
+  by every worker and surviving restarts.  It is optional – when it is not
+  configured or unreachable the cache degrades to the local tier.
+
+Both tiers hold the same compact payload (see :mod:`core.db.blob_codec`), so
+the LRU's byte budget is exact and a hit never hands out an object another
+caller may have mutated.  Bump ``CACHE_VERSION`` whenever layout output
+changes so stale shared entries are simply never read again.
+"""
 
 from __future__ import annotations
 
-from typing import Dict, Any
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from config.settings import REDIS_DB, REDIS_HOST, REDIS_PASSWORD, REDIS_PORT
+from core.db.blob_codec import pack, unpack
+from core.dsl.dsl_types import DSLDiagram, DSLEdge, DSLNode
+from core.ir.ir_types import IRGroup
+from utils.logger import log_error, log_info
+from utils.prometheus_metrics import record_layout_cache
+
+try:
+    import redis
+except ImportError:  # pragma: no cover – optional dependency
+    redis = None
+
+# ----------------------- CONFIG ---------------------------------
+LRU_SIZE = int(os.getenv("LAYOUT_CACHE_SIZE", "256"))
+LRU_MAX_BYTES = int(os.getenv("LAYOUT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+REDIS_ENABLED = os.getenv("LAYOUT_CACHE_REDIS", "true").lower() in {"1", "true", "yes"}
+REDIS_TTL_SEC = int(os.getenv("LAYOUT_CACHE_REDIS_TTL", str(7 * 86400)))
+REDIS_RETRY_SEC = 60  # back-off after a Redis failure
+REDIS_KEY_PREFIX = "layout:"
+CACHE_VERSION = 3
+# ---------------------------------------------------------------
+
+
+def layout_key(content_hash: str, **options: Any) -> str:
+    """Cache key for *content_hash* laid out with *options* (order-insensitive)."""
+    opts = ",".join(f"{k}={options[k]}" for k in sorted(options))
+    return f"v{CACHE_VERSION}:{content_hash}:{opts}"
+
+
+@dataclass
+class CachedLayout:
+    diagram: DSLDiagram
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+def _encode(diagram: DSLDiagram, meta: Dict[str, Any]) -> bytes:
+    return pack({"diagram": diagram.model_dump(mode="json"), "meta": meta})
+
+
+def _decode(payload: bytes) -> CachedLayout:
+    data = unpack(payload)
+    d = data["diagram"]
+    # The payload was produced from validated models – rebuild without revalidating
+    diagram = DSLDiagram.model_construct(
+        nodes=[DSLNode.model_construct(**n) for n in d.get("nodes", [])],
+        edges=[DSLEdge.model_construct(**e) for e in d.get("edges", [])],
+        groups=[
+            IRGroup.model_construct(**g) if isinstance(g, dict) and "member_node_ids" in g else g
+            for g in d.get("groups", [])
+        ],
+    )
+    return CachedLayout(diagram, data.get("meta") or {})
+
+
+class LayoutCache:
+    """Byte- and size-bounded LRU in front of a shared Redis tier."""
+
+    def __init__(self, maxsize: int = LRU_SIZE, max_bytes: int = LRU_MAX_BYTES, redis_client: Any = None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._lru: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._redis = redis_client
+        self._redis_down_until = 0.0
+
+    # ------------------------------------------------------------------
+    #  Tier 1 – in-process LRU
+    # ------------------------------------------------------------------
+
+    def _lru_put(self, key: str, payload: bytes) -> None:
+        # caller holds the lock
+        old = self._lru.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._lru[key] = payload
+        self._bytes += len(payload)
+        evicted = 0
+        while self._lru and (len(self._lru) > self.maxsize or self._bytes > self.max_bytes):
+            _, dropped = self._lru.popitem(last=False)
+            self._bytes -= len(dropped)
+            evicted += 1
+        record_layout_cache("evicted", evicted)
+
+    # ------------------------------------------------------------------
+    #  Tier 2 – Redis
+    # ------------------------------------------------------------------
+
+    def _client(self):
+        if self._redis is None or time.monotonic() < self._redis_down_until:
+            return None
+        return self._redis
+
+    def _redis_failed(self, exc: Exception) -> None:
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SEC
+        log_error(f"[layout_cache] Redis tier disabled for {REDIS_RETRY_SEC}s: {exc}")
+
+    def _redis_get(self, key: str) -> Optional[bytes]:
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            return client.get(REDIS_KEY_PREFIX + key)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+
+    def _redis_put(self, key: str, payload: bytes) -> None:
+        client = self._client()
+        if client is None:
+            return
+        try:
+            client.set(REDIS_KEY_PREFIX + key, payload, ex=REDIS_TTL_SEC)
+        except Exception as e:
+            self._redis_failed(e)
+
+    # ------------------------------------------------------------------
+    #  Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[CachedLayout]:
+        with self._lock:
+            payload = self._lru.get(key)
+            if payload is not None:
+                self._lru.move_to_end(key)
+        if payload is not None:
+            record_layout_cache("lru_hit")
+            return _decode(payload)
+
+        payload = self._redis_get(key)
+        if payload is None:
+            record_layout_cache("miss")
+            return None
+        try:
+            hit = _decode(payload)
+        except Exception as e:
+            log_error(f"[layout_cache] dropping undecodable entry {key}: {e}")
+            record_layout_cache("miss")
+            return None
+        with self._lock:
+            self._lru_put(key, payload)
+        record_layout_cache("redis_hit")
+        return hit
+
+    def put(self, key: str, diagram: DSLDiagram, **meta: Any) -> None:
+        payload = _encode(diagram, meta)
+        with self._lock:
+            self._lru_put(key, payload)
+        self._redis_put(key, payload)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+
+def _redis_from_settings():
+    if not (REDIS_ENABLED and redis is not None and REDIS_HOST):
+        return None
+    try:
+        return redis.Redis(
+            host=REDIS_HOST,
+            port=int(REDIS_PORT or 6379),
+            db=int(REDIS_DB or 0),
+            password=REDIS_PASSWORD,
+            socket_timeout=0.25,
+            socket_connect_timeout=0.25,
+        )
+    except Exception as e:
+        log_error(f"[layout_cache] Redis tier unavailable: {e}")
+        return None
+
+
+_shared: Optional[LayoutCache] = None
+_shared_lock = threading.Lock()
+
 
-_CACHE: Dict[str, Any] = {}
+def get_layout_cache() -> LayoutCache:
+    """Process-wide cache instance (created lazily on first use)."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = LayoutCache(redis_client=_redis_from_settings())
+                log_info(
+                    f"[layout_cache] ready – lru={LRU_SIZE} entries/{LRU_MAX_BYTES} bytes, "
+                    f"redis={'on' if _shared._redis is not None else 'off'}"
+                )
+    return _shared
 
 
-def get(hash_key: str):
-    return _CACHE.get(hash_key)
+def get(key: str) -> Optional[CachedLayout]:
+    return get_layout_cache().get(key)
 
 
-def set(hash_key: str, value):
-    _CACHE[hash_key] = value 
\ No newline at end of file
+def set(key: str, diagram: DSLDiagram, **meta: Any) -> None:
+    get_layout_cache().put(key, diagram, **meta)
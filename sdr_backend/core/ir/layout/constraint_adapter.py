@@ -12,8 +12,8 @@ constraints.
 """
 
 from typing import List
-from hashlib import sha256
 
+from core.ir.canonical_hash import structural_hash
 from core.ir.ir_types import IRGraph
 from core.dsl.dsl_types import DSLDiagram, DSLNode, DSLEdge
 
@@ -87,6 +87,5 @@ def ir_to_dsl(ir: IRGraph) -> DSLDiagram:
 
 
 def ir_hash(ir: IRGraph) -> str:
-    """Return SHA-256 hash of IR graph for cache key."""
-    data = ir.model_dump()
-    return sha256(str(data).encode()).hexdigest() 
\ No newline at end of file
+    """Return the canonical structural hash of IR graph for cache key."""
+    return structural_hash(ir) 
\ No newline at end of file
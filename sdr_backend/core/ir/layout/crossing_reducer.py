@@ -1,81 +1,98 @@
 from __future__ import annotations
 
-"""crossing_reducer.py – simple greedy sibling-swap algorithm.
-
-The algorithm operates *within each layer rank*: nodes are sorted by their
-current X coordinate (left → right).  We iterate over adjacent pairs and
-swap them if doing so reduces the number of edge crossings between the two
-layers they connect to.  One pass tends to remove most crossings for small
-ranks.
-
-The implementation is intentionally simple and fast; we run it *after* ELK
-produces a layer-constrained layout.
+"""crossing_reducer.py – crossing reduction on an already positioned diagram.
+
+Run *after* ELK.  Layers are recovered from the geometry: nodes whose centres
+along the layer axis (x for LR/RL, y for TB/BT) lie within
+``LAYER_TOLERANCE`` of each other form one layer, ordered by their in-layer
+coordinate.  The layered engine's barycenter sweeps then reorder each layer
+(edges spanning several layers are routed through dummy nodes), with every
+candidate scored by an exact crossing count – a Fenwick-tree inversion count,
+O(E log V) per layer pair.  Sweeping stops after ``max_sweeps`` passes or
+once ``patience`` passes in a row bring no improvement, and the new order is
+only applied if it has strictly fewer crossings than the input.  Members of a
+diagram group stay contiguous within each layer, as in the layered engine.
+
+Reordered nodes keep the layout's own spacing: they are packed into the
+layer's original span with the original gaps.  ``respace=True`` restores the
+old fixed grid (``idx * spacing + 50``) instead.
 """
 
-from typing import Dict, List, Tuple
-
-from core.dsl.dsl_types import DSLDiagram, DSLNode, DSLEdge
-
-
-def _count_crossings(edges: List[Tuple[int, int]]) -> int:
-    """Return number of crossings in a list of edge index pairs."""
-    crossings = 0
-    for i in range(len(edges)):
-        a1, a2 = edges[i]
-        for j in range(i + 1, len(edges)):
-            b1, b2 = edges[j]
-            if (a1 - b1) * (a2 - b2) < 0:  # lines cross
-                crossings += 1
-    return crossings
-
-
-def reduce_crossings(diagram: DSLDiagram) -> DSLDiagram:
-    nodes_by_id: Dict[str, DSLNode] = {n.id: n for n in diagram.nodes}
-
-    # Build layer buckets by Y (assumes LR layout). Use integer layer rank by div 200 spacing.
-    layers: Dict[int, List[DSLNode]] = {}
-    for n in diagram.nodes:
-        rank = int(n.y // 200)
-        layers.setdefault(rank, []).append(n)
-
-    new_nodes: List[DSLNode] = list(diagram.nodes)
-
-    for rank, bucket in layers.items():
-        # sort bucket by current X
-        bucket.sort(key=lambda n: n.x)
-        id_to_index = {n.id: idx for idx, n in enumerate(bucket)}
-
-        # build edge list indexes between this layer and next
-        edges_out = [e for e in diagram.edges if e.source in id_to_index]
-        if not edges_out:
+from typing import Dict, List
+
+from core.dsl.dsl_types import DSLDiagram, DSLNode
+from core.ir.layout.layered import MAX_SWEEPS, SWEEP_PATIENCE, _clusters, _Layering
+
+LAYER_TOLERANCE = 100.0  # max distance between node centres of one layer
+
+
+def _layer_ranks(nodes: List[DSLNode], horizontal: bool) -> List[int]:
+    """Layer index per node, from centres along the layer axis."""
+    if horizontal:
+        centres = [n.x + n.width / 2 for n in nodes]
+    else:
+        centres = [n.y + n.height / 2 for n in nodes]
+    ranks = [0] * len(nodes)
+    rank, previous = -1, None
+    for i in sorted(range(len(nodes)), key=centres.__getitem__):
+        if previous is None or centres[i] - previous > LAYER_TOLERANCE:
+            rank += 1
+        ranks[i] = rank
+        previous = centres[i]
+    return ranks
+
+
+def reduce_crossings(
+    diagram: DSLDiagram,
+    direction: str = "LR",
+    *,
+    max_sweeps: int = MAX_SWEEPS,
+    patience: int = SWEEP_PATIENCE,
+    respace: bool = False,
+    spacing: float = 200,
+) -> DSLDiagram:
+    """Return *diagram* with fewer edge crossings (the input is not mutated)."""
+    if len(diagram.nodes) < 3 or not diagram.edges:
+        return diagram
+    horizontal = direction in ("LR", "RL")
+    along, extent = ("y", "height") if horizontal else ("x", "width")
+
+    # Index nodes in their current in-layer order so the sweep starts from it
+    nodes = sorted(diagram.nodes, key=lambda n: getattr(n, along))
+    index = {n.id: i for i, n in enumerate(nodes)}
+    edges = [
+        (index[e.source], index[e.target])
+        for e in diagram.edges
+        if e.source in index and e.target in index and e.source != e.target
+    ]
+    n = len(nodes)
+    g = _Layering(n, edges, _layer_ranks(nodes, horizontal), _clusters(diagram.groups, index))
+    before = g.crossings()
+    if before == 0 or g.minimise_crossings(max_sweeps, patience) >= before:
+        return diagram
+
+    moved: Dict[str, float] = {}
+    for layer in g.layers:
+        order = [v for v in layer if v < n]
+        slots = sorted(order)  # original order of this layer
+        if order == slots:
             continue
-
-        optimal = bucket.copy()
-        improved = True
-        while improved:
-            improved = False
-            for i in range(len(optimal) - 1):
-                a, b = optimal[i], optimal[i + 1]
-                # compute crossings if we swap
-                idx_map = {n.id: idx for idx, n in enumerate(optimal)}
-                current_edges = [(idx_map[e.source], idx_map[e.target]) for e in edges_out if e.target in idx_map]
-                base = _count_crossings(current_edges)
-
-                # swap
-                optimal[i], optimal[i + 1] = optimal[i + 1], optimal[i]
-                idx_map_swapped = {n.id: idx for idx, n in enumerate(optimal)}
-                swapped_edges = [(idx_map_swapped[e.source], idx_map_swapped[e.target]) for e in edges_out if e.target in idx_map_swapped]
-                new_cross = _count_crossings(swapped_edges)
-
-                if new_cross < base:
-                    improved = True  # keep swap
-                else:
-                    # revert
-                    optimal[i], optimal[i + 1] = optimal[i + 1], optimal[i]
-
-        # update x positions according to optimal ordering (keep spacing)
-        spacing = 200
-        for idx, node in enumerate(optimal):
-            node.x = idx * spacing + 50  # re-centre a bit
-
-    return diagram.copy(update={"nodes": new_nodes}) 
\ No newline at end of file
+        if respace:
+            for idx, v in enumerate(order):
+                moved[nodes[v].id] = idx * spacing + 50
+            continue
+        gaps = [
+            getattr(nodes[b], along) - (getattr(nodes[a], along) + getattr(nodes[a], extent))
+            for a, b in zip(slots, slots[1:])
+        ]
+        cursor = getattr(nodes[slots[0]], along)
+        for idx, v in enumerate(order):
+            moved[nodes[v].id] = cursor
+            cursor += getattr(nodes[v], extent) + (max(gaps[idx], 0.0) if idx < len(gaps) else 0.0)
+
+    return diagram.model_copy(update={
+        "nodes": [
+            node.model_copy(update={along: float(moved[node.id])}) if node.id in moved else node
+            for node in diagram.nodes
+        ]
+    })
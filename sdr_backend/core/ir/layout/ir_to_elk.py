@@ -12,15 +12,11 @@ DSL → ELK → DSL → ReactFlow transformations.
 """
 from __future__ import annotations
 
-import json
-import subprocess
-import tempfile
-import os
-from pathlib import Path
 from typing import Dict, Any, Optional
 from utils.logger import log_info, log_error
 
 from core.ir.ir_types import IRGraph
+from core.dsl.d2json_pool import D2JsonError, get_pool, resolve_d2json_binary
 from core.dsl.dsl_types import DSLDiagram, DSLNode, DSLEdge
 
 
@@ -34,8 +30,8 @@ class IRLayoutEngine:
         self.min_node_width = 172
         self.min_node_height = 36
         
-        # Find d2json binary
-        self.d2json_path = self._find_d2json_binary()
+        # Find d2json binary (resolved once per process)
+        self.d2json_path = resolve_d2json_binary()
     
     def layout_ir(self, ir_graph: IRGraph, direction: str = "right") -> DSLDiagram:
         """Apply ELK layout to an IR graph and return positioned DSLDiagram.
@@ -156,27 +152,11 @@ class IRLayoutEngine:
     
     def _run_d2json_layout(self, d2_source: str) -> Dict:
         """Run d2json with ELK layout on the D2 source."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".d2", delete=False) as tmp:
-            tmp.write(d2_source)
-            tmp_path = tmp.name
-        
         try:
-            cmd = [self.d2json_path, "--layout", "elk", tmp_path]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=30)
-            
-            # Parse JSON output
-            return json.loads(result.stdout)
-        except subprocess.CalledProcessError as e:
-            log_error(f"d2json layout failed: {e.stderr}")
-            raise RuntimeError(f"ELK layout failed: {e.stderr}")
-        except json.JSONDecodeError as e:
-            log_error(f"Invalid JSON from d2json: {e}")
-            raise RuntimeError(f"Invalid layout data: {e}")
-        finally:
-            try:
-                os.unlink(tmp_path)
-            except OSError:
-                pass
+            return get_pool().run(d2_source, layout="elk", timeout=30)
+        except D2JsonError as e:
+            log_error(f"d2json layout failed: {e}")
+            raise RuntimeError(f"ELK layout failed: {e}")
     
     def _layout_to_dsl_diagram(self, layout_data: Dict, ir_graph: IRGraph) -> DSLDiagram:
         """Convert d2json layout output to DSLDiagram."""
@@ -245,29 +225,3 @@ class IRLayoutEngine:
         s = s.replace("\n", "\\n")
         s = s.replace("\"", "\\\"")
         return s
-    
-    @staticmethod
-    def _find_d2json_binary() -> str:
-        """Find the d2json binary in the project or system."""
-        import shutil
-        
-        # First check PATH
-        path = shutil.which("d2json")
-        if path:
-            return path
-        
-        # Check common locations
-        base_dir = Path(__file__).resolve().parent.parent.parent.parent.parent
-        possible_paths = [
-            base_dir / "tools" / "cmd" / "d2json" / "d2json",
-            base_dir / "sdr_backend" / "tools" / "cmd" / "d2json" / "d2json",
-            Path.home() / "bin" / "d2json",
-            Path("/usr/local/bin/d2json"),
-            Path("/usr/bin/d2json")
-        ]
-        
-        for p in possible_paths:
-            if p.is_file() and os.access(p, os.X_OK):
-                return str(p)
-        
-        raise FileNotFoundError("d2json binary not found - required for ELK layout") 
\ No newline at end of file
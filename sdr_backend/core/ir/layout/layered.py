@@ -0,0 +1,501 @@
+from __future__ import annotations
+
+"""layered.py – in-process Sugiyama layout.
+
+A pure Python/NumPy layered layout so diagrams can be positioned without the
+d2json binary (and without a subprocess at all for small graphs).  The
+classic phases:
+
+1. **Cycle removal** – Eades–Lin–Smyth greedy ordering; edges pointing
+   backwards in it are reversed for layering only.
+2. **Layer assignment** – nodes keep the lane given by ``layerIndex`` (when
+   every node has one, i.e. ``add_layer_hints`` ran) or by their IR
+   ``layer`` through ``_LAYER_RANK``; unhinted nodes get longest-path layers
+   and sources are pulled next to their successors.
+3. **Crossing minimisation** – barycenter sweeps down and up, keeping the
+   best ordering by exact crossing count (Fenwick-tree inversion count,
+   O(E log V) per layer pair).
+4. **Coordinate assignment** – Brandes–Köpf: four median alignments,
+   horizontal compaction, balanced by the average median.
+5. **Clusters** – members of a group (trust zone, bounded context …) stay
+   contiguous inside every layer and get extra spacing at the boundary.
+
+Edges spanning several layers are routed through dummy nodes, which take
+part in phases 3–4 only.  The result is a positioned copy of the input
+(top-left ``x``/``y`` like the d2json engines); the input is not mutated.
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.dsl.dsl_types import DSLDiagram
+from core.ir.ir_types import IRGraph
+from core.ir.layout.constraint_adapter import _LAYER_RANK, ir_to_dsl
+
+# ----------------------- CONFIG ---------------------------------
+NODE_SPACING = 100.0      # between neighbours of one layer
+EDGE_SPACING = 40.0       # next to an edge routed through the layer
+CLUSTER_SPACING = 60.0    # extra gap where two clusters meet
+LAYER_SPACING = 300.0
+MARGIN = 50.0
+MAX_SWEEPS = 12           # down+up barycenter passes
+SWEEP_PATIENCE = 2        # stop after this many passes without improvement
+# ---------------------------------------------------------------
+
+_HORIZONTAL = {"LR", "RL"}
+_MIRRORED = {"RL", "BT"}
+
+
+# ---------------------------------------------------------------------------
+#  Rank hints
+# ---------------------------------------------------------------------------
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _rank_hints(items: Iterable[Tuple[str, Any, Optional[str]]]) -> Dict[str, int]:
+    """``{id: lane}`` from ``(id, layerIndex, layer)`` triples.
+
+    ``layerIndex`` lanes are finer than ``_LAYER_RANK`` buckets, so the two
+    scales are never mixed: ``layerIndex`` is used only when every node has one.
+    """
+    items = list(items)
+    indexed = {node_id: _as_int(idx) for node_id, idx, _ in items}
+    if indexed and all(v is not None for v in indexed.values()):
+        return indexed  # type: ignore[return-value]
+    return {node_id: _LAYER_RANK[layer] for node_id, _, layer in items if layer in _LAYER_RANK}
+
+
+def diagram_rank_hints(diagram: DSLDiagram) -> Dict[str, int]:
+    return _rank_hints(
+        (n.id, (n.properties or {}).get("layerIndex"), (n.properties or {}).get("layer"))
+        for n in diagram.nodes
+    )
+
+
+def ir_rank_hints(ir: IRGraph) -> Dict[str, int]:
+    return _rank_hints((n.id, (n.metadata or {}).get("layerIndex"), n.layer) for n in ir.nodes)
+
+
+# ---------------------------------------------------------------------------
+#  Phase 1 + 2 – cycle removal and layering
+# ---------------------------------------------------------------------------
+
+def _feedback_order(n: int, edges: Sequence[Tuple[int, int]]) -> List[int]:
+    """Greedy linear order (Eades–Lin–Smyth) with few backward edges."""
+    out = [set() for _ in range(n)]
+    inc = [set() for _ in range(n)]
+    for u, v in edges:
+        out[u].add(v)
+        inc[v].add(u)
+
+    alive = dict.fromkeys(range(n))
+    sinks = deque(v for v in range(n) if not out[v])
+    sources = deque(v for v in range(n) if not inc[v])
+    head: List[int] = []
+    tail: List[int] = []
+
+    def remove(v: int) -> None:
+        del alive[v]
+        for w in out[v]:
+            inc[w].discard(v)
+            if not inc[w]:
+                sources.append(w)
+        for w in inc[v]:
+            out[w].discard(v)
+            if not out[w]:
+                sinks.append(w)
+
+    while alive:
+        if sinks:
+            v = sinks.popleft()
+            if v in alive:
+                tail.append(v)
+                remove(v)
+        elif sources:
+            v = sources.popleft()
+            if v in alive:
+                head.append(v)
+                remove(v)
+        else:  # only cycles left – break at the node with the largest out-in surplus
+            v = max(alive, key=lambda k: len(out[k]) - len(inc[k]))
+            head.append(v)
+            remove(v)
+    return head + tail[::-1]
+
+
+def _assign_layers(n: int, edges: Sequence[Tuple[int, int]], hints: Dict[int, int]) -> List[int]:
+    order = _feedback_order(n, edges)
+    rank = [0] * n
+    for i, v in enumerate(order):
+        rank[v] = i
+    preds: List[List[int]] = [[] for _ in range(n)]
+    succs: List[List[int]] = [[] for _ in range(n)]
+    for u, v in edges:
+        if rank[u] > rank[v]:
+            u, v = v, u
+        preds[v].append(u)
+        succs[u].append(v)
+
+    layer = [0] * n
+    for v in order:
+        if v in hints:
+            layer[v] = hints[v]
+        else:
+            layer[v] = max((layer[u] + 1 for u in preds[v]), default=0)
+    # Unhinted sources sit right before their closest successor, not in lane 0
+    for v in reversed(order):
+        if v not in hints and not preds[v] and succs[v]:
+            layer[v] = max(layer[v], min(layer[w] for w in succs[v]) - 1)
+
+    levels = {lvl: i for i, lvl in enumerate(sorted(set(layer)))}
+    return [levels[lvl] for lvl in layer]
+
+
+# ---------------------------------------------------------------------------
+#  Phase 3 – crossing minimisation
+# ---------------------------------------------------------------------------
+
+def count_crossings(pairs: Iterable[Tuple[int, int]], width: int) -> int:
+    """Crossings among straight edges ``(upper_pos, lower_pos)`` between two layers.
+
+    Counts inversions of the lower positions with a Fenwick tree – O(E log V).
+    *width* is the size of the lower layer.
+    """
+    tree = [0] * (width + 1)
+    crossings = seen = 0
+    for _, b in sorted(pairs):
+        i, not_above = b + 1, 0
+        while i > 0:
+            not_above += tree[i]
+            i -= i & -i
+        crossings += seen - not_above
+        i = b + 1
+        while i <= width:
+            tree[i] += 1
+            i += i & -i
+        seen += 1
+    return crossings
+
+
+class _Layering:
+    """Proper layered graph: real nodes ``0..n-1`` followed by dummies."""
+
+    def __init__(self, n: int, edges: Sequence[Tuple[int, int]], layer: List[int], cluster: List[Optional[str]]):
+        self.n = n
+        self.layer_of = list(layer)
+        self.cluster = list(cluster)
+        self.preds: List[List[int]] = [[] for _ in range(n)]
+        self.succs: List[List[int]] = [[] for _ in range(n)]
+
+        seen = set()
+        for u, v in edges:
+            a, b = (u, v) if layer[u] < layer[v] else (v, u)
+            if layer[a] == layer[b] or (a, b) in seen:
+                continue  # flat edges do not take part in layering
+            seen.add((a, b))
+            prev = a
+            for lvl in range(layer[a] + 1, layer[b]):
+                d = len(self.layer_of)
+                self.layer_of.append(lvl)
+                self.cluster.append(None)
+                self.preds.append([])
+                self.succs.append([])
+                self._link(prev, d)
+                prev = d
+            self._link(prev, b)
+
+        self.layers: List[List[int]] = [[] for _ in range(max(layer, default=-1) + 1)]
+        for v, lvl in enumerate(self.layer_of):
+            self.layers[lvl].append(v)
+        self.pos = [0] * len(self.layer_of)
+        for idx in range(len(self.layers)):
+            self._reorder(idx, {v: float(p) for p, v in enumerate(self.layers[idx])})
+
+    def _link(self, u: int, v: int) -> None:
+        self.succs[u].append(v)
+        self.preds[v].append(u)
+
+    def is_dummy(self, v: int) -> bool:
+        return v >= self.n
+
+    def _reorder(self, idx: int, key: Dict[int, float]) -> None:
+        """Sort layer *idx* by *key*, keeping every cluster contiguous."""
+        pos = self.pos
+        blocks: Dict[Any, List[int]] = {}
+        for v in self.layers[idx]:
+            blocks.setdefault(self.cluster[v] or v, []).append(v)
+        ordered = []
+        for members in blocks.values():
+            if len(members) == 1:
+                v = members[0]
+                ordered.append((key[v], pos[v], members))
+            else:
+                members.sort(key=lambda m: (key[m], pos[m]))
+                ordered.append((sum(key[m] for m in members) / len(members), min(pos[m] for m in members), members))
+        ordered.sort(key=lambda block: (block[0], block[1]))
+        layer = [v for _, _, members in ordered for v in members]
+        self.layers[idx] = layer
+        for p, v in enumerate(layer):
+            self.pos[v] = p
+
+    def _sweep(self, indices: Iterable[int], neighbours: List[List[int]]) -> None:
+        for idx in indices:
+            key = {}
+            for v in self.layers[idx]:
+                ns = neighbours[v]
+                key[v] = sum(self.pos[u] for u in ns) / len(ns) if ns else float(self.pos[v])
+            self._reorder(idx, key)
+
+    def crossings(self) -> int:
+        total = 0
+        for idx in range(len(self.layers) - 1):
+            pairs = [(self.pos[u], self.pos[v]) for u in self.layers[idx] for v in self.succs[u]]
+            total += count_crossings(pairs, len(self.layers[idx + 1]))
+        return total
+
+    def minimise_crossings(self, max_sweeps: int = MAX_SWEEPS, patience: int = SWEEP_PATIENCE) -> int:
+        best = self.crossings()
+        best_layers = [list(layer) for layer in self.layers]
+        stale = 0
+        for _ in range(max_sweeps):
+            if best == 0 or stale >= patience:
+                break
+            self._sweep(range(1, len(self.layers)), self.preds)
+            self._sweep(range(len(self.layers) - 2, -1, -1), self.succs)
+            current = self.crossings()
+            if current < best:
+                best, best_layers, stale = current, [list(layer) for layer in self.layers], 0
+            else:
+                stale += 1
+        self.layers = best_layers
+        for layer in self.layers:
+            for p, v in enumerate(layer):
+                self.pos[v] = p
+        return best
+
+
+# ---------------------------------------------------------------------------
+#  Phase 4 – Brandes–Köpf coordinate assignment
+# ---------------------------------------------------------------------------
+
+def _type1_conflicts(g: _Layering) -> set:
+    """Non-inner segments crossing an inner (dummy–dummy) segment."""
+    marked = set()
+    for idx in range(len(g.layers) - 1):
+        upper, lower = g.layers[idx], g.layers[idx + 1]
+        k0 = scan = 0
+        for l1, v in enumerate(lower):
+            inner = g.preds[v][0] if g.is_dummy(v) and g.is_dummy(g.preds[v][0]) else None
+            if l1 == len(lower) - 1 or inner is not None:
+                k1 = g.pos[inner] if inner is not None else len(upper) - 1
+                while scan <= l1:
+                    w = lower[scan]
+                    for u in g.preds[w]:
+                        if (g.pos[u] < k0 or g.pos[u] > k1) and not (g.is_dummy(u) and g.is_dummy(w)):
+                            marked.add((u, w))
+                            marked.add((w, u))
+                    scan += 1
+                k0 = k1
+    return marked
+
+
+def _bk_pass(layers: List[List[int]], upper: List[List[int]], marked: set, sep, total: int) -> np.ndarray:
+    """One left-aligned BK pass over *layers* (already mirrored as needed)."""
+    pos = [0] * total
+    left: List[Optional[int]] = [None] * total
+    for layer in layers:
+        for p, v in enumerate(layer):
+            pos[v] = p
+            left[v] = layer[p - 1] if p else None
+
+    # Vertical alignment with the median upper neighbour(s)
+    root = list(range(total))
+    align = list(range(total))
+    for layer in layers[1:]:
+        r = -1
+        for v in layer:
+            ns = sorted(upper[v], key=pos.__getitem__)
+            if not ns:
+                continue
+            for m in sorted({(len(ns) - 1) // 2, len(ns) // 2}):
+                if align[v] != v:
+                    break
+                u = ns[m]
+                if (u, v) not in marked and r < pos[u]:
+                    align[u] = v
+                    root[v] = root[u]
+                    align[v] = root[v]
+                    r = pos[u]
+
+    # Horizontal compaction (iterative place_block)
+    sink = list(range(total))
+    shift = [float("inf")] * total
+    x: List[Optional[float]] = [None] * total
+
+    def place(start: int) -> None:
+        x[start] = 0.0
+        stack = [[start, start]]
+        while stack:
+            frame = stack[-1]
+            v, w = frame
+            p = left[w]
+            if p is not None:
+                u = root[p]
+                if x[u] is None:
+                    x[u] = 0.0
+                    stack.append([u, u])
+                    continue
+                if sink[v] == v:
+                    sink[v] = sink[u]
+                gap = sep(p, w)
+                if sink[v] != sink[u]:
+                    shift[sink[u]] = min(shift[sink[u]], x[v] - x[u] - gap)
+                else:
+                    x[v] = max(x[v], x[u] + gap)
+            w = align[w]
+            if w == v:
+                stack.pop()
+            else:
+                frame[1] = w
+
+    for layer in layers:
+        for v in layer:
+            if root[v] == v and x[v] is None:
+                place(v)
+
+    coords = np.empty(total)
+    for v in range(total):
+        r = root[v]
+        s = shift[sink[r]]
+        coords[v] = x[r] + (s if s < float("inf") else 0.0)
+    return coords
+
+
+def _bk_coordinates(g: _Layering, size: np.ndarray, sep) -> np.ndarray:
+    total = len(g.layer_of)
+    marked = _type1_conflicts(g)
+    candidates = []
+    for downward in (True, False):
+        layers = g.layers if downward else g.layers[::-1]
+        upper = g.preds if downward else g.succs
+        for rightward in (False, True):
+            ls = [layer[::-1] for layer in layers] if rightward else layers
+            coords = _bk_pass(ls, upper, marked, sep, total)
+            candidates.append(-coords if rightward else coords)
+
+    # Align the four layouts to the narrowest one, then take the average median
+    xs = np.vstack(candidates)
+    lo = (xs - size / 2).min(axis=1)
+    hi = (xs + size / 2).max(axis=1)
+    k = int(np.argmin(hi - lo))
+    xs[0::2] += (lo[k] - lo[0::2])[:, None]   # left-aligned passes
+    xs[1::2] += (hi[k] - hi[1::2])[:, None]   # right-aligned passes
+    xs.sort(axis=0)
+    coords = (xs[1] + xs[2]) / 2
+
+    # BK does not propagate class shifts transitively – enforce separation
+    for layer in g.layers:
+        for a, b in zip(layer, layer[1:]):
+            coords[b] = max(coords[b], coords[a] + sep(a, b))
+    return coords
+
+
+# ---------------------------------------------------------------------------
+#  Public API
+# ---------------------------------------------------------------------------
+
+def _clusters(groups: Sequence[Any], index: Dict[str, int]) -> List[Optional[str]]:
+    cluster: List[Optional[str]] = [None] * len(index)
+    for g in groups or []:
+        get = g.get if isinstance(g, dict) else lambda k, _g=g: getattr(_g, k, None)
+        if get("type") == "layer_cluster":
+            continue  # coincides with the lanes themselves
+        for member in get("member_node_ids") or []:
+            i = index.get(member)
+            if i is not None and cluster[i] is None:
+                cluster[i] = str(get("id"))
+    return cluster
+
+
+def layered_layout(
+    diagram: DSLDiagram,
+    direction: str = "LR",
+    *,
+    ranks: Optional[Dict[str, int]] = None,
+    min_width: float = 120,
+    min_height: float = 60,
+    node_spacing: float = NODE_SPACING,
+    layer_spacing: float = LAYER_SPACING,
+) -> DSLDiagram:
+    """Position *diagram* with the layered algorithm.
+
+    *direction* is a ``LayoutDirection`` value (LR, RL, TB, BT).  *ranks*
+    overrides the lane hints read from node properties (see
+    :func:`diagram_rank_hints`).
+    """
+    nodes = diagram.nodes
+    if not nodes:
+        return diagram.model_copy()
+    index = {node.id: i for i, node in enumerate(nodes)}
+    n = len(nodes)
+    edges = [
+        (index[e.source], index[e.target])
+        for e in diagram.edges
+        if e.source in index and e.target in index and e.source != e.target
+    ]
+    hints = ranks if ranks is not None else diagram_rank_hints(diagram)
+    horizontal = direction in _HORIZONTAL
+
+    widths = np.array([max(float(node.width), min_width) for node in nodes])
+    heights = np.array([max(float(node.height), min_height) for node in nodes])
+    breadth = heights if horizontal else widths   # along a layer
+    depth = widths if horizontal else heights     # across layers
+
+    layer = _assign_layers(n, edges, {index[k]: v for k, v in hints.items() if k in index})
+    g = _Layering(n, edges, layer, _clusters(getattr(diagram, "groups", []), index))
+    g.minimise_crossings()
+
+    size = np.concatenate([breadth, np.zeros(len(g.layer_of) - n)])
+
+    def sep(a: int, b: int) -> float:
+        gap = node_spacing if not (g.is_dummy(a) or g.is_dummy(b)) else EDGE_SPACING
+        if g.cluster[a] != g.cluster[b] and (g.cluster[a] or g.cluster[b]):
+            gap += CLUSTER_SPACING
+        return (size[a] + size[b]) / 2 + gap
+
+    across = _bk_coordinates(g, size, sep)[:n] - breadth / 2
+    across += MARGIN - across.min()
+
+    band = np.zeros(len(g.layers))
+    np.maximum.at(band, layer, depth)
+    starts = MARGIN + np.concatenate(([0.0], np.cumsum(band + layer_spacing)[:-1]))
+    lanes = np.asarray(layer)
+    along = starts[lanes] + (band[lanes] - depth) / 2
+    if direction in _MIRRORED:
+        along = MARGIN + (starts[-1] + band[-1]) - (along + depth)
+
+    xs, ys = (along, across) if horizontal else (across, along)
+    positioned = [
+        node.model_copy(update={
+            "x": float(xs[i]), "y": float(ys[i]), "width": float(widths[i]), "height": float(heights[i]),
+        })
+        for i, node in enumerate(nodes)
+    ]
+    return DSLDiagram.model_construct(
+        nodes=positioned, edges=list(diagram.edges), groups=list(getattr(diagram, "groups", []))
+    )
+
+
+def layered_layout_ir(ir_graph: IRGraph, direction: str = "LR") -> DSLDiagram:
+    """Lay out an IR graph in-process, with lanes from its ``layer`` hints."""
+    # Node sizes match the d2json IR engine (IRLayoutEngine)
+    return layered_layout(
+        ir_to_dsl(ir_graph), direction, ranks=ir_rank_hints(ir_graph), min_width=172, min_height=36
+    )
@@ -27,7 +27,6 @@ class ReactFlowEmitter(ViewEmitter):
 
         # 1) groups first so child nodes can reference parent
         log_info(f"ReactFlow emitter: Processing {len(graph.groups)} groups")
-        group_meta = {g.id: g for g in graph.groups}
         for g in graph.groups:
             style = self._group_style(g)
             # bounding box will be updated later after positions; init padding
@@ -46,8 +45,9 @@ class ReactFlowEmitter(ViewEmitter):
 
         # 2) actual nodes
         log_info(f"ReactFlow emitter: Processing {len(graph.nodes)} nodes")
+        groups_of = graph.index.groups_of
         for n in graph.nodes:
-            parent_id = self._parent_for_node(n, group_meta)
+            parent_id = self._parent_for_node(n, groups_of)
             rf_nodes.append(
                 {
                     "id": n.id,
@@ -114,13 +114,10 @@ class ReactFlowEmitter(ViewEmitter):
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _parent_for_node(node: IRNode, grp_index: Dict[str, IRGroup] | None):
-        if not grp_index:
-            return None
-        for g in grp_index.values():
-            if node.id in g.member_node_ids:
-                return g.id
-        return None
+    def _parent_for_node(node: IRNode, groups_of: Dict[str, List[IRGroup]]):
+        """First group (in ``graph.groups`` order) that lists *node* as a member."""
+        groups = groups_of.get(node.id)
+        return groups[0].id if groups else None
 
     @staticmethod
     def _group_style(group: IRGroup) -> Dict[str, str]:
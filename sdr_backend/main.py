@@ -44,6 +44,7 @@ from core.intent_classification.intent_classifier_v1 import download_transformer
 # ------------------- V2 routers -------------------
 from v2.api.routes.model_with_ai.svg_export import router as svg_export_router
 from core.dsl.env_check import ensure_d2_present
+from core.ir.enrich import taxonomy_client, taxonomy_embeddings
 
 session_manager = SessionManager()
 # logger = setup_logging()
@@ -78,6 +79,22 @@ async def lifespan(app: FastAPI):
         # Check for d2 binary
         ensure_d2_present()
 
+        # Load the taxonomy snapshot before serving traffic (local files
+        # first, Supabase otherwise); enrichment falls back to a lazy load.
+        snapshot = None
+        try:
+            snapshot = await taxonomy_client.warm_up(timeout=60)
+            log_info(f"Taxonomy snapshot v{snapshot.version} ready ({len(snapshot)} rows)")
+        except Exception as e:
+            log_info(f"Taxonomy warm-up failed, loading lazily on first use: {e}")
+
+        # Build the optional embedding index now rather than on a request
+        if snapshot is not None:
+            try:
+                await taxonomy_embeddings.warm_up(snapshot, timeout=120)
+            except Exception as e:
+                log_info(f"Taxonomy embedding warm-up incomplete, continuing in background: {e!r}")
+
         # Set cache directory
         # log_info("Downloading transformer models...")
         # download_transformer_models(max_retries=5)
@@ -91,6 +108,7 @@ async def lifespan(app: FastAPI):
     finally:
         # Cleanup resources in finally block to ensure they run even on errors
         
+        taxonomy_client.stop_background_refresher()
         await session_manager.disconnect()  # Disconnect from Redis
         log_info("disconnected redis session manager...")
         log_info("Shutting down")
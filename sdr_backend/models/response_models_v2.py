@@ -1,6 +1,6 @@
 from __future__ import annotations
 from enum import Enum
-from typing import List, Optional, Union, Literal, Annotated
+from typing import Any, Dict, List, Optional, Union, Literal, Annotated
 from pydantic import BaseModel, Field, HttpUrl, ConfigDict
 
 
@@ -86,6 +86,7 @@ class DSLResponsePayload(BaseModel):
     pinned_nodes: Optional[List[str]]
     available_views: Optional[List[str]] = None
     provider: Optional[str] = None  # Cloud provider: 'aws', 'azure', 'gcp', 'multi', or None
+    enrich_profile: Optional[List[Dict[str, Any]]] = None  # Per-stage IR enrichment timings (IR_ENRICH_PROFILE)
 
 
 class DSLResponse(BaseResponseV2):
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Compile the tech_taxonomy export into the mmap index shared by all workers.
+
+    python scripts/build_taxonomy_index.py                    # pull from Supabase
+    python scripts/build_taxonomy_index.py --export dump.json # offline export
+    python scripts/build_taxonomy_index.py --output /srv/taxonomy_index.bin --force
+    python scripts/build_taxonomy_index.py --dump             # refresh the bundled export
+
+The export may be the ``export_taxonomy_json`` RPC payload / disk cache
+(``{"rows": [...], "checksum": "..."}``) or a bare list of rows.  The index
+is only rewritten when its embedded checksum differs from the one computed
+over the export's rows, unless --force is given.  ``--dump`` writes the export instead of an index
+(by default to the ``taxonomy_dump.json`` shipped with the code, which
+workers boot from when Supabase is unreachable and no local cache exists).
+The repository ships that file empty; run ``--dump`` against Supabase when
+building a release that must boot offline.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.ir.enrich import taxonomy_client  # noqa: E402
+from core.ir.enrich.taxonomy_index import (  # noqa: E402
+    CompiledTaxonomyIndex,
+    StaleIndexError,
+    compile_index,
+)
+
+
+def load_export(path: Path):
+    obj = json.loads(path.read_text("utf-8"))
+    rows = obj if isinstance(obj, list) else (obj.get("rows") or [])
+    # same scheme as the runtime snapshots, whatever checksum the file carries
+    return rows, taxonomy_client._rows_checksum(rows)
+
+
+def dump_export(rows, checksum: str, path: Path) -> None:
+    """Write *rows* in the disk-cache format, one row per line and sorted by
+    token so regenerated exports diff cleanly."""
+    rows = sorted(rows, key=lambda r: r["token"])
+    body = ",\n".join(json.dumps(r, ensure_ascii=False, sort_keys=True) for r in rows)
+    path.write_text(
+        f'{{"checksum": {json.dumps(checksum)},\n "rows": [\n{body}\n]}}\n', "utf-8"
+    )
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--export", type=Path, help="taxonomy export JSON (default: pull from Supabase)")
+    ap.add_argument("--output", type=Path, default=taxonomy_client.COMPILED_INDEX_FILE,
+                    help=f"index file to write (default: {taxonomy_client.COMPILED_INDEX_FILE})")
+    ap.add_argument("--force", action="store_true", help="rebuild even if the checksum matches")
+    ap.add_argument("--dump", type=Path, nargs="?", const=taxonomy_client.BUNDLED_SNAPSHOT_FILE,
+                    help="write the export JSON instead of compiling "
+                         f"(default: {taxonomy_client.BUNDLED_SNAPSHOT_FILE})")
+    args = ap.parse_args(argv)
+
+    if args.export:
+        rows, checksum = load_export(args.export)
+    else:
+        rows, checksum = taxonomy_client._pull_taxonomy()
+    if not rows:
+        print("❌  no taxonomy rows found – nothing to compile", file=sys.stderr)
+        return 1
+
+    if args.dump:
+        dump_export(rows, checksum, args.dump)
+        print(f"✅  exported {len(rows)} rows → {args.dump} (checksum={checksum})")
+        return 0
+
+    if not args.force and args.output.exists():
+        try:
+            if CompiledTaxonomyIndex(args.output).checksum == checksum:
+                print(f"✅  {args.output} already up to date (checksum={checksum})")
+                return 0
+        except StaleIndexError:
+            pass
+
+    compile_index(rows, checksum, args.output)
+    print(f"✅  compiled {len(rows)} rows → {args.output} (checksum={checksum})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""
+Migrate stored diagram blobs to (or back from) the compact encoding.
+
+    python scripts/compact_diagram_blobs.py                               # DB from SUPABASEDATABASEURLST
+    python scripts/compact_diagram_blobs.py --db-url sqlite:///local.db   # local stand-in
+    python scripts/compact_diagram_blobs.py --decode                      # roll back to plain JSON
+
+Rewrites ``rendered_json`` and ``ir_json`` of ``diagrams`` and
+``diagram_versions`` in place (see core/db/blob_codec.py).  Readers decode
+both forms, so the migration can run while the API is serving; it is
+idempotent and safe to re-run after an interruption.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import sqlalchemy as sa  # noqa: E402
+
+from core.db.blob_codec import TABLES, recode_tables  # noqa: E402
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db-url", default=os.getenv("SUPABASEDATABASEURLST"),
+                    help="SQLAlchemy URL of the database (default: $SUPABASEDATABASEURLST)")
+    ap.add_argument("--page-size", type=int, default=200, help="rows per page (default: 200)")
+    ap.add_argument("--tables", nargs="+", default=list(TABLES), choices=TABLES, help="tables to process")
+    ap.add_argument("--decode", action="store_true", help="rewrite compact blobs back to plain JSON")
+    args = ap.parse_args(argv)
+
+    if not args.db_url:
+        print("❌  no database URL – pass --db-url or set SUPABASEDATABASEURLST", file=sys.stderr)
+        return 1
+
+    engine = sa.create_engine(args.db_url)
+    summary = recode_tables(engine, compact=not args.decode, tables=args.tables, page_size=args.page_size)
+    for name, (scanned, rewritten) in summary.items():
+        print(f"✅  {name}: re-encoded {rewritten}/{scanned} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
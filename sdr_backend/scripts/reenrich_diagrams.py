@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Re-enrich stored diagram IR after the taxonomy changed.
+
+    python scripts/reenrich_diagrams.py                               # DB from SUPABASEDATABASEURLST
+    python scripts/reenrich_diagrams.py --db-url sqlite:///local.db   # local stand-in
+    python scripts/reenrich_diagrams.py --workers 4 --page-size 500 --tables diagrams
+
+Only rows whose ``ir_json`` was enriched against a different taxonomy
+checksum are rewritten (all rows with --force).  Progress is checkpointed
+per table, so re-running after an interruption resumes where it stopped;
+--reset discards the checkpoint.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import sqlalchemy as sa  # noqa: E402
+
+from core.ir.enrich import taxonomy_client  # noqa: E402
+from core.ir.enrich.bulk_reenrich import DEFAULT_PAGE_SIZE, TABLES, run_bulk_reenrich  # noqa: E402
+
+DEFAULT_CHECKPOINT = taxonomy_client.CACHE_DIR / "reenrich_checkpoint.json"
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db-url", default=os.getenv("SUPABASEDATABASEURLST"),
+                    help="SQLAlchemy URL of the database (default: $SUPABASEDATABASEURLST)")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count, 0 = in-process)")
+    ap.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help=f"rows per page (default: {DEFAULT_PAGE_SIZE})")
+    ap.add_argument("--tables", nargs="+", default=list(TABLES), choices=TABLES, help="tables to process")
+    ap.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT,
+                    help=f"checkpoint file (default: {DEFAULT_CHECKPOINT})")
+    ap.add_argument("--reset", action="store_true", help="ignore any existing checkpoint")
+    ap.add_argument("--force", action="store_true", help="re-enrich rows that are already up to date")
+    args = ap.parse_args(argv)
+
+    if not args.db_url:
+        print("❌  no database URL – pass --db-url or set SUPABASEDATABASEURLST", file=sys.stderr)
+        return 1
+    if args.reset and args.checkpoint.exists():
+        args.checkpoint.unlink()
+
+    engine = sa.create_engine(args.db_url)
+    stats = run_bulk_reenrich(
+        engine,
+        checkpoint_path=args.checkpoint,
+        page_size=args.page_size,
+        workers=args.workers,
+        tables=args.tables,
+        force=args.force,
+    )
+    print(
+        f"✅  re-enriched {stats.reenriched}/{stats.scanned} graphs in {stats.seconds:.1f}s "
+        f"({stats.graphs_per_sec:.1f} graphs/s, {stats.failed} failed)"
+    )
+    return 0 if not stats.failed else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,7 @@ from datetime import date, datetime, timezone, timedelta
 import random
 from utils.logger import log_info
 from core.db.supabase_db import get_supabase_client, safe_supabase_operation
+from core.db.blob_codec import decode_blob, encode_blob
 from constants import ProjectPriority, ProjectStatus
 
 class SupabaseManager:
@@ -78,6 +79,35 @@ class SupabaseManager:
             return None
             
         return dsl_response.data[0].get("d2_dsl")
+
+    async def fetch_latest_ir(self, project_code: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the latest enriched IR for a given project from Supabase.
+        
+        Args:
+            project_code: The unique code of the project (e.g., "P123").
+            
+        Returns:
+            The latest ``ir_json`` blob or None if not found.
+        """
+        def fetch_ir():
+            return (self.supabase
+                   .from_("diagrams")
+                   .select("ir_json")
+                   .eq("project_id", project_code)
+                   .order("version", desc=True)
+                   .limit(1)
+                   .execute())
+                   
+        ir_response = await safe_supabase_operation(
+            fetch_ir,
+            f"Failed to fetch latest IR for project {project_code}"
+        )
+        
+        if not ir_response.data or not ir_response.data[0]:
+            return None
+            
+        return decode_blob(ir_response.data[0].get("ir_json"))
     
     async def save_diagram_version(
         self,
@@ -100,6 +130,10 @@ class SupabaseManager:
         Returns:
             Tuple of (diagram_id, version_number)
         """
+        # Compact storage encoding (no-op unless DIAGRAM_BLOB_COMPACT is set)
+        rendered_json = encode_blob(rendered_json)
+        ir_json = encode_blob(ir_json)
+
         # First check if there's already a diagram for this project
         def check_existing():
             return (self.supabase
@@ -261,7 +295,7 @@ class SupabaseManager:
         if not resp.data:
             raise ValueError(f"Diagram {diagram_id} not found")
 
-        ir_json = resp.data.get("ir_json")
+        ir_json = decode_blob(resp.data.get("ir_json"))
         if not ir_json:
             raise ValueError("IR JSON missing for diagram")
 
@@ -110,7 +110,7 @@ class TestSVGExport:
     @patch('v2.api.routes.model_with_ai.svg_export.verify_token')
     @patch('v2.api.routes.model_with_ai.svg_export._parser')
     @patch('v2.api.routes.model_with_ai.svg_export._validator')
-    @patch('v2.api.routes.model_with_ai.svg_export.render_svg')
+    @patch('v2.api.routes.model_with_ai.svg_export.render_svg_async', new_callable=AsyncMock)
     def test_successful_svg_export(self, mock_render_svg, mock_validator, mock_parser, mock_verify_token, client, mock_user, sample_d2_dsl):
         """Test successful SVG export."""
         # Setup mocks
@@ -140,7 +140,7 @@ class TestSVGExport:
     @patch('v2.api.routes.model_with_ai.svg_export.verify_token')
     @patch('v2.api.routes.model_with_ai.svg_export._parser')
     @patch('v2.api.routes.model_with_ai.svg_export._validator')
-    @patch('v2.api.routes.model_with_ai.svg_export.render_svg')
+    @patch('v2.api.routes.model_with_ai.svg_export.render_svg_async', new_callable=AsyncMock)
     def test_svg_export_with_download(self, mock_render_svg, mock_validator, mock_parser, mock_verify_token, client, mock_user, sample_d2_dsl):
         """Test SVG export with download option."""
         # Setup mocks
@@ -202,7 +202,7 @@ class TestSVGExport:
     @patch('v2.api.routes.model_with_ai.svg_export.verify_token')
     @patch('v2.api.routes.model_with_ai.svg_export._parser')
     @patch('v2.api.routes.model_with_ai.svg_export._validator')
-    @patch('v2.api.routes.model_with_ai.svg_export.render_svg')
+    @patch('v2.api.routes.model_with_ai.svg_export.render_svg_async', new_callable=AsyncMock)
     def test_svg_export_render_error(self, mock_render_svg, mock_validator, mock_parser, mock_verify_token, client, mock_user, sample_d2_dsl):
         """Test SVG export with rendering error."""
         mock_verify_token.return_value = mock_user
@@ -224,7 +224,7 @@ class TestSVGExport:
     @patch('v2.api.routes.model_with_ai.svg_export.verify_token')
     @patch('v2.api.routes.model_with_ai.svg_export._parser')
     @patch('v2.api.routes.model_with_ai.svg_export._validator')
-    @patch('v2.api.routes.model_with_ai.svg_export.render_svg')
+    @patch('v2.api.routes.model_with_ai.svg_export.render_svg_async', new_callable=AsyncMock)
     def test_svg_export_empty_render(self, mock_render_svg, mock_validator, mock_parser, mock_verify_token, client, mock_user, sample_d2_dsl):
         """Test SVG export with empty rendering result."""
         mock_verify_token.return_value = mock_user
@@ -417,7 +417,7 @@ class TestSVGExportSecurity:
         with patch('v2.api.routes.model_with_ai.svg_export.verify_token') as mock_verify:
             with patch('v2.api.routes.model_with_ai.svg_export._parser') as mock_parser:
                 with patch('v2.api.routes.model_with_ai.svg_export._validator') as mock_validator:
-                    with patch('v2.api.routes.model_with_ai.svg_export.render_svg') as mock_render:
+                    with patch('v2.api.routes.model_with_ai.svg_export.render_svg_async', new_callable=AsyncMock) as mock_render:
                         mock_verify.return_value = {"id": "test_user"}
                         mock_parser.parse.return_value = Mock()
                         mock_validator.validate.return_value = (True, [])
@@ -436,7 +436,7 @@ class TestSVGExportIntegration:
     """Integration tests for SVG export functionality."""
     
     @patch('v2.api.routes.model_with_ai.svg_export.verify_token')
-    @patch('v2.api.routes.model_with_ai.svg_export.render_svg')
+    @patch('v2.api.routes.model_with_ai.svg_export.render_svg_async', new_callable=AsyncMock)
     def test_end_to_end_svg_export(self, mock_render_svg, mock_verify_token, client, mock_user):
         """Test complete end-to-end SVG export flow."""
         mock_verify_token.return_value = mock_user
@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import subprocess
+import sys
+import time
+
+import pytest
+
+from core.dsl import async_exec
+from core.dsl.async_exec import run_blocking, run_exec
+
+PY = sys.executable
+
+
+def test_run_exec_returns_stdout_and_maps_failures():
+    async def main():
+        assert await run_exec("py", [PY, "-c", "import sys; print(sys.stdin.read().upper())"],
+                              input=b"abc", timeout=10) == b"ABC\n"
+        with pytest.raises(subprocess.CalledProcessError):
+            await run_exec("py", [PY, "-c", "raise SystemExit(3)"], timeout=10)
+        with pytest.raises(subprocess.TimeoutExpired):
+            await run_exec("py", [PY, "-c", "import time; time.sleep(10)"], timeout=0.2)
+
+    asyncio.run(main())
+
+
+def test_slow_call_does_not_block_the_loop_and_concurrency_is_bounded(monkeypatch):
+    monkeypatch.setattr(async_exec, "CONCURRENCY", 1)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick_task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await asyncio.gather(run_blocking("sleep", time.sleep, 0.2), run_blocking("sleep", time.sleep, 0.2))
+        tick_task.cancel()
+        return ticks, time.perf_counter() - start
+
+    ticks, elapsed = asyncio.run(main())
+    assert ticks > 10          # the loop kept running
+    assert elapsed >= 0.4      # one slot – the calls ran one after the other
+
+
+def test_cancelled_call_keeps_its_slot_until_the_thread_returns(monkeypatch):
+    monkeypatch.setattr(async_exec, "CONCURRENCY", 1)
+
+    async def main():
+        start = time.perf_counter()
+        task = asyncio.create_task(run_blocking("sleep", time.sleep, 0.5))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await run_blocking("clock", time.perf_counter) - start
+
+    assert asyncio.run(main()) >= 0.45  # the next call waited for the abandoned thread
+
+
+def test_render_svg_async_treats_slow_redis_as_a_miss(monkeypatch):
+    from core.dsl import svg_renderer
+
+    class SlowRedis:
+        def __init__(self):
+            self.keys = []
+
+        def get(self, key):
+            self.keys.append(key)
+            time.sleep(2)
+
+        def set(self, key, value, ex=None):
+            self.keys.append(key)
+
+    async def fake_exec(name, argv, input=None, timeout=None):
+        return b"<svg/>"
+
+    slow = SlowRedis()
+    monkeypatch.setattr(svg_renderer, "rds", slow)
+    monkeypatch.setattr(svg_renderer, "REDIS_TIMEOUT", 0.1)
+    monkeypatch.setattr(svg_renderer, "run_exec", fake_exec)
+    monkeypatch.setattr(svg_renderer, "_memory", svg_renderer.OrderedDict())
+
+    async def main():
+        start = time.perf_counter()
+        svg = await svg_renderer.render_svg_async("a -> b")
+        return svg, time.perf_counter() - start
+
+    svg, elapsed = asyncio.run(main())
+    assert svg == b"<svg/>" and elapsed < 1
+    # a stable digest, so every worker shares the entry
+    key = "svg:0:" + hashlib.blake2b(b"a -> b", digest_size=16).hexdigest()
+    assert slow.keys == [key, key]
+
+
+def test_render_svg_async_serves_repeats_from_memory(monkeypatch):
+    from core.dsl import svg_renderer
+
+    class CountingRedis:
+        gets = 0
+
+        def get(self, key):
+            self.gets += 1
+
+        def set(self, key, value, ex=None):
+            pass
+
+    renders = []
+
+    async def fake_exec(name, argv, input=None, timeout=None):
+        renders.append(input)
+        return b"<svg>" + input + b"</svg>"
+
+    redis_stub = CountingRedis()
+    monkeypatch.setattr(svg_renderer, "rds", redis_stub)
+    monkeypatch.setattr(svg_renderer, "run_exec", fake_exec)
+    monkeypatch.setattr(svg_renderer, "_memory", svg_renderer.OrderedDict())
+    monkeypatch.setattr(svg_renderer, "MEMORY_CACHE_SIZE", 2)
+
+    async def main():
+        for src in ("a", "a", "b", "c", "a"):
+            assert await svg_renderer.render_svg_async(src) == f"<svg>{src}</svg>".encode()
+
+    asyncio.run(main())
+    assert renders == [b"a", b"b", b"c", b"a"]  # "a" was evicted by "b" and "c"
+    assert redis_stub.gets == 4
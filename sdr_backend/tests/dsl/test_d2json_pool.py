@@ -0,0 +1,118 @@
+import asyncio
+import os
+import sys
+import textwrap
+import time
+
+import pytest
+
+from core.dsl.async_exec import run_blocking
+from core.dsl.d2json_pool import D2JsonError, D2JsonPool, D2JsonTimeout
+
+# Stand-in for ``d2json -serve``: same framing, "nodes" are the source lines.
+# Sources starting with "crash" / "hang" / "bad" exercise the failure paths.
+FAKE_SERVE = """
+import json, os, struct, sys, time
+if "-serve" not in sys.argv:
+    sys.exit(2)  # legacy binary: unknown flag
+inp, out = sys.stdin.buffer, sys.stdout.buffer
+while True:
+    header = inp.read(4)
+    if len(header) < 4:
+        break
+    req = json.loads(inp.read(struct.unpack(">I", header)[0]))
+    src = req.get("src", "")
+    if src.startswith("crash"):
+        os._exit(1)
+    if src.startswith("hang"):
+        time.sleep(30)
+    resp = {"id": req["id"], "ok": not src.startswith("bad")}
+    if resp["ok"]:
+        resp["result"] = {"nodes": src.split(), "pid": os.getpid()}
+    else:
+        resp["error"] = "syntax error"
+    body = json.dumps(resp).encode()
+    out.write(struct.pack(">I", len(body)) + body)
+    out.flush()
+"""
+
+LEGACY = """
+import json, sys
+if "-serve" in sys.argv:
+    sys.exit(2)
+print(json.dumps({"nodes": sys.stdin.read().split(), "pid": 0}))
+"""
+
+
+def _binary(tmp_path, name, source):
+    path = tmp_path / name
+    path.write_text(f"#!{sys.executable}\n" + textwrap.dedent(source))
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = D2JsonPool(_binary(tmp_path, "d2json", FAKE_SERVE), size=1)
+    yield pool
+    pool.close()
+
+
+def test_workers_are_reused_and_survive_compile_errors(pool):
+    first = pool.run("a b")
+    assert first["nodes"] == ["a", "b"]
+    with pytest.raises(D2JsonError, match="syntax error"):
+        pool.run("bad input")
+    assert pool.run("c")["pid"] == first["pid"]
+    assert pool.restarts == 0
+
+
+def test_crashed_and_hung_workers_are_replaced(pool):
+    pid = pool.run("a")["pid"]
+    with pytest.raises(D2JsonError, match="crashed"):
+        pool.run("crash")
+    with pytest.raises(D2JsonTimeout):
+        pool.run("hang", timeout=0)
+    assert pool.run("a")["pid"] not in (pid, os.getpid())
+    assert pool.restarts == 3  # crash + its retry + the hung worker
+
+
+def test_binary_without_serve_mode_falls_back_to_one_shot(tmp_path):
+    pool = D2JsonPool(_binary(tmp_path, "d2json", LEGACY), size=1)
+    assert pool.run("x y")["nodes"] == ["x", "y"]
+    assert pool.run("z")["nodes"] == ["z"]
+
+
+def test_slow_first_start_is_retried_not_treated_as_legacy(tmp_path, monkeypatch):
+    monkeypatch.setattr("core.dsl.d2json_pool.START_TIMEOUT", 0.5)
+    marker = tmp_path / "started"
+    slow_once = f"""
+import os, sys, time
+if not os.path.exists({str(marker)!r}):
+    open({str(marker)!r}, "w").close()
+    time.sleep(3)  # cold start slower than START_TIMEOUT
+""" + FAKE_SERVE
+    pool = D2JsonPool(_binary(tmp_path, "d2json", slow_once), size=1)
+    try:
+        assert pool.run("a b")["nodes"] == ["a", "b"]
+        assert pool._serve_supported is True
+        assert pool.restarts == 1
+    finally:
+        pool.close()
+
+
+def test_cancelled_async_caller_kills_its_worker(pool):
+    pid = pool.run("warm")["pid"]
+
+    async def main():
+        task = asyncio.create_task(run_blocking("d2json", pool.run, "hang", timeout=20))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    started = time.perf_counter()
+    asyncio.run(main())  # waits for the worker thread to wind down
+    assert time.perf_counter() - started < 5
+    assert pool.restarts == 1
+    assert pool.run("a")["pid"] != pid
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+import sqlalchemy as sa
+
+from core.db import blob_codec
+from core.db.blob_codec import decode_blob, encode_blob, pack, recode_tables, unpack
+
+BIG = {"nodes": [{"id": f"n{i}", "name": f"Service {i}", "metadata": {"kind": "SERVICE"}} for i in range(200)]}
+
+
+def test_compact_round_trip_and_passthrough():
+    blob = encode_blob(BIG, force=True)
+    assert isinstance(blob, str) and blob.startswith(blob_codec.PREFIX)
+    assert len(blob) < len(json.dumps(BIG)) / 4
+    assert decode_blob(blob) == BIG
+
+    # Disabled, tiny and legacy values are stored / read as plain JSON
+    assert encode_blob(BIG, force=False) is BIG
+    assert encode_blob({"nodes": []}, force=True) == {"nodes": []}
+    assert decode_blob(BIG) is BIG and decode_blob(None) is None
+
+
+def test_frame_header_is_checked():
+    frame = pack(BIG, codec=blob_codec.CODEC_ZLIB)
+    assert frame[:2] == bytes((blob_codec.SCHEMA_VERSION, blob_codec.CODEC_ZLIB))
+    assert unpack(frame) == BIG
+    with pytest.raises(ValueError):
+        unpack(bytes((99,)) + frame[1:])
+
+
+def test_recode_tables_migrates_both_ways(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'diagrams.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE diagrams (id INTEGER PRIMARY KEY, rendered_json TEXT, ir_json TEXT)")
+        conn.exec_driver_sql("INSERT INTO diagrams VALUES (1, ?, ?), (2, ?, NULL)",
+                             (json.dumps(BIG), json.dumps(BIG), json.dumps({"nodes": []})))
+
+    def stored():
+        with engine.connect() as conn:
+            return {i: (json.loads(r), ir and json.loads(ir))
+                    for i, r, ir in conn.exec_driver_sql("SELECT id, rendered_json, ir_json FROM diagrams")}
+
+    assert recode_tables(engine, tables=["diagrams"], page_size=1) == {"diagrams": (2, 1)}
+    assert all(blob_codec.is_compact(v) for v in stored()[1])
+    assert recode_tables(engine, tables=["diagrams"]) == {"diagrams": (2, 0)}
+
+    recode_tables(engine, compact=False, tables=["diagrams"])
+    assert stored() == {1: (BIG, BIG), 2: ({"nodes": []}, None)}
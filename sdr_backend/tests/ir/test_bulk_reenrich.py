@@ -0,0 +1,57 @@
+import json
+
+import sqlalchemy as sa
+
+from core.ir.enrich import IrEnricher, taxonomy_client
+from core.ir.enrich.bulk_reenrich import base_graph, run_bulk_reenrich
+from core.ir.enrich.taxonomy_snapshot import TaxonomySnapshot
+from core.ir.ir_builder import IRBuilder
+from core.ir.ir_types import IREdge, IRGraph, IRNode
+
+ROWS = [{"token": "redis", "display_name": "Redis", "aliases": [], "kind": "DATA",
+         "iconify_id": "logos:redis", "svg_url": "https://x/redis.svg?"}]
+
+
+def _base() -> IRGraph:
+    return IRGraph(
+        nodes=[IRNode(id="a", name="  Redis   cache ", kind=IRBuilder.DEFAULT_KIND, layer=IRBuilder.DEFAULT_LAYER),
+               IRNode(id="b", name="Login API", kind=IRBuilder.DEFAULT_KIND, layer=IRBuilder.DEFAULT_LAYER)],
+        edges=[IREdge(id="e1", source="b", target="a", label="HTTPS auth")],
+        source_dsl="a -> b",
+    )
+
+
+def _use_taxonomy(monkeypatch, checksum):
+    monkeypatch.setattr(taxonomy_client, "_SNAPSHOT", TaxonomySnapshot.build(ROWS, checksum, version=1))
+
+
+def test_base_graph_recovers_builder_output(monkeypatch):
+    _use_taxonomy(monkeypatch, "v1")
+    enriched = IrEnricher().run_incremental(_base(), None).model_dump()
+    assert base_graph(enriched, None).model_dump() == _base().model_dump()
+
+
+def test_bulk_reenrich_rewrites_stale_rows_and_resumes(monkeypatch, tmp_path):
+    _use_taxonomy(monkeypatch, "old")
+    stale = IrEnricher().run_incremental(_base(), None).model_dump(mode="json")
+    _use_taxonomy(monkeypatch, "new")
+    fresh = IrEnricher().run_incremental(_base(), None).model_dump(mode="json")
+
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'diagrams.db'}")
+    with engine.begin() as conn:
+        for table in ("diagrams", "diagram_versions"):
+            conn.exec_driver_sql(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, d2_dsl TEXT, ir_json TEXT)")
+        conn.exec_driver_sql("INSERT INTO diagrams VALUES (1, 'a -> b', ?), (2, 'a -> b', ?)",
+                             (json.dumps(stale), json.dumps(fresh)))
+
+    checkpoint = tmp_path / "ckpt.json"
+    stats = run_bulk_reenrich(engine, checkpoint_path=checkpoint, workers=0, page_size=1)
+
+    assert (stats.scanned, stats.reenriched, stats.failed) == (2, 1, 0)
+    with engine.connect() as conn:
+        stored = {i: json.loads(ir) for i, ir in conn.exec_driver_sql("SELECT id, ir_json FROM diagrams")}
+    assert stored[1] == fresh
+    assert json.loads(checkpoint.read_text())["positions"] == {"diagrams": 2}
+
+    again = run_bulk_reenrich(engine, checkpoint_path=checkpoint, workers=0)
+    assert again.scanned == 0
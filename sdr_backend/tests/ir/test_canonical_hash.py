@@ -0,0 +1,27 @@
+from core.ir.canonical_hash import diff_hashes, graph_hashes, structural_hash
+from core.ir.ir_types import IREdge, IRGraph, IRNode
+from core.ir.layout.constraint_adapter import ir_hash
+
+
+def _graph(nodes, edges, source_dsl=""):
+    return IRGraph(nodes=nodes, edges=edges, source_dsl=source_dsl)
+
+
+def _node(node_id, name, **metadata):
+    return IRNode(id=node_id, name=name, kind="Service", layer="service", metadata=metadata)
+
+
+def test_hash_ignores_list_and_dict_order_and_source_text():
+    a = _graph([_node("a", "A", x=1, y=2), _node("b", "B")], [IREdge(id="e", source="a", target="b")], "a -> b")
+    b = _graph([_node("b", "B"), _node("a", "A", y=2, x=1)], [IREdge(id="e", source="a", target="b")], "a->b\n")
+    assert structural_hash(a) == structural_hash(b) == ir_hash(a)
+
+
+def test_leaf_hashes_pinpoint_changes():
+    before = graph_hashes(_graph([_node("a", "A"), _node("b", "B")], [IREdge(id="e", source="a", target="b")]))
+    after = graph_hashes(_graph([_node("a", "A"), _node("b", "B2"), _node("c", "C")], []))
+
+    nodes = diff_hashes(before.nodes, after.nodes)
+    assert (nodes.added, nodes.removed, nodes.changed) == ({"c"}, set(), {"b"})
+    assert diff_hashes(before.edges, after.edges).removed == {"e"}
+    assert before.root != after.root
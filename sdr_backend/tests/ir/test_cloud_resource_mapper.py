@@ -0,0 +1,20 @@
+from core.ir.enrich.cloud_resource_mapper import CloudResourceMapper
+from core.ir.enrich.keyword_automaton import KeywordAutomaton
+
+
+def test_automaton_reports_overlapping_keywords():
+    ac = KeywordAutomaton([("he", 1), ("she", 2), ("hers", 3), ("his", 4)])
+    hits = sorted((start, end, p) for start, end, p in ac.iter_matches("ushers"))
+    assert hits == [(1, 4, 2), (2, 4, 1), (2, 6, 3)]
+
+
+def test_category_priority_matches_declaration_order():
+    mapper = CloudResourceMapper()
+
+    assert mapper.detect_service_category("aws", "lambda") == "compute"
+    assert mapper.detect_service_category("aws", "my-s3-bucket") == "storage"
+    # "api-management" is listed under networking and integration; sql under database
+    assert mapper.detect_service_categories("azure", "api-management-sql") == ["database", "networking", "integration"]
+    assert mapper.detect_service_category("gcp", "unknown-thing") == "other"
+    assert mapper.detect_service_category("ibm", "cloud-functions") == "other"
+    assert mapper.get_layer_index_for_kind("DATA") == 6
@@ -0,0 +1,56 @@
+from core.dsl.dsl_types import DSLDiagram, DSLEdge, DSLNode
+from core.ir.ir_types import IRGroup
+from core.ir.layout.crossing_reducer import reduce_crossings
+
+
+def _two_rows(k=4, gap=40.0):
+    """TB layout whose a_i → b_(k-1-i) edges all cross each other."""
+    top = [DSLNode(id=f"a{i}", label="a", x=10 + i * (60 + gap), y=0.0) for i in range(k)]
+    bottom = [DSLNode(id=f"b{i}", label="b", x=10 + i * (60 + gap), y=300.0) for i in range(k)]
+    edges = [DSLEdge(id=f"e{i}", source=f"a{i}", target=f"b{k - 1 - i}") for i in range(k)]
+    return DSLDiagram(nodes=top + bottom, edges=edges)
+
+
+def _crosses(diagram, along):
+    pos = {n.id: getattr(n, along) for n in diagram.nodes}
+    ends = [(pos[e.source], pos[e.target]) for e in diagram.edges]
+    return sum(1 for i, (a, b) in enumerate(ends) for c, d in ends[i + 1:] if (a - c) * (b - d) < 0)
+
+
+def test_crossings_removed_without_regridding():
+    diagram = _two_rows()
+    out = reduce_crossings(diagram, "TB")
+
+    assert _crosses(diagram, "x") == 6 and _crosses(out, "x") == 0
+    # the layer keeps its own span and spacing
+    for row in ("a", "b"):
+        before = sorted(n.x for n in diagram.nodes if n.id.startswith(row))
+        after = sorted(n.x for n in out.nodes if n.id.startswith(row))
+        assert after == before
+    assert diagram.nodes[0].x == 10  # input untouched
+
+
+def test_lr_layers_are_columns():
+    diagram = _two_rows()
+    swapped = DSLDiagram(
+        nodes=[n.model_copy(update={"x": n.y, "y": n.x}) for n in diagram.nodes], edges=diagram.edges
+    )
+    assert _crosses(reduce_crossings(swapped, "LR"), "y") == 0
+
+
+def test_respace_and_noop():
+    out = reduce_crossings(_two_rows(), "TB", respace=True, spacing=200)
+    assert sorted(n.x for n in out.nodes if n.id.startswith("b")) == [50, 250, 450, 650]
+
+    clean = reduce_crossings(_two_rows(), "TB")
+    assert reduce_crossings(clean, "TB") is clean
+
+
+def test_group_members_stay_contiguous():
+    zone = IRGroup(id="z", name="Zone", type="trust_zone", member_node_ids=["b0", "b2"])
+    diagram = _two_rows().model_copy(update={"groups": [zone]})
+    out = reduce_crossings(diagram, "TB")
+
+    row = [n.id for n in sorted((n for n in out.nodes if n.id.startswith("b")), key=lambda n: n.x)]
+    assert abs(row.index("b0") - row.index("b2")) == 1
+    assert _crosses(out, "x") < _crosses(diagram, "x")
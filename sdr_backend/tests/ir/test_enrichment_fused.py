@@ -0,0 +1,82 @@
+import core.ir.enrich as enrich
+from core.ir.enrich import INPLACE_STAGE_FUNCS, IrEnricher, stage_name, taxonomy_client
+from core.ir.enrich.working_graph import stage_waves
+from core.ir.enrich.taxonomy_snapshot import TaxonomySnapshot
+from core.ir.ir_types import IREdge, IRGraph, IRNode
+
+
+def test_fused_pipeline_matches_stage_by_stage(monkeypatch):
+    rows = [{"token": "redis", "display_name": "Redis", "aliases": [], "kind": "DATA",
+             "iconify_id": "logos:redis", "svg_url": "https://x/redis.svg?"}]
+    monkeypatch.setattr(taxonomy_client, "_SNAPSHOT", TaxonomySnapshot.build(rows, "fused", version=1))
+
+    graph = IRGraph(
+        nodes=[
+            IRNode(id="a", name="  Redis   cache ", kind="Cache", layer="data"),
+            IRNode(id="b", name="Login API", kind="Auth", layer="service", risk_tags=["pii"]),
+            IRNode(id="c", name="User profile", kind="Service", layer="service", metadata={"x": 1}),
+            IRNode(id="d", name="Orders", kind="Queue", layer="service", domain="order"),
+        ],
+        edges=[IREdge(id="e1", source="b", target="a", label="HTTPS auth"),
+               IREdge(id="e2", source="c", target="d", label="event data")],
+        source_dsl="",
+    )
+    before = graph.model_dump()
+
+    fused = IrEnricher(fused=True).run(graph)
+    staged = IrEnricher(fused=False).run(graph)
+
+    assert fused.model_dump() == staged.model_dump()
+    assert graph.model_dump() == before  # input untouched
+    assert fused.nodes[0].metadata["orig_label"] == "  Redis   cache "
+    assert fused.nodes[1].risk_tags == ["pii", "high"]
+    assert fused.edges[0].protocol == "HTTP" and fused.edges[0].purpose == "auth"
+
+
+def test_enricher_records_stage_profile(monkeypatch):
+    monkeypatch.setattr(taxonomy_client, "_SNAPSHOT", TaxonomySnapshot.build([], "profile", version=1))
+    graph = IRGraph(nodes=[IRNode(id="a", name="API", kind="Service", layer="service")],
+                    edges=[], source_dsl="")
+
+    enricher = IrEnricher(fused=True)
+    enricher.run(graph)
+
+    assert [p["stage"] for p in enricher.profile] == [
+        "normalize_labels", "assign_taxonomy", "infer_domain",
+        "tag_risks", "classify_edges", "assign_groups_by_kind",
+    ]
+    assert all(p["nodes"] == 1 and p["edges"] == 0 and p["seconds"] >= 0 for p in enricher.profile)
+
+
+def test_stage_waves_follow_declared_access():
+    waves = [[stage_name(s) for s in wave] for wave in stage_waves(INPLACE_STAGE_FUNCS)]
+    assert waves == [
+        ["normalize_labels", "classify_edges"],
+        ["assign_taxonomy", "infer_domain"],
+        ["tag_risks", "assign_groups_by_kind"],
+    ]
+    assert len(stage_waves([lambda g: None, lambda g: None])) == 2  # undeclared stages stay serial
+
+
+def test_concurrent_waves_match_sequential(monkeypatch):
+    rows = [{"token": "redis", "display_name": "Redis", "aliases": [], "kind": "DATA",
+             "iconify_id": "logos:redis", "svg_url": "https://x/redis.svg?"}]
+    monkeypatch.setattr(taxonomy_client, "_SNAPSHOT", TaxonomySnapshot.build(rows, "waves", version=1))
+    graph = IRGraph(
+        nodes=[IRNode(id=f"n{i}", name=f" {name}  {i}", kind="Service", layer="service")
+               for i, name in enumerate(["Redis", "Login API", "Orders", "User db"] * 10)],
+        edges=[IREdge(id=f"e{i}", source=f"n{i}", target=f"n{i + 1}", label=label)
+               for i, label in enumerate(["grpc event", "https login", "sql data"] * 10)],
+        source_dsl="",
+    )
+
+    sequential = IrEnricher(fused=True).run(graph).model_dump()
+    monkeypatch.setattr(enrich, "PARALLEL_MIN_NODES", 1)
+    enricher = IrEnricher(fused=True)
+    concurrent = enricher.run(graph).model_dump()
+
+    assert concurrent == sequential
+    assert [p["stage"] for p in enricher.profile] == [
+        "normalize_labels", "classify_edges", "assign_taxonomy",
+        "infer_domain", "tag_risks", "assign_groups_by_kind",
+    ]
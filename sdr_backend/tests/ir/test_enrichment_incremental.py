@@ -0,0 +1,51 @@
+from core.ir.enrich import IrEnricher, incremental, taxonomy_client
+from core.ir.enrich.taxonomy_snapshot import TaxonomySnapshot
+from core.ir.ir_types import IREdge, IRGraph, IRNode
+
+ROWS = [{"token": "redis", "display_name": "Redis", "aliases": [], "kind": "DATA",
+         "iconify_id": "logos:redis", "svg_url": "https://x/redis.svg?"}]
+
+
+def _graph(orders_name: str) -> IRGraph:
+    return IRGraph(
+        nodes=[
+            IRNode(id="a", name="  Redis   cache ", kind="Cache", layer="data"),
+            IRNode(id="b", name="Login API", kind="Auth", layer="service"),
+            IRNode(id="c", name="User profile", kind="Service", layer="service"),
+            IRNode(id="d", name=orders_name, kind="Queue", layer="service"),
+        ],
+        edges=[IREdge(id="e1", source="b", target="a", label="HTTPS auth"),
+               IREdge(id="e2", source="c", target="d", label="event data")],
+        source_dsl="",
+    )
+
+
+def test_incremental_matches_full_run_and_only_touches_changes(monkeypatch):
+    monkeypatch.setattr(taxonomy_client, "_SNAPSHOT", TaxonomySnapshot.build(ROWS, "inc", version=1))
+    enricher = IrEnricher()
+
+    previous = enricher.run_incremental(_graph("Orders"), None).model_dump()
+    assert set(previous["build_meta"]["enrich"]["node_hashes"]) == {"a", "b", "c", "d"}
+
+    seen = {}
+    monkeypatch.setattr(incremental, "EDGE_STAGES", [lambda g: seen.update(
+        nodes=[n.id for n in g.nodes], edges=[e.id for e in g.edges])] + incremental.EDGE_STAGES)
+
+    updated = _graph("Checkout orders")
+    result = enricher.run_incremental(updated, previous)
+
+    assert seen == {"nodes": ["d"], "edges": ["e2"]}
+    assert result.model_dump() == enricher.run_incremental(updated, None).model_dump()
+
+
+def test_taxonomy_change_forces_full_run(monkeypatch):
+    monkeypatch.setattr(taxonomy_client, "_SNAPSHOT", TaxonomySnapshot.build(ROWS, "v1", version=1))
+    enricher = IrEnricher()
+    previous = enricher.run_incremental(_graph("Orders"), None).model_dump()
+
+    monkeypatch.setattr(taxonomy_client, "_SNAPSHOT", TaxonomySnapshot.build(ROWS, "v2", version=2))
+    calls = []
+    result = incremental.enrich_incremental(_graph("Orders"), previous, lambda g: calls.append(g) or enricher.run(g))
+
+    assert len(calls) == 1
+    assert result.build_meta["enrich"]["taxonomy_checksum"] == "v2"
@@ -7,6 +7,7 @@ from sdr_backend.core.ir.ir_types import (
     IRGraph,
     IRGroup,
     IRNode,
+    trusted_graph,
 )
 
 
@@ -78,4 +79,57 @@ def test_schema_contains_required_fields():
 
     edge_schema = IREdge.model_json_schema()
     for required in ["id", "source", "target"]:
-        assert required in edge_schema["properties"] 
\ No newline at end of file
+        assert required in edge_schema["properties"] 
+
+def test_trusted_graph_round_trip_matches_validated():
+    graph = IRGraph(
+        nodes=[IRNode(**_sample_node()), IRNode(**_sample_node("n2", "Service B"))],
+        edges=[IREdge(**_sample_edge())],
+        groups=[IRGroup(**_sample_group())],
+        source_dsl="diagram dsl v1",
+        build_meta={"enrich": {"taxonomy_checksum": "x"}},
+    )
+    dumped = graph.model_dump()
+    assert trusted_graph(dumped) == IRGraph.model_validate(dumped)
+    assert trusted_graph(json.loads(graph.model_dump_json())).model_dump() == dumped
+
+
+def test_trusted_graph_accepts_enriched_kinds():
+    node = {**_sample_node(), "kind": "DATABASE", "layer": "data"}
+    loaded = trusted_graph({"nodes": [node], "edges": [], "source_dsl": ""})
+    assert loaded.nodes[0].kind == "DATABASE"
+    assert loaded.nodes[0].risk_tags == [] and loaded.groups == []
+
+
+def test_graph_index_tracks_list_changes():
+    graph = IRGraph(
+        nodes=[IRNode(**_sample_node()), IRNode(**_sample_node("n2", "Service B"))],
+        edges=[IREdge(**_sample_edge())],
+        groups=[IRGroup(**_sample_group())],
+        source_dsl="",
+    )
+    index = graph.index
+    assert graph.index is index  # cached
+    assert [e.id for e in index.outgoing["n1"]] == ["e1"] and [e.id for e in index.incoming["n2"]] == ["e1"]
+    assert [g.id for g in index.groups_of["n2"]] == ["g1"]
+
+    graph.groups.append(IRGroup(**{**_sample_group("g2"), "member_node_ids": ["n2"]}))
+    assert [g.id for g in graph.index.groups_of["n2"]] == ["g1", "g2"]
+
+    graph.nodes[0].id = "n0"
+    graph.invalidate_indexes()
+    assert set(graph.index.node_by_id) == {"n0", "n2"}
+    assert graph == graph.model_copy(deep=True)  # cached index never affects equality
+
+    # replacing an element in place is picked up without invalidating
+    graph.nodes[0] = IRNode(**_sample_node("z", "Service Z"))
+    assert set(graph.index.node_by_id) == {"z", "n2"}
+    graph.edges[0] = IREdge(**{**_sample_edge(), "source": "z"})
+    assert [e.id for e in graph.index.outgoing["z"]] == ["e1"]
+
+    # copies never inherit the original's index
+    assert graph.model_copy()._index is None
+    copied = graph.model_copy(deep=True)
+    assert copied._index is None
+    copied.nodes[0].id = "y"
+    assert "y" in copied.index.node_by_id and "z" in graph.index.node_by_id
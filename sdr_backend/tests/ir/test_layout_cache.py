@@ -0,0 +1,74 @@
+from core.dsl.dsl_types import DSLDiagram, DSLEdge, DSLNode
+from core.ir.ir_types import IRGroup
+from core.ir.layout.cache import LayoutCache, layout_key
+
+
+class _DictRedis:
+    """Just enough of the redis-py surface for the layout tier."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def _diagram(n: int = 3) -> DSLDiagram:
+    nodes = [DSLNode(id=f"n{i}", label=f"Node {i}", x=float(i * 100), y=10.0) for i in range(n)]
+    edges = [DSLEdge(id=f"e{i}", source=f"n{i}", target=f"n{i + 1}") for i in range(n - 1)]
+    group = IRGroup(id="g", name="Zone", type="trust_zone", member_node_ids=["n0", "n1"])
+    return DSLDiagram(nodes=nodes, edges=edges, groups=[group])
+
+
+def test_key_covers_options():
+    assert layout_key("h", direction="LR", engine="elk") == layout_key("h", engine="elk", direction="LR")
+    assert layout_key("h", direction="LR", engine="elk") != layout_key("h", direction="TB", engine="elk")
+    assert layout_key("h", direction="LR", engine="elk") != layout_key("h2", direction="LR", engine="elk")
+
+
+def test_round_trip_rebuilds_models():
+    cache = LayoutCache()
+    cache.put("k", _diagram(), engine="elk", quality=0.9)
+    hit = cache.get("k")
+
+    assert hit.meta == {"engine": "elk", "quality": 0.9}
+    assert hit.diagram.model_dump() == _diagram().model_dump()
+    assert isinstance(hit.diagram.groups[0], IRGroup)
+    assert hit.diagram.groups[0].member_node_ids == ["n0", "n1"]
+    # every hit is a fresh copy – callers may mutate it
+    hit.diagram.nodes[0].x = -1.0
+    assert cache.get("k").diagram.nodes[0].x == 0.0
+
+
+def test_lru_is_bounded_by_entries_and_bytes():
+    cache = LayoutCache(maxsize=2)
+    cache.put("a", _diagram())
+    cache.put("b", _diagram())
+    assert cache.get("a") is not None                     # refreshes "a"
+    cache.put("c", _diagram())                            # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and len(cache) == 2
+
+    small = LayoutCache(maxsize=100)
+    small.put("a", _diagram(40))
+    budget = small.nbytes
+    small = LayoutCache(maxsize=100, max_bytes=budget * 2)
+    for key in "abcde":
+        small.put(key, _diagram(40))
+    assert len(small) == 2 and small.nbytes <= budget * 2
+    assert small.get("e") is not None and small.get("a") is None
+
+
+def test_workers_share_layouts_through_redis():
+    redis_client = _DictRedis()
+    LayoutCache(redis_client=redis_client).put("k", _diagram(), engine="elk")
+
+    other = LayoutCache(redis_client=redis_client)
+    hit = other.get("k")
+    assert hit is not None and hit.meta["engine"] == "elk"
+    assert len(other) == 1                                # promoted to the local tier
+
+    assert LayoutCache(redis_client=_DictRedis()).get("k") is None
@@ -0,0 +1,76 @@
+from core.ir.enrich.resolution_cache import ResolutionCache
+from core.ir.enrich.taxonomy_mapper import TaxonomyMapper
+from core.ir.enrich.taxonomy_snapshot import TaxonomySnapshot
+from core.ir.ir_types import IRNode
+
+ROWS = [
+    {"token": "postgresql", "display_name": "PostgreSQL", "aliases": ["postgres"], "kind": "DATA",
+     "iconify_id": "logos:postgresql"},
+]
+
+
+class _DictRedis:
+    """Just enough of the redis-py surface for the hash tier."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hmget(self, name, fields):
+        return [self.hashes.get(name, {}).get(f) for f in fields]
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def hset(self, name, mapping):
+        self.hashes.setdefault(name, {}).update(mapping)
+
+    def expire(self, name, ttl):
+        pass
+
+    def execute(self):
+        pass
+
+
+def test_lru_is_bounded_and_dropped_on_checksum_change():
+    cache = ResolutionCache(maxsize=2)
+    cache.put("v1", ("a", ""), {"token": "a"})
+    cache.put("v1", ("b", ""), {"token": "b"})
+    assert cache.get("v1", ("a", "")) == {"token": "a"}   # refreshes "a"
+    cache.put("v1", ("c", ""), {"token": "c"})             # evicts "b"
+
+    assert cache.get("v1", ("b", "")) is None
+    assert cache.get("v1", ("a", "")) == {"token": "a"}
+    assert cache.get("v2", ("a", "")) is None
+    assert len(cache) == 0
+
+
+def test_workers_share_resolutions_through_redis():
+    redis_client = _DictRedis()
+    snapshot = TaxonomySnapshot.build(ROWS, "sum", version=1)
+    node = IRNode(id="db", name="Postgres", kind="Service", layer="service")
+
+    first = TaxonomyMapper(snapshot=snapshot, cache=ResolutionCache(redis_client=redis_client))
+    assert first.match_nodes([node, node])[1]["token"] == "postgresql"
+    assert list(redis_client.hashes) == ["taxonomy:resolve:sum"]
+
+    # a second worker with a cold LRU is answered from the shared hash
+    second = TaxonomyMapper(snapshot=snapshot, cache=ResolutionCache(redis_client=redis_client))
+    second._resolve = None  # any cache miss would now blow up
+    assert second.find_best_taxonomy_match(node)["token"] == "postgresql"
+
+
+def test_spelling_variants_do_not_leak_into_each_other():
+    rows = ROWS + [{"token": "aws-lambda", "display_name": "AWS Lambda", "aliases": [], "kind": "COMPUTE",
+                    "iconify_id": "logos:aws-lambda"}]
+    snapshot = TaxonomySnapshot.build(rows, "sum", version=1)
+    labels = ["aws-lambda", "AWS Lambda", "mystery-box", "mystery box"]
+
+    def resolve(order):
+        mapper = TaxonomyMapper(snapshot=snapshot, cache=ResolutionCache())
+        nodes = [IRNode(id=str(i), name=name, kind="Service", layer="service") for i, name in enumerate(order)]
+        return {node.name: mapper.find_best_taxonomy_match(node) for node in nodes}
+
+    forward, backward = resolve(labels), resolve(labels[::-1])
+    assert forward == backward
+    assert forward["aws-lambda"] != forward["AWS Lambda"]
+    assert forward["mystery-box"]["token"] != forward["mystery box"]["token"]
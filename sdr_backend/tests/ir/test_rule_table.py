@@ -0,0 +1,35 @@
+import pytest
+
+from core.ir.enrich import domain_inference, edge_classifier
+from core.ir.enrich.rule_table import RuleTable, keyword_rules
+
+
+def _first(rules, text):
+    """Reference semantics: sequential scan, first rule with a keyword in *text*."""
+    for value, keywords in rules:
+        if any(kw in text.lower() for kw in keywords):
+            return value
+    return None
+
+
+LABELS = [
+    "Login Service", "Payment auth gateway", "User profile DB", "Checkout cart",
+    "Inventory stock", "Metrics tracking", "Tokenized billing", "HTTPS auth",
+    "gRPC event data", "tcp metrics", "plain", "", "SQL login data",
+]
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_stage_tables_match_sequential_scan(label):
+    assert domain_inference._RULES.classify(label).get("domain") == _first(
+        list(domain_inference._DOMAIN_KEYWORDS.items()), label)
+
+    hits = edge_classifier._RULES.classify(label)
+    assert hits.get("protocol") == _first(keyword_rules(edge_classifier._PROTOCOL_MAP), label)
+    assert hits.get("purpose") == _first(keyword_rules(edge_classifier._PURPOSE_MAP), label)
+
+
+def test_earlier_rule_wins_even_inside_a_later_match():
+    table = RuleTable({"t": [("inner", ("token",)), ("outer", ("stokens",))]})
+    assert table.classify("STOKENS") == {"t": "inner"}
+    assert table.classify("nothing") == {}
@@ -0,0 +1,97 @@
+import numpy as np
+
+from core.ir.enrich import taxonomy_embeddings
+from core.ir.enrich.resolution_cache import ResolutionCache
+from core.ir.enrich.taxonomy_embeddings import (
+    TaxonomyEmbeddingIndex,
+    build_corpus,
+    embeddings_pending,
+    get_embedding_index,
+    row_texts,
+)
+from core.ir.enrich.taxonomy_mapper import TaxonomyMapper
+from core.ir.enrich.taxonomy_snapshot import TaxonomySnapshot
+from core.ir.ir_types import IRNode
+
+ROWS = [
+    {"token": "aws-s3", "display_name": "Amazon S3", "aliases": ["s3", "object storage"],
+     "description": "Object storage for uploads and backups", "kind": "DATA"},
+    {"token": "keycloak", "display_name": "Keycloak", "aliases": [], "kind": "IDENTITY"},
+]
+
+
+def test_corpus_covers_names_aliases_and_descriptions():
+    assert row_texts(ROWS[0]) == ["Amazon S3", "aws s3", "s3", "object storage",
+                                  "Object storage for uploads and backups"]
+
+    texts, owners = build_corpus(TaxonomySnapshot.build(ROWS, "emb", version=1))
+    assert texts[-1] == "keycloak"
+    assert owners.tolist() == [0, 0, 0, 0, 0, 1, 1]
+
+
+def test_tier_is_skipped_for_an_unloaded_snapshot():
+    assert get_embedding_index(TaxonomySnapshot.empty()) is None
+
+
+class _BagOfWordsEncoder:
+    """Stub sentence encoder: normalised word counts over a fixed vocabulary."""
+
+    VOCAB = ["storage", "object", "uploads", "backups", "s3", "login", "identity", "keycloak", "user"]
+
+    def encode(self, texts, batch_size=None, normalize_embeddings=True, convert_to_numpy=True):
+        out = np.zeros((len(texts), len(self.VOCAB)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                if word in self.VOCAB:
+                    out[row, self.VOCAB.index(word)] += 1
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1, norms)
+
+
+class _FlatIP:
+    """numpy stand-in for faiss.IndexFlatIP."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.ntotal = len(vectors)
+
+    def search(self, queries, k):
+        sims = queries @ self.vectors.T
+        ids = np.argsort(-sims, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(sims, ids, axis=1), ids
+
+
+def _stub_index(snapshot):
+    encoder = _BagOfWordsEncoder()
+    texts, owners = build_corpus(snapshot)
+    return TaxonomyEmbeddingIndex(snapshot.checksum, _FlatIP(encoder.encode(texts)), owners, encoder)
+
+
+def test_search_returns_best_row_above_threshold():
+    snapshot = TaxonomySnapshot.build(ROWS, "emb", version=1)
+    hits = _stub_index(snapshot).search(["object storage for uploads", "user login", "nothing"], snapshot,
+                                        min_similarity=0.6)
+    assert hits[0][0]["token"] == "aws-s3" and hits[0][1] > 0.8
+    assert hits[1] is None and hits[2] is None
+
+
+def test_mapper_semantic_tier_and_caching_while_building(monkeypatch):
+    snapshot = TaxonomySnapshot.build(ROWS, "emb", version=1)
+    monkeypatch.setattr(taxonomy_embeddings, "ENABLED", True)
+    monkeypatch.setattr(taxonomy_embeddings, "faiss", object())
+    monkeypatch.setattr(taxonomy_embeddings, "_current", None)
+    monkeypatch.setattr(taxonomy_embeddings, "_building", snapshot.checksum)  # a build is running
+    # only the row description mentions these words – no exact/word-vote hit
+    node = IRNode(id="s", name="uploads backups", kind="Service", layer="service")
+
+    cache = ResolutionCache()
+    mapper = TaxonomyMapper(snapshot=snapshot, cache=cache)
+    assert embeddings_pending(snapshot) and get_embedding_index(snapshot) is None
+    assert mapper.match_nodes([node])[0]["token"] != "aws-s3"
+    mapper.find_best_taxonomy_match(node)
+    assert len(cache) == 0  # fell through to fuzzy matching – not cached
+
+    monkeypatch.setattr(taxonomy_embeddings, "_current", _stub_index(snapshot))
+    assert not embeddings_pending(snapshot)
+    assert mapper.match_nodes([node])[0]["token"] == "aws-s3"
+    assert len(cache) == 1
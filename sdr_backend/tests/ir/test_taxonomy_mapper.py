@@ -2,7 +2,9 @@ import pytest
 from pydantic import ValidationError
 
 from core.ir.ir_types import IRGraph, IRNode, IREdge
-from core.ir.enrich.taxonomy_mapper import assign_taxonomy
+from core.ir.enrich.resolution_cache import ResolutionCache
+from core.ir.enrich.taxonomy_mapper import TaxonomyMapper, assign_taxonomy
+from core.ir.enrich.taxonomy_snapshot import TaxonomySnapshot
 from utils.logger import log_info
 
 def create_test_graph():
@@ -113,6 +115,34 @@ def test_error_handling():
     log_info("Error handling test passed")
     return True
 
+def test_batch_matching_agrees_with_single_node_lookup():
+    """match_nodes() must resolve exactly like per-node find_best_taxonomy_match()."""
+    rows = [
+        {"token": "postgresql", "display_name": "PostgreSQL", "aliases": ["postgres"], "kind": "DATA",
+         "iconify_id": "logos:postgresql"},
+        {"token": "kubernetes", "display_name": "Kubernetes", "aliases": ["k8s"], "kind": "COMPUTE",
+         "iconify_id": "logos:kubernetes"},
+        {"token": "rabbitmq", "display_name": "RabbitMQ", "aliases": [], "kind": "INTEGRATION_MESSAGING",
+         "iconify_id": "logos:rabbitmq"},
+    ]
+    snapshot = TaxonomySnapshot.build(rows, "test", version=1)
+    batch_mapper = TaxonomyMapper(snapshot=snapshot, cache=ResolutionCache())
+    single_mapper = TaxonomyMapper(snapshot=snapshot, cache=ResolutionCache())
+    nodes = [
+        IRNode(id="a", name="Postgres", kind="Service", layer="service"),
+        IRNode(id="b", name="kubernetees", kind="Service", layer="service"),   # fuzzy tier
+        IRNode(id="c", name="rabbitmqq", kind="Service", layer="service"),     # fuzzy tier
+        IRNode(id="d", name="Mystery Box", kind="Service", layer="service"),   # no match
+        IRNode(id="e", name="Unknown", kind="Service", layer="service",
+               metadata={"iconifyId": "logos:kubernetes"}),                     # iconify fallback
+    ]
+
+    batch = batch_mapper.match_nodes(nodes)
+    single = [single_mapper.find_best_taxonomy_match(n) for n in nodes]
+
+    assert batch == single
+    assert [r["token"] for r in batch] == ["postgresql", "kubernetes", "rabbitmq", "mystery box", "kubernetes"]
+
 if __name__ == "__main__":
     print("Running taxonomy mapper tests...")
     test_assign_taxonomy()
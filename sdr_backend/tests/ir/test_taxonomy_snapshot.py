@@ -0,0 +1,284 @@
+from core.ir.enrich import taxonomy_client
+from core.ir.enrich.taxonomy_index import StaleIndexError, compile_index, open_compiled_snapshot
+from core.ir.enrich.resolution_cache import ResolutionCache
+from core.ir.enrich.taxonomy_mapper import TaxonomyMapper
+from core.ir.enrich.taxonomy_snapshot import TaxonomySnapshot
+from core.ir.ir_types import IRNode
+
+ROWS = [
+    {"token": "redis", "display_name": "Redis", "aliases": ["redis-cache"], "kind": "DATA",
+     "iconify_id": "logos:redis", "svg_url": None, "updated_at": "1"},
+    {"token": "postgresql", "display_name": "PostgreSQL", "aliases": ["postgres", "pg"], "kind": "DATA",
+     "iconify_id": "logos:postgresql", "svg_url": None, "updated_at": "1"},
+    {"token": "aws-api-gateway", "display_name": "API Gateway", "aliases": [], "kind": "EDGE_NETWORK",
+     "iconify_id": "logos:aws-api-gateway", "svg_url": None, "updated_at": "1"},
+]
+
+
+def test_snapshot_indexes_are_read_only():
+    snap = TaxonomySnapshot.build(ROWS, "abc", version=1)
+
+    assert snap.primary("redis")["token"] == "redis"
+    assert snap.display("api-gateway")["token"] == "aws-api-gateway"
+    assert snap.aliases("postgres")[0]["token"] == "postgresql"
+    assert snap.word_vote("Postgres primary")["token"] == "postgresql"
+    assert "redis" in snap.fuzzy_keys
+
+    try:
+        snap.primary_by_slug["x"] = {}  # type: ignore[index]
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("snapshot index should be read-only")
+
+
+def test_swap_only_on_checksum_change(monkeypatch, tmp_path):
+    monkeypatch.setattr(taxonomy_client, "_SNAPSHOT", TaxonomySnapshot.empty())
+    monkeypatch.setattr(taxonomy_client, "COMPILED_INDEX_FILE", tmp_path / "taxonomy_index.bin")
+    monkeypatch.setattr(taxonomy_client, "_save_to_disk", lambda rows, checksum: None)
+
+    first = taxonomy_client._swap_snapshot(ROWS, "abc")
+    assert taxonomy_client.get_snapshot() is first
+
+    same = taxonomy_client._swap_snapshot(list(ROWS), "abc")
+    assert same is first, "unchanged checksum must keep the existing snapshot"
+
+    changed = taxonomy_client._swap_snapshot(ROWS[:2], "def")
+    assert changed.version == first.version + 1
+    assert taxonomy_client.get_snapshot() is changed
+
+
+def test_mapper_uses_snapshot_without_reload():
+    snap = TaxonomySnapshot.build(ROWS, "abc", version=1)
+    mapper = TaxonomyMapper(snapshot=snap)
+
+    node = IRNode(id="db", name="PostgreSQL", kind="Service", layer="service")
+    assert mapper.find_best_taxonomy_match(node)["token"] == "postgresql"
+
+
+def test_mapper_keeps_explicit_empty_snapshot(monkeypatch):
+    def no_global():
+        raise AssertionError("an explicit snapshot must not fall back to the global one")
+
+    monkeypatch.setattr("core.ir.enrich.taxonomy_mapper.get_snapshot", no_global)
+    empty = TaxonomySnapshot.empty()
+    assert TaxonomyMapper(snapshot=empty, cache=ResolutionCache()).snapshot is empty
+
+
+def test_compiled_index_matches_in_memory_snapshot(tmp_path):
+    path = compile_index(ROWS, "abc", tmp_path / "taxonomy_index.bin")
+    compiled = open_compiled_snapshot(path, version=1, checksum="abc")
+    memory = TaxonomySnapshot.build(ROWS, "abc", version=1)
+
+    assert compiled.fuzzy_keys == memory.fuzzy_keys
+    for key in memory.fuzzy_keys:
+        assert compiled.by_key(key) == memory.by_key(key)
+    assert compiled.aliases("postgres") == memory.aliases("postgres")
+    assert compiled.word_vote("Postgres primary") == memory.word_vote("Postgres primary")
+    assert compiled.primary("missing") is None
+
+    try:
+        open_compiled_snapshot(path, version=1, checksum="other")
+    except StaleIndexError:
+        pass
+    else:
+        raise AssertionError("checksum mismatch should mark the index stale")
+
+
+def test_trigram_pruning_matches_full_scan(tmp_path):
+    from core.ir.enrich.fuzzy_match import fuzzy_best_match
+
+    words = ["redis", "postgres", "kafka", "gateway", "auth", "queue", "cache", "client",
+             "web", "message", "service", "mongo", "mysql", "nginx", "lambda", "bucket"]
+    rows = [{"token": f"{a}-{b}-{i}", "display_name": None, "aliases": [], "kind": "SERVICE",
+             "iconify_id": None, "svg_url": None, "updated_at": "1"}
+            for i, (a, b) in enumerate((a, b) for a in words for b in words if a != b)]
+    snap = TaxonomySnapshot.build(rows, "tri", version=1)
+    compiled = open_compiled_snapshot(compile_index(rows, "tri", tmp_path / "idx.bin"), version=1)
+    assert compiled.fuzzy_keys == snap.fuzzy_keys
+
+    for label in ["web-client", "api-gateway", "authentication-service", "database",
+                  "redis-cache", "message-queue", "kafka-redis-3", "zzz"]:
+        key, score = fuzzy_best_match(label, snap.fuzzy_keys)
+        pruned = fuzzy_best_match(label, snap.fuzzy_candidates(label))
+        # below-threshold scores are irrelevant; hits must agree exactly
+        assert pruned == (key, score) if key else pruned[0] is None
+        assert compiled.fuzzy_candidates(label) == snap.fuzzy_candidates(label)
+
+
+def test_delta_sync_merges_changed_rows(monkeypatch, tmp_path):
+    monkeypatch.setattr(taxonomy_client, "COMPILED_INDEX_FILE", tmp_path / "taxonomy_index.bin")
+    monkeypatch.setattr(taxonomy_client, "_save_to_disk", lambda rows, checksum: None)
+    monkeypatch.setattr(taxonomy_client, "_VERIFY_TIME", 0.0)
+    monkeypatch.setattr(taxonomy_client, "_SNAPSHOT", TaxonomySnapshot.build(ROWS, "abc", version=1))
+
+    renamed = dict(ROWS[0], display_name="Redis OSS", updated_at="2")
+    upstream = [renamed] + ROWS[1:]
+    full_pulls = []
+    monkeypatch.setattr(taxonomy_client, "DISK_CACHE_FILE", tmp_path / "taxonomy_cache.json")
+    monkeypatch.setattr(taxonomy_client, "_rpc_pull", lambda: full_pulls.append(1) or (list(upstream), "rpc-sum"))
+    monkeypatch.setattr(taxonomy_client, "_delta_pull", lambda watermark: [r for r in upstream if r["updated_at"] >= watermark])
+    monkeypatch.setattr(taxonomy_client, "_remote_count", lambda: len(upstream))
+    monkeypatch.setattr(taxonomy_client, "_remote_checksum", lambda: taxonomy_client._rows_checksum(upstream))
+
+    merged = taxonomy_client.refresh_snapshot()
+    assert not full_pulls
+    assert merged.version == 2
+    assert merged.display("redis-oss")["token"] == "redis"
+    assert taxonomy_client.refresh_snapshot() is merged  # nothing newer than the watermark
+
+    # a deleted row is invisible to the delta – the count check forces a full reload
+    upstream.pop()
+    taxonomy_client.refresh_snapshot()
+    assert full_pulls == [1]
+    # full and delta loads share one checksum scheme; the RPC's own is not used
+    assert taxonomy_client.get_snapshot().checksum == taxonomy_client._rows_checksum(upstream)
+
+
+def test_rows_without_watermark_back_off_to_verify_interval(monkeypatch, tmp_path):
+    import time
+
+    unstamped = [dict(r, updated_at=None) for r in ROWS]
+    monkeypatch.setattr(taxonomy_client, "COMPILED_INDEX_FILE", tmp_path / "taxonomy_index.bin")
+    monkeypatch.setattr(taxonomy_client, "_save_to_disk", lambda rows, checksum: None)
+    monkeypatch.setattr(taxonomy_client, "_SNAPSHOT", TaxonomySnapshot.build(unstamped, "abc", version=1))
+    monkeypatch.setattr(taxonomy_client, "_VERIFY_TIME", 0.0)
+    full_pulls = []
+    monkeypatch.setattr(taxonomy_client, "_pull_taxonomy", lambda: full_pulls.append(1) or
+                        (unstamped, taxonomy_client._rows_checksum(unstamped)))
+
+    reloaded = taxonomy_client.refresh_snapshot()
+    assert full_pulls == [1]
+    for _ in range(3):  # the next ticks do not pull the whole table again
+        assert taxonomy_client.refresh_snapshot() is reloaded
+    assert full_pulls == [1]
+
+    monkeypatch.setattr(taxonomy_client, "_VERIFY_TIME", time.time() - taxonomy_client.VERIFY_SEC)
+    assert taxonomy_client.refresh_snapshot() is reloaded  # same checksum: verified, not swapped
+    assert full_pulls == [1, 1]
+
+
+def test_offline_boot_uses_bundled_snapshot(monkeypatch, tmp_path):
+    import json
+
+    bundled = tmp_path / "taxonomy_dump.json"
+    bundled.write_text(json.dumps({"rows": ROWS, "checksum": "bundled"}), "utf-8")
+    monkeypatch.setattr(taxonomy_client, "_SNAPSHOT", TaxonomySnapshot.empty())
+    monkeypatch.setattr(taxonomy_client, "COMPILED_INDEX_FILE", tmp_path / "taxonomy_index.bin")
+    monkeypatch.setattr(taxonomy_client, "DISK_CACHE_FILE", tmp_path / "taxonomy_cache.json")
+    monkeypatch.setattr(taxonomy_client, "BUNDLED_SNAPSHOT_FILE", bundled)
+    monkeypatch.setattr(taxonomy_client, "start_background_refresher", lambda: None)
+
+    def unreachable():
+        raise ConnectionError("supabase unreachable")
+
+    monkeypatch.setattr(taxonomy_client, "_pull_taxonomy", unreachable)
+
+    snap = taxonomy_client.get_snapshot()
+    assert snap.checksum == taxonomy_client._rows_checksum(ROWS)
+    assert snap.primary("redis")["token"] == "redis"
+
+
+def test_word_vote_prefers_rare_words():
+    rows = [{"token": f"cloud-{name}", "display_name": None, "aliases": [], "kind": "SERVICE"}
+            for name in ("run", "functions", "sql", "cdn")]
+    rows.append({"token": "cloud-armor", "display_name": "Cloud Armor", "aliases": ["waf"], "kind": "IDENTITY"})
+    snap = TaxonomySnapshot.build(rows, "idf", version=1)
+
+    assert snap.word_idf["armor"] > snap.word_idf["cloud"]
+    # "cloud" matches every row; the rare word decides even when it comes last
+    assert snap.word_vote("cloud cloud waf")["token"] == "cloud-armor"
+    assert snap.word_vote("nothing here") is None
+
+
+def test_pruned_fuzzy_matches_full_scan_on_mapper_corpus(monkeypatch, tmp_path):
+    from core.ir.enrich import taxonomy_mapper
+    from core.ir.enrich.fuzzy_match import fuzzy_best_match, fuzzy_best_matches
+    from core.ir.enrich.taxonomy_client import normalize_label
+
+    # Labels of test_taxonomy_mapper; every one has two equally close keys
+    # whose corpus order is the reverse of their byte order.
+    labels = ["Web Client", "API Gateway", "Authentication Service", "Database",
+              "Redis Cache", "Message Queue"]
+    slugs = [normalize_label(label.lower())[0] for label in labels]
+    rows = []
+    for slug in slugs:
+        for suffix in ("s", "e"):
+            rows.append({"token": f"{slug}{suffix}", "display_name": None, "aliases": [],
+                         "kind": "SERVICE", "iconify_id": None, "svg_url": None, "updated_at": "1"})
+    words = ["web", "api", "auth", "data", "redis", "queue", "cache", "client", "service", "gate"]
+    rows += [{"token": f"{a}-{b}", "display_name": None, "aliases": [f"{b}-{a}-x"], "kind": "SERVICE",
+              "iconify_id": None, "svg_url": None, "updated_at": "1"}
+             for a in words for b in words if a != b]
+    monkeypatch.setattr(taxonomy_mapper, "FUZZY_CANDIDATES", 8)
+
+    memory = TaxonomySnapshot.build(rows, "corpus", version=1)
+    compiled = open_compiled_snapshot(compile_index(rows, "corpus", tmp_path / "idx.bin"), version=1)
+    full_scan = list(memory.flat)  # the corpus order a full scan has always used
+    expected = [fuzzy_best_match(slug, full_scan, threshold=60) for slug in slugs]
+    assert all(key for key, _ in expected)
+
+    for snap in (memory, compiled):
+        mapper = TaxonomyMapper(snapshot=snap, cache=ResolutionCache())
+        assert [fuzzy_best_match(slug, mapper._fuzzy_choices([slug]), threshold=60) for slug in slugs] == expected
+        batch = fuzzy_best_matches(slugs, mapper._fuzzy_choices(slugs), threshold=60, workers=1)
+        assert [key for key, _ in batch] == [key for key, _ in expected]
+
+
+def test_dumped_export_boots_offline(monkeypatch, tmp_path):
+    import importlib.util
+    import json
+    from pathlib import Path
+
+    script = Path(__file__).resolve().parents[2] / "scripts" / "build_taxonomy_index.py"
+    spec = importlib.util.spec_from_file_location("build_taxonomy_index", script)
+    build_taxonomy_index = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(build_taxonomy_index)
+
+    source = tmp_path / "rows.json"
+    source.write_text(json.dumps(ROWS), "utf-8")
+    bundled = tmp_path / "taxonomy_dump.json"
+    assert build_taxonomy_index.main(["--export", str(source), "--dump", str(bundled)]) == 0
+
+    monkeypatch.setattr(taxonomy_client, "_SNAPSHOT", TaxonomySnapshot.empty())
+    monkeypatch.setattr(taxonomy_client, "USE_COMPILED_INDEX", False)
+    monkeypatch.setattr(taxonomy_client, "COMPILED_INDEX_FILE", tmp_path / "taxonomy_index.bin")
+    monkeypatch.setattr(taxonomy_client, "DISK_CACHE_FILE", tmp_path / "taxonomy_cache.json")
+    monkeypatch.setattr(taxonomy_client, "BUNDLED_SNAPSHOT_FILE", bundled)
+    monkeypatch.setattr(taxonomy_client, "start_background_refresher", lambda: None)
+
+    def unreachable():
+        raise ConnectionError("supabase unreachable")
+
+    monkeypatch.setattr(taxonomy_client, "_pull_taxonomy", unreachable)
+
+    snap = taxonomy_client.get_snapshot()
+    assert snap.loaded and not (tmp_path / "taxonomy_index.bin").exists()
+    mapper = TaxonomyMapper(snapshot=snap, cache=ResolutionCache())
+    node = IRNode(id="db", name="Postgres", kind="Service", layer="service")
+    assert mapper.find_best_taxonomy_match(node)["token"] == "postgresql"
+
+
+def test_word_vote_matches_dense_scoring(tmp_path):
+    import random
+
+    import numpy as np
+
+    rng = random.Random(5)
+    vocab = [f"w{i}" for i in range(40)]
+    rows = [{"token": f"t{i}", "display_name": " ".join(rng.sample(vocab, rng.randrange(1, 5))),
+             "aliases": [], "kind": "SERVICE"} for i in range(300)]
+    snap = TaxonomySnapshot.build(rows, "dense", version=1)
+    compiled = open_compiled_snapshot(compile_index(rows, "dense", tmp_path / "idx.bin"), version=1)
+
+    for _ in range(200):
+        words = sorted(w for w in rng.sample(vocab, rng.randrange(1, 6)) if w in snap.word_index)
+        if not words:
+            continue
+        dense = np.zeros(len(rows))
+        for w in words:
+            dense[snap.word_index[w]] += snap.word_idf[w]
+        label = " ".join(words)
+        expected = rows[int(np.argmax(dense))]["token"]
+        assert snap.word_vote(label)["token"] == expected
+        assert compiled.word_vote(label)["token"] == expected
@@ -1,8 +1,10 @@
 package main
 
 import (
+	"bufio"
 	"bytes"
 	"context"
+	"encoding/binary"
 	"encoding/json"
 	"flag"
 	"fmt"
@@ -19,11 +21,13 @@ import (
 func main() {
 	layout := flag.String("layout", "elk", "elk|none")
 	timeoutSec := flag.Int("timeout", 10, "timeout in seconds")
+	serveMode := flag.Bool("serve", false, "answer framed requests on stdin/stdout until stdin is closed")
 	flag.Parse()
 
-	// Create a context with timeout
-	ctx, cancel := context.WithTimeout(context.Background(), time.Duration(*timeoutSec)*time.Second)
-	defer cancel()
+	if *serveMode {
+		serve(*layout, *timeoutSec)
+		return
+	}
 
 	var src []byte
 	var err error
@@ -40,20 +44,135 @@ func main() {
 		check(err)
 	}
 
+	out, err := compileAndFlatten(src, *layout, *timeoutSec)
+	check(err)
+	enc := json.NewEncoder(os.Stdout)
+	enc.SetIndent("", "  ")
+	check(enc.Encode(out))
+}
+
+// compileAndFlatten compiles D2 source, optionally applies ELK and flattens
+// the graph into the JSON shape shared by one-shot and serve mode.
+func compileAndFlatten(src []byte, layout string, timeoutSec int) (jDiag, error) {
+	// Create a context with timeout
+	ctx, cancel := context.WithTimeout(context.Background(), time.Duration(timeoutSec)*time.Second)
+	defer cancel()
+
 	// 1️⃣ compile D2 → graph
 	g, _, err := d2compiler.Compile("stdin", bytesReader(src), &d2compiler.CompileOptions{})
-	check(err)
+	if err != nil {
+		return jDiag{}, err
+	}
 
 	// 2️⃣ layout - try ELK first if requested
-	if *layout == "elk" {
+	if layout == "elk" {
 		tryELKLayout(ctx, g) // Pass context with timeout
 	}
 
 	// 3️⃣ flatten → JSON (this now includes our fallback layout)
-	out := flatten(g)
-	enc := json.NewEncoder(os.Stdout)
-	enc.SetIndent("", "  ")
-	check(enc.Encode(out))
+	return flatten(g), nil
+}
+
+/* ---------- serve mode ---------- */
+
+// Every frame, in both directions, is a 4-byte big-endian payload length
+// followed by a JSON document.  One request is answered before the next is
+// read; compile errors are reported in the response and keep the worker alive.
+
+type serveRequest struct {
+	ID      int64  `json:"id"`
+	Op      string `json:"op"` // "layout" (default) | "ping"
+	Src     string `json:"src"`
+	Layout  string `json:"layout"`
+	Timeout int    `json:"timeout"`
+}
+
+type serveResponse struct {
+	ID     int64  `json:"id"`
+	OK     bool   `json:"ok"`
+	Result *jDiag `json:"result,omitempty"`
+	Error  string `json:"error,omitempty"`
+}
+
+func serve(defaultLayout string, defaultTimeout int) {
+	in := bufio.NewReader(os.Stdin)
+	out := bufio.NewWriter(os.Stdout)
+	for {
+		payload, err := readFrame(in)
+		if err == io.EOF {
+			return // parent closed stdin – clean shutdown
+		}
+		check(err)
+
+		var req serveRequest
+		var resp serveResponse
+		if err := json.Unmarshal(payload, &req); err != nil {
+			resp.Error = "bad request: " + err.Error()
+		} else {
+			resp = handle(req, defaultLayout, defaultTimeout)
+		}
+
+		body, err := json.Marshal(resp)
+		check(err)
+		check(writeFrame(out, body))
+		check(out.Flush())
+	}
+}
+
+func handle(req serveRequest, defaultLayout string, defaultTimeout int) (resp serveResponse) {
+	resp.ID = req.ID
+	defer func() {
+		if r := recover(); r != nil {
+			resp = serveResponse{ID: req.ID, Error: fmt.Sprintf("panic: %v", r)}
+		}
+	}()
+
+	if req.Op == "ping" {
+		resp.OK = true
+		return resp
+	}
+	layout := req.Layout
+	if layout == "" {
+		layout = defaultLayout
+	}
+	timeoutSec := req.Timeout
+	if timeoutSec <= 0 {
+		timeoutSec = defaultTimeout
+	}
+
+	diag, err := compileAndFlatten([]byte(req.Src), layout, timeoutSec)
+	if err != nil {
+		resp.Error = err.Error()
+		return resp
+	}
+	resp.OK = true
+	resp.Result = &diag
+	return resp
+}
+
+func readFrame(r io.Reader) ([]byte, error) {
+	var header [4]byte
+	if _, err := io.ReadFull(r, header[:]); err != nil {
+		return nil, err
+	}
+	buf := make([]byte, binary.BigEndian.Uint32(header[:]))
+	if _, err := io.ReadFull(r, buf); err != nil {
+		if err == io.EOF {
+			err = io.ErrUnexpectedEOF
+		}
+		return nil, err
+	}
+	return buf, nil
+}
+
+func writeFrame(w io.Writer, body []byte) error {
+	var header [4]byte
+	binary.BigEndian.PutUint32(header[:], uint32(len(body)))
+	if _, err := w.Write(header[:]); err != nil {
+		return err
+	}
+	_, err := w.Write(body)
+	return err
 }
 
 // calculateNodeOrder determines the best order for nodes based on edges
@@ -106,6 +106,56 @@ USER_AUTH_FAILURES = Counter(
     ['reason']
 )
 
+# Taxonomy resolution cache metrics
+TAXONOMY_RESOLVE_CACHE = Counter(
+    'taxonomy_resolve_cache_total',
+    'Label-to-taxonomy resolution cache lookups',
+    ['result']  # result can be 'lru_hit', 'redis_hit', 'miss'
+)
+
+# Layout cache metrics
+LAYOUT_CACHE = Counter(
+    'layout_cache_total',
+    'Positioned-diagram layout cache lookups and evictions',
+    ['result']  # result can be 'lru_hit', 'redis_hit', 'miss', 'evicted'
+)
+
+# IR enrichment pipeline metrics
+IR_ENRICH_STAGE_LATENCY = Histogram(
+    'ir_enrich_stage_duration_seconds',
+    'Duration of a single IR enrichment stage in seconds',
+    ['stage'],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+)
+
+IR_ENRICH_STAGE_ITEMS = Histogram(
+    'ir_enrich_stage_items',
+    'Number of nodes/edges an IR enrichment stage ran over',
+    ['stage', 'item'],  # item can be 'nodes', 'edges'
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 5000)
+)
+
+IR_ENRICH_STAGE_ERRORS = Counter(
+    'ir_enrich_stage_errors_total',
+    'Total number of failed IR enrichment stages',
+    ['stage', 'error_type']
+)
+
+# External binary (d2json, d2) execution metrics
+EXTERNAL_PROC_QUEUE_TIME = Histogram(
+    'external_proc_queue_seconds',
+    'Time an external binary call waited for a concurrency slot',
+    ['name'],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0)
+)
+
+EXTERNAL_PROC_RUN_TIME = Histogram(
+    'external_proc_run_seconds',
+    'Run time of an external binary call once it held a slot',
+    ['name', 'outcome'],  # outcome can be 'ok', 'error', 'timeout', 'cancelled'
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0)
+)
+
 # Utility functions for LLM metrics
 def record_llm_request(model: str, endpoint: str):
     """Record an LLM API request"""
@@ -136,6 +186,31 @@ def record_llm_rate_limit(model: str):
     """Record an LLM API rate limit error"""
     LLM_RATE_LIMITS.labels(model=model).inc()
 
+def record_taxonomy_cache(result: str, count: int = 1):
+    """Record taxonomy resolution cache lookups"""
+    if count > 0:
+        TAXONOMY_RESOLVE_CACHE.labels(result=result).inc(count)
+
+def record_layout_cache(result: str, count: int = 1):
+    """Record layout cache lookups and evictions"""
+    if count > 0:
+        LAYOUT_CACHE.labels(result=result).inc(count)
+
+def record_ir_enrich_stage(stage: str, seconds: float, nodes: int, edges: int):
+    """Record latency and graph size of one IR enrichment stage"""
+    IR_ENRICH_STAGE_LATENCY.labels(stage=stage).observe(seconds)
+    IR_ENRICH_STAGE_ITEMS.labels(stage=stage, item='nodes').observe(nodes)
+    IR_ENRICH_STAGE_ITEMS.labels(stage=stage, item='edges').observe(edges)
+
+def record_ir_enrich_error(stage: str, error_type: str):
+    """Record a failed IR enrichment stage"""
+    IR_ENRICH_STAGE_ERRORS.labels(stage=stage, error_type=error_type).inc()
+
+def record_external_proc(name: str, queue_seconds: float, run_seconds: float, outcome: str):
+    """Record queue and run time of one external binary call"""
+    EXTERNAL_PROC_QUEUE_TIME.labels(name=name).observe(queue_seconds)
+    EXTERNAL_PROC_RUN_TIME.labels(name=name, outcome=outcome).observe(run_seconds)
+
 
 # Define the security object
 security = HTTPBasic()
@@ -54,6 +54,7 @@ from core.prompt_engineering.cloud_prompt_builder import CloudAwarePromptBuilder
 from core.ir.ir_builder import IRBuilder
 from core.llm.llm_gateway_v2 import LLMGatewayV2
 from core.dsl.parser_d2_lang import D2LangParser
+from core.dsl.async_exec import run_blocking
 from core.dsl.validators import DiagramValidator
 from core.dsl.enhanced_layout_engine_v3 import EnhancedLayoutEngineV3, LayoutEngine, LayoutDirection
 from core.dsl.dsl_types import DSLDiagram
@@ -66,7 +67,7 @@ from core.cache.session_manager_v2 import SessionManagerV2
 from services.supabase_manager import SupabaseManager
 
 # Added for synchronous enrichment
-from core.ir.enrich import IrEnricher
+from core.ir.enrich import IrEnricher, PROFILE_IN_RESPONSE as IR_ENRICH_PROFILE
 from core.ir.layout.constraint_adapter import ir_to_dsl
 
 # Only needed for notifications
@@ -300,7 +301,7 @@ async def _generate_and_validate(prompt: str, max_attempts: int = 3):
             last_errors = ["Empty LLM response"]
         else:
             try:
-                diagram = _parser.parse(dsl_text)
+                diagram = await _parser.aparse(dsl_text)
                 valid, errors = _validator.validate(diagram)
                 if valid:
                     return diagram, dsl_text
@@ -437,6 +438,7 @@ async def design_generate(
 
         # Retrieve current diagram_state from Supabase (if any)
         current_dsl = ""
+        previous_ir: Dict[str, Any] | None = None
         rendered_json: Dict[str, Any] | None = None
         try:
             proj = await _supabase.get_project_data(user_id, project_code)
@@ -449,6 +451,11 @@ async def design_generate(
             # Use the new SupabaseManager method instead of direct PostgreSQL calls
             current_dsl = await _supabase.fetch_latest_dsl(project_code) or ""
             log_info(f"Retrieved latest DSL for project {project_code} ({len(current_dsl)} chars)")
+            # Previous IR lets enrichment re-run only on the nodes the update touches
+            try:
+                previous_ir = await _supabase.fetch_latest_ir(project_code)
+            except Exception as e:
+                log_error(f"Failed to fetch previous IR for project {project_code}: {e}")
 
         # Build prompt with cloud awareness
         prompt = await _builder.build_prompt_by_intent(
@@ -472,7 +479,9 @@ async def design_generate(
             )
 
         # Apply layout with enhanced engine after successful validation
-        layout_result = _layout.layout(
+        layout_result = await run_blocking(
+            "layout",
+            _layout.layout,
             diagram,
             direction=LayoutDirection.LEFT_TO_RIGHT,
             preferred_engine=LayoutEngine.AUTO
@@ -489,14 +498,15 @@ async def design_generate(
 
         # Build enriched IR synchronously so layer containers & icons are ready
         ir_base = _ir_builder.build(diagram, source_dsl=dsl_text)
-        ir_enriched = IrEnricher().run(ir_base)
+        enricher = IrEnricher()
+        ir_enriched = enricher.run_incremental(ir_base, previous_ir)
 
         # ------------------------------------------------------------------
         #  NEW: Apply layout directly on the *enriched* IR so that layer
         #        containers and node positions are preserved.  This guarantees
         #        the very first render is already fully positioned.
         # ------------------------------------------------------------------
-        diagram_full = _layout.layout_ir(ir_enriched)
+        diagram_full = await run_blocking("layout", _layout.layout_ir, ir_enriched)
         diagram_json = _dsl_to_reactflow(diagram_full)
         
         # If IR present in rendered_json, run layout_ir to add positions
@@ -507,9 +517,10 @@ async def design_generate(
                 ir_json = rendered_json.get("ir_json") if isinstance(rendered_json, dict) else None
                 if ir_json:
                     log_info("IR flow: Found IR data, applying layout")
+                    # diagram_state is client-writable – validate, never trust
                     from core.ir.ir_types import IRGraph
                     ir_graph = IRGraph.model_validate(ir_json)
-                    positioned = _layout.layout_ir(ir_graph)
+                    positioned = await run_blocking("layout", _layout.layout_ir, ir_graph)
                     diagram_json = positioned.model_dump()
                     log_info("IR flow: Successfully applied layout to IR data")
                 else:
@@ -649,7 +660,8 @@ async def design_generate(
             diagram_state=diagram_json, 
             pinned_nodes=pinned_nodes, 
             available_views=av_views,
-            provider=provider.value if provider != CloudProvider.NONE else None
+            provider=provider.value if provider != CloudProvider.NONE else None,
+            enrich_profile=enricher.profile if IR_ENRICH_PROFILE else None
         )
         resp = DSLResponse(
             intent=intent, 
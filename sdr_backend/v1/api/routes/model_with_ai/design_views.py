@@ -18,7 +18,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import JSONResponse
 
 from core.ir.view_emitters import get_emitter
-from core.ir.ir_types import IRGraph
+from core.ir.ir_types import IRGraph, trusted_graph
 from utils.logger import log_info, log_error
 
 # Supabase path
@@ -44,8 +44,9 @@ async def _fetch_ir_graph(sp: SupabaseManager, diagram_id: int) -> IRGraph:
         raise HTTPException(status_code=500, detail="Failed fetching IR")
 
     try:
-        graph = IRGraph.model_validate(ir_json)
-        log_info(f"IR View API: Successfully validated IR graph for diagram {diagram_id} - {len(graph.nodes)} nodes, {len(graph.edges)} edges")
+        # Stored IR was written by our own pipeline – rebuild without revalidating
+        graph = trusted_graph(ir_json)
+        log_info(f"IR View API: Successfully loaded IR graph for diagram {diagram_id} - {len(graph.nodes)} nodes, {len(graph.edges)} edges")
         return graph
     except Exception as e:
         log_error(f"IR View API: Invalid IR JSON for diagram {diagram_id}: {e}")
@@ -20,7 +20,8 @@ from pydantic import BaseModel, Field, validator
 from services.auth_handler import verify_token
 from core.dsl.parser_d2_lang import D2LangParser
 from core.dsl.validators import DiagramValidator
-from core.dsl.svg_renderer import render_svg
+from core.dsl.svg_renderer import render_svg_async
+from core.dsl.async_exec import run_blocking
 from utils.logger import log_info
 
 router = APIRouter()
@@ -115,7 +116,7 @@ async def export_svg(
         
         # Parse DSL to validate syntax and structure
         try:
-            diagram = _parser.parse(request.dsl)
+            diagram = await run_blocking("d2json", _parser.parse, request.dsl)
         except ValueError as e:
             log_info(f"DSL parsing failed: {e}")
             raise HTTPException(
@@ -142,7 +143,7 @@ async def export_svg(
         
         # Step 3: Render SVG with caching
         try:
-            svg_bytes = render_svg(request.dsl, theme=request.theme)
+            svg_bytes = await render_svg_async(request.dsl, theme=request.theme)
             
             if not svg_bytes:
                 raise HTTPException(
@@ -227,7 +228,7 @@ async def preview_svg_info(
     """
     try:
         # Parse and validate DSL
-        diagram = _parser.parse(request.dsl)
+        diagram = await run_blocking("d2json", _parser.parse, request.dsl)
         is_valid, validation_errors = _validator.validate(diagram)
         
         if not is_valid: